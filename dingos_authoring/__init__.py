@@ -3,3 +3,128 @@ __version__ = '0.1.0'
 DINGOS_AUTHORING_IMPORTER_REGISTRY = []
 
 DINGOS_AUTHORING_CELERY_BUG_WORKAROUND = False
+
+# Resource limits for imports: wall time in seconds and
+# memory (address space) in megabytes. If set, imports run
+# in a child process of the worker; ``None`` switches a limit off.
+
+DINGOS_AUTHORING_IMPORT_TIME_LIMIT = None
+
+DINGOS_AUTHORING_IMPORT_MEMORY_LIMIT = None
+
+# Size (number of entries) and timeout (in seconds) of the
+# per-process cache for generated STIX.
+
+DINGOS_AUTHORING_STIX_CACHE_SIZE = 32
+
+DINGOS_AUTHORING_STIX_CACHE_TIMEOUT = 600
+
+# Reports whose JSON is at least this long (in characters) are
+# transformed into STIX by a background task rather than within
+# the request; ``None`` means that generation is only run in the
+# background if the editor asks for it.
+
+DINGOS_AUTHORING_ASYNC_GENERATION_THRESHOLD = None
+
+# Alias of the Django cache used for data shared between
+# requests (e.g., the resolved authoring namespaces of users)
+# and the timeout (in seconds) for such entries.
+
+DINGOS_AUTHORING_CACHE = 'default'
+
+DINGOS_AUTHORING_CACHE_TIMEOUT = 3600
+
+# Counts for the counting paginator: 'exact' counts on every request,
+# 'cached' keeps counts in the cache (see above) and 'approximate'
+# additionally uses the estimate of the query planner (PostgreSQL only)
+# for unfiltered lists. Cached counts expire after the given timeout
+# (in seconds).
+
+DINGOS_AUTHORING_COUNT_MODE = 'cached'
+
+DINGOS_AUTHORING_COUNT_CACHE_TIMEOUT = 600
+
+# List views ordered by a single field are paginated by seeking rather than
+# by offset (see ``KeysetPaginationMixin``); keyset pages show the total
+# only if it is available from the count cache. ``False`` selects
+# offset pagination with page numbers throughout.
+
+DINGOS_AUTHORING_KEYSET_PAGINATION = True
+
+# Exports of authoring data (see ``export.py``) read the database in chunks
+# of this many rows, such that memory stays flat for large exports.
+
+DINGOS_AUTHORING_EXPORT_CHUNK_SIZE = 2000
+
+# Pages of the authoring lists (reports, history, imports) can be cached per
+# authoring group (or user) and request parameters for the given time
+# (in seconds); every write to AuthoredData invalidates the pages of
+# the affected group and user. ``None`` switches the cache off.
+#
+# The invalidation only reaches other processes if ``DINGOS_AUTHORING_CACHE``
+# is shared between them (e.g., memcached or Redis): with a process-local
+# cache such as ``LocMemCache``, pages are not cached even if a timeout is set.
+
+DINGOS_AUTHORING_LIST_CACHE_TIMEOUT = None
+
+# Number of drafts returned per request by the list mode of ``GetDraftJSON``;
+# further drafts are retrieved with the returned cursor.
+
+DINGOS_AUTHORING_DRAFT_LIST_PAGE_SIZE = 200
+
+# Responses of the load and generate endpoints are gzip-compressed if the client
+# accepts it and they are at least this large (in bytes); ``None`` switches
+# compression off. Gzip-encoded request bodies are always accepted, up to
+# the given size (in bytes) after decompression.
+
+DINGOS_AUTHORING_COMPRESSION_THRESHOLD = 1024
+
+DINGOS_AUTHORING_MAX_DECOMPRESSED_REQUEST_SIZE = 64*1024*1024
+
+# Autosaves from the editor are buffered in the cache (see ``autosave.py``);
+# every so many seconds, the newest buffered state per report and user
+# is written to the database as an AUTOSAVE revision. Buffered states
+# expire after the given timeout (in seconds).
+#
+# The flusher runs in the Celery worker, so buffering requires a cache
+# shared between processes (see ``DINGOS_AUTHORING_CACHE``); with a
+# process-local cache, autosaves are written to the database right away.
+
+DINGOS_AUTHORING_AUTOSAVE_FLUSH_INTERVAL = 30
+
+DINGOS_AUTHORING_AUTOSAVE_BUFFER_TIMEOUT = 86400
+
+# Maximal number of reports that can be loaded with one request
+# to the batch load endpoint (``GetDraftsJSON``).
+
+DINGOS_AUTHORING_BATCH_LOAD_LIMIT = 100
+
+# Import events (see ``events.py``) are kept in the cache for the given
+# time (in seconds); a connection to the event stream is held open
+# for at most the given time (in seconds), after which the browser reconnects.
+# With a synchronous server, every open stream occupies a worker: keep the
+# timeout short or serve the stream with asynchronous workers (e.g., gevent).
+
+DINGOS_AUTHORING_EVENT_RETENTION = 3600
+
+DINGOS_AUTHORING_EVENT_STREAM_TIMEOUT = 30
+
+# JSON schemas for the reports of the author views, keyed by the name of the
+# author view: either the schema itself or the path of a file containing it.
+# Reports are validated against the schema (see ``validators.py``) before they
+# are saved, released, generated or imported. Validation requires the package
+# ``jsonschema``; without it, reports are only checked to be JSON objects.
+
+DINGOS_AUTHORING_REPORT_SCHEMAS = {}
+
+# Ownership of a report (see ``ReportOwnership``) is a lease which is renewed
+# whenever the owner loads or saves the report; if set, the lease expires after the
+# given time (in seconds) without renewal and the report can be loaded by others.
+# ``None``: ownership does not expire.
+
+DINGOS_AUTHORING_OWNERSHIP_TTL = None
+
+# Objects created by an import are renamed and linked to the import in chunks
+# of the given size, such that large imports are not held in memory at once.
+
+DINGOS_AUTHORING_IMPORT_CHUNK_SIZE = 1000
\ No newline at end of file
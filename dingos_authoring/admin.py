@@ -80,7 +80,7 @@ class GroupNamespaceMapAdmin(admin.ModelAdmin):
 
 class AuthoredDataAdmin(admin.ModelAdmin):
     list_display = ('identifier','timestamp','latest','kind','status','name','user','group')
-    fields = ('kind','status','author_view','identifier','processing_id','name','user','group','timestamp','latest','data')
+    fields = ('kind','status','author_view','identifier','processing_id','processing_error','name','user','group','timestamp','latest','data')
 
 
 
@@ -0,0 +1,170 @@
+# Copyright (c) Siemens AG, 2014
+#
+# This file is part of MANTIS.  MANTIS is free software: you can
+# redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation; either version 2
+# of the License, or(at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Buffer for autosaves of the editor.
+
+Autosaves are written into the cache (see ``DINGOS_AUTHORING_CACHE``) rather
+than the database: the buffer holds the newest state per (group, identifier, user).
+Each autosave also appends the entry's key to a log of pending entries, which
+is numbered by a counter in the cache. The flusher (``tasks.flush_autosaves``)
+reads the log from the position reached by the previous flush and writes the
+newest state of each entry found there as an AUTOSAVE revision -- once, no matter
+how many autosaves have been buffered in between.
+
+The flusher is scheduled by the first autosave after a flush, such that it
+runs every ``DINGOS_AUTHORING_AUTOSAVE_FLUSH_INTERVAL`` seconds as long as
+editors are active.
+"""
+
+import logging
+
+from django.contrib.auth.models import User, Group
+from django.utils import timezone
+
+import dingos_authoring.read_settings
+
+from dingos_authoring import DINGOS_AUTHORING_AUTOSAVE_FLUSH_INTERVAL, DINGOS_AUTHORING_AUTOSAVE_BUFFER_TIMEOUT
+
+from .caching import get_authoring_cache
+from .models import AuthoredData
+
+
+logger = logging.getLogger(__name__)
+
+
+LOG_COUNTER_KEY = 'dingos_authoring:autosave:log_position'
+
+FLUSHED_KEY = 'dingos_authoring:autosave:flushed'
+
+FLUSH_SCHEDULED_KEY = 'dingos_authoring:autosave:scheduled'
+
+FLUSH_LOCK_KEY = 'dingos_authoring:autosave:lock'
+
+
+def _entry_key(group_pk, identifier, user_pk):
+    return 'dingos_authoring:autosave:entry:%s:%s:%s' % (group_pk, user_pk, identifier)
+
+
+def _log_key(position):
+    return 'dingos_authoring:autosave:log:%s' % position
+
+
+def _next_log_position(cache):
+    try:
+        return cache.incr(LOG_COUNTER_KEY)
+    except ValueError:
+        if cache.add(LOG_COUNTER_KEY, 1, None):
+            return 1
+        return cache.incr(LOG_COUNTER_KEY)
+
+
+def buffer_autosave(group, identifier, user, jsn, name, author_view):
+    """
+    Buffer the state ``jsn`` of report ``identifier`` as edited by ``user``.
+    Returns ``True`` if the flusher has to be scheduled.
+    """
+    cache = get_authoring_cache()
+    key = _entry_key(group.pk, identifier, user.pk)
+
+    cache.set(key,
+              {'group': group.pk,
+               'identifier': identifier,
+               'user': user.pk,
+               'jsn': jsn,
+               'name': name,
+               'author_view': author_view,
+               'timestamp': timezone.now()},
+              DINGOS_AUTHORING_AUTOSAVE_BUFFER_TIMEOUT)
+
+    cache.set(_log_key(_next_log_position(cache)), key, DINGOS_AUTHORING_AUTOSAVE_BUFFER_TIMEOUT)
+
+    return cache.add(FLUSH_SCHEDULED_KEY, True, DINGOS_AUTHORING_AUTOSAVE_FLUSH_INTERVAL)
+
+
+def buffered_autosave(group, identifier, user):
+    """
+    Return the buffered state of the report (or ``None``).
+    """
+    return get_authoring_cache().get(_entry_key(group.pk, identifier, user.pk))
+
+
+def flush_autosaves():
+    """
+    Write the newest buffered state of every entry that has been autosaved since
+    the previous flush as AUTOSAVE revision; returns the number of written revisions.
+    """
+    cache = get_authoring_cache()
+
+    if not cache.add(FLUSH_LOCK_KEY, True, DINGOS_AUTHORING_AUTOSAVE_FLUSH_INTERVAL * 10):
+        # Another flush is running
+        return 0
+
+    written = 0
+    try:
+        # Autosaves arriving from now on must schedule the next flush
+        cache.delete(FLUSH_SCHEDULED_KEY)
+
+        # The flushed position is stored together with the positions that
+        # were missing in the log: an autosave may have increased the counter
+        # but not yet written its log entry; such positions are retried once.
+        (flushed, retry) = cache.get(FLUSHED_KEY) or (0, [])
+        last = cache.get(LOG_COUNTER_KEY) or 0
+
+        positions = list(retry) + range(flushed + 1, last + 1)
+        if not positions:
+            return 0
+
+        log_entries = cache.get_many([_log_key(x) for x in positions])
+        missing = [x for x in range(flushed + 1, last + 1) if _log_key(x) not in log_entries]
+
+        entry_keys = set(log_entries.values())
+        entries = cache.get_many(list(entry_keys))
+        flushed_timestamps = cache.get_many(["%s:flushed" % x for x in entries.keys()])
+
+        users = User.objects.in_bulk(set(x['user'] for x in entries.values()))
+        groups = Group.objects.in_bulk(set(x['group'] for x in entries.values()))
+
+        for (key, entry) in entries.items():
+            if entry['user'] not in users or entry['group'] not in groups:
+                continue
+            previous_timestamp = flushed_timestamps.get("%s:flushed" % key)
+            if previous_timestamp and previous_timestamp >= entry['timestamp']:
+                # This state has been written by a previous flush
+                continue
+            try:
+                AuthoredData.object_create(kind=AuthoredData.AUTHORING_JSON,
+                                           status=AuthoredData.AUTOSAVE,
+                                           user=users[entry['user']],
+                                           group=groups[entry['group']],
+                                           identifier=entry['identifier'],
+                                           timestamp=entry['timestamp'],
+                                           name=entry['name'],
+                                           author_view=entry['author_view'],
+                                           data=entry['jsn'])
+                cache.set("%s:flushed" % key, entry['timestamp'], DINGOS_AUTHORING_AUTOSAVE_BUFFER_TIMEOUT)
+                written += 1
+            except Exception, e:
+                logger.error("Autosave of %s for user %s could not be written: %s"
+                             % (entry['identifier'], entry['user'], e))
+
+        cache.delete_many(log_entries.keys())
+        cache.set(FLUSHED_KEY, (last, missing), None)
+    finally:
+        cache.delete(FLUSH_LOCK_KEY)
+
+    return written
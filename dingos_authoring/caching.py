@@ -0,0 +1,308 @@
+# Copyright (c) Siemens AG, 2014
+#
+# This file is part of MANTIS.  MANTIS is free software: you can
+# redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation; either version 2
+# of the License, or(at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+import hashlib, threading, time
+
+from collections import OrderedDict
+from functools import wraps
+
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.signals import request_finished
+from django.db import transaction
+
+import dingos_authoring.read_settings
+
+from dingos_authoring import DINGOS_AUTHORING_STIX_CACHE_SIZE, DINGOS_AUTHORING_STIX_CACHE_TIMEOUT, \
+    DINGOS_AUTHORING_CACHE, DINGOS_AUTHORING_CACHE_TIMEOUT
+
+try:
+    from django.core.cache import caches
+
+    def get_cache(alias):
+        return caches[alias]
+
+except ImportError:
+    # Django < 1.7
+    from django.core.cache import get_cache
+
+
+def get_authoring_cache():
+    """
+    Return the Django cache used for data shared between requests.
+    """
+    return get_cache(DINGOS_AUTHORING_CACHE)
+
+
+def authoring_cache_is_shared():
+    """
+    Whether the authoring cache is shared between processes: invalidations
+    made by writes in one process are not seen by the local-memory caches
+    of other processes.
+    """
+    return not isinstance(get_authoring_cache(), LocMemCache)
+
+
+class LRUCache(object):
+    """
+    Thread-safe, size-bounded in-process cache that evicts the least recently used
+    entry once ``max_entries`` is reached and treats entries older than
+    ``timeout`` seconds as missing.
+    """
+
+    def __init__(self, max_entries, timeout):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                expires, value = self._entries.pop(key)
+            except KeyError:
+                return default
+            if expires < time.time():
+                return default
+            # Re-insert to mark the entry as most recently used
+            self._entries[key] = (expires, value)
+            return value
+
+    def set(self, key, value):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries.pop(key, None)
+            while len(self._entries) >= self.max_entries:
+                self._entries.popitem(last=False)
+            self._entries[key] = (time.time() + self.timeout, value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Cache for the output of the STIX transformers
+
+stix_cache = LRUCache(DINGOS_AUTHORING_STIX_CACHE_SIZE, DINGOS_AUTHORING_STIX_CACHE_TIMEOUT)
+
+
+def stix_cache_key(jsn, author_view, namespace_uri, namespace_slug):
+    key = hashlib.sha256()
+    for part in (jsn, author_view, namespace_uri, namespace_slug):
+        if isinstance(part, unicode):
+            part = part.encode('utf-8')
+        key.update("%s\0" % part)
+    return key.hexdigest()
+
+
+# Cache for the authoring namespace information of users (see
+# ``AuthoringMethodMixin.get_authoring_namespaces``).
+#
+# Changes that concern a single user (e.g., switching the authoring group)
+# invalidate the entry of that user; changes that may concern many users
+# (e.g., changes of namespace mappings) increase a generation counter
+# that is part of all keys.
+
+NAMESPACE_GENERATION_KEY = 'dingos_authoring:namespace_generation'
+
+
+def _namespace_info_key(cache, user_pk):
+    generation = cache.get(NAMESPACE_GENERATION_KEY)
+    if generation is None:
+        generation = 0
+        cache.add(NAMESPACE_GENERATION_KEY, generation, None)
+    return 'dingos_authoring:namespace_info:%s:%s' % (generation, user_pk)
+
+
+def get_cached_namespace_info(user_pk):
+    """
+    Return a tuple ``(found, namespace_info)``.
+    """
+    cache = get_authoring_cache()
+    cached = cache.get(_namespace_info_key(cache, user_pk))
+    if cached is None:
+        return (False, None)
+    return (True, cached[0])
+
+
+def set_cached_namespace_info(user_pk, namespace_info):
+    cache = get_authoring_cache()
+    # We wrap the value, since ``None`` is a valid result.
+    cache.set(_namespace_info_key(cache, user_pk), (namespace_info,), DINGOS_AUTHORING_CACHE_TIMEOUT)
+
+
+def invalidate_namespace_info(user_pk=None):
+    """
+    Invalidate the cached namespace information of the given user
+    or, if no user is given, of all users.
+    """
+    cache = get_authoring_cache()
+    if user_pk is None:
+        try:
+            cache.incr(NAMESPACE_GENERATION_KEY)
+        except ValueError:
+            cache.add(NAMESPACE_GENERATION_KEY, 1, None)
+    else:
+        cache.delete(_namespace_info_key(cache, user_pk))
+
+
+# Generation counters
+#
+# Cached data derived from the AuthoredData objects of a scope
+# (e.g., an authoring group) includes the scope's generation in its key;
+# every write to AuthoredData increases the generation of the affected
+# scopes (see the signal receivers in ``models.py``), such that
+# stale entries are never served and need not be removed explicitly.
+
+def _generation_key(scope):
+    return 'dingos_authoring:generation:%s' % scope
+
+
+def get_generation(scope):
+    cache = get_authoring_cache()
+    generation = cache.get(_generation_key(scope))
+    if generation is None:
+        generation = 0
+        cache.add(_generation_key(scope), generation, None)
+    return generation
+
+
+def bump_generation(scope):
+    cache = get_authoring_cache()
+    try:
+        cache.incr(_generation_key(scope))
+    except ValueError:
+        cache.add(_generation_key(scope), 1, None)
+
+
+# Cached counts for the counting paginator
+#
+# Counts are kept per authoring group and 'signature' describing the list
+# (and possibly the filters) that is counted. Counts of unfiltered lists
+# are cached under a generation of their own, which the write paths increase
+# whenever the count changes (see ``invalidate_cached_count``); counts of
+# filtered lists are invalidated via the group's generation.
+#
+# Since the key (and thus the generation) is determined before counting,
+# a count computed concurrently with a write is stored under the old
+# generation and never served once the write has been committed.
+
+def count_cache_key(group_pk, signature, incremental=True):
+    if incremental:
+        return 'dingos_authoring:count:%s:%s:%s' % (group_pk,
+                                                    get_generation('count:%s:%s' % (group_pk, signature)),
+                                                    signature)
+    else:
+        return 'dingos_authoring:count:%s:%s:%s' % (group_pk, get_generation('group:%s' % group_pk), signature)
+
+
+def invalidate_cached_count(group_pk, signature):
+    """
+    Invalidate the cached count of an unfiltered list after a write that changes it;
+    the count is computed once more when it is required. As for cached lists, the
+    invalidation is repeated after the commit of the current transaction (see
+    ``bump_generation_on_commit``), such that a count of the data before the
+    write, or of data that is rolled back, does not survive.
+    """
+    bump_generation_on_commit('count:%s:%s' % (group_pk, signature))
+
+
+# Cached pages of list views
+#
+# Pages are cached under the generation of their scope (the authoring group
+# or the user whose data is listed), such that every write to AuthoredData
+# invalidates the pages of the affected scopes without sweeping the cache
+# (see ``CachedListMixin``).
+
+def list_cache_key(scope, signature):
+    if isinstance(signature, unicode):
+        signature = signature.encode('utf-8')
+    return 'dingos_authoring:list:%s:%s:%s' % (scope,
+                                               get_generation(scope),
+                                               hashlib.sha1(signature).hexdigest())
+
+
+# Scopes whose generation has been increased within the current transaction
+# (Django < 1.9, see ``bump_generation_on_commit``)
+
+_pending_generations = threading.local()
+
+
+def _pending_scopes():
+    scopes = getattr(_pending_generations, 'scopes', None)
+    if scopes is None:
+        scopes = _pending_generations.scopes = set()
+    return scopes
+
+
+def bump_generation_on_commit(scope):
+    """
+    Increase the generation of ``scope`` now and once more after the current
+    transaction has been committed: data cached by concurrent requests between
+    the write and the commit thus does not survive.
+
+    With ``transaction.on_commit`` (Django >= 1.9), the second increase is
+    registered there; otherwise, the scope is remembered and increased once
+    the outermost atomic block has been left (see ``atomic_with_invalidation``)
+    or, for transactions opened elsewhere (e.g., ``ATOMIC_REQUESTS``), when
+    the request has finished.
+    """
+    bump_generation(scope)
+    on_commit = getattr(transaction, 'on_commit', None)
+    if on_commit:
+        on_commit(lambda: bump_generation(scope))
+    elif transaction.get_connection().in_atomic_block:
+        _pending_scopes().add(scope)
+
+
+def bump_pending_generations(**kwargs):
+    """
+    Increase the generations remembered by ``bump_generation_on_commit``,
+    unless a transaction is still open.
+    """
+    if transaction.get_connection().in_atomic_block:
+        return
+    scopes = _pending_scopes()
+    while scopes:
+        bump_generation(scopes.pop())
+
+request_finished.connect(bump_pending_generations)
+
+
+class atomic_with_invalidation(object):
+    """
+    Context manager and decorator like ``transaction.atomic`` for code that
+    writes AuthoredData: when the outermost block is left, the generations
+    increased within it are increased once more (see ``bump_generation_on_commit``).
+    """
+
+    def __enter__(self):
+        self._atomic = transaction.atomic()
+        return self._atomic.__enter__()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            return self._atomic.__exit__(exc_type, exc_value, traceback)
+        finally:
+            bump_pending_generations()
+
+    def __call__(self, func):
+        @wraps(func)
+        def inner(*args, **kwargs):
+            with atomic_with_invalidation():
+                return func(*args, **kwargs)
+        return inner
@@ -0,0 +1,98 @@
+# Copyright (c) Siemens AG, 2014
+#
+# This file is part of MANTIS.  MANTIS is free software: you can
+# redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation; either version 2
+# of the License, or(at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Compressed transfer of report payloads: gzip-encoded request bodies are
+decompressed before the view reads ``request.POST``, and responses are
+compressed if the client accepts gzip and the response is large enough
+(see ``DINGOS_AUTHORING_COMPRESSION_THRESHOLD``).
+"""
+
+import re, zlib
+
+from django.http import QueryDict
+from django.utils.cache import patch_vary_headers
+from django.utils.datastructures import MultiValueDict
+from django.utils.text import compress_string
+
+import dingos_authoring.read_settings
+
+from dingos_authoring import DINGOS_AUTHORING_COMPRESSION_THRESHOLD, DINGOS_AUTHORING_MAX_DECOMPRESSED_REQUEST_SIZE
+
+
+_accepts_gzip_re = re.compile(r'\bgzip\b')
+
+
+class DecompressionError(StandardError):
+    pass
+
+
+def _gunzip(data, max_size):
+    # wbits = 16 + MAX_WBITS: expect a gzip header
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    try:
+        result = decompressor.decompress(data, max_size)
+    except zlib.error, e:
+        raise DecompressionError("Invalid gzip data: %s" % e)
+    if decompressor.unconsumed_tail:
+        raise DecompressionError("Decompressed request exceeds %s bytes" % max_size)
+    return result
+
+
+def decompress_request(request):
+    """
+    If the body of ``request`` is gzip-encoded, decompress it and parse
+    the form data contained in it into ``request.POST``.
+    """
+    if request.META.get('HTTP_CONTENT_ENCODING', '').strip().lower() != 'gzip':
+        return
+    body = _gunzip(request.body, DINGOS_AUTHORING_MAX_DECOMPRESSED_REQUEST_SIZE)
+    if request.META.get('CONTENT_TYPE', '').startswith('application/x-www-form-urlencoded'):
+        request._post = QueryDict(body, encoding=request.encoding)
+        request._files = MultiValueDict()
+    request._body = body
+
+
+def compress_response(request, response):
+    """
+    Compress the content of ``response`` if the client accepts gzip and the
+    content is at least as large as the configured threshold.
+    """
+    if DINGOS_AUTHORING_COMPRESSION_THRESHOLD is None:
+        return response
+    if getattr(response, 'streaming', False) or response.has_header('Content-Encoding') \
+            or response.status_code != 200:
+        return response
+
+    patch_vary_headers(response, ('Accept-Encoding',))
+
+    if len(response.content) < DINGOS_AUTHORING_COMPRESSION_THRESHOLD:
+        return response
+    if not _accepts_gzip_re.search(request.META.get('HTTP_ACCEPT_ENCODING', '')):
+        return response
+
+    compressed = compress_string(response.content)
+    if len(compressed) >= len(response.content):
+        return response
+
+    response.content = compressed
+    response['Content-Length'] = str(len(compressed))
+    response['Content-Encoding'] = 'gzip'
+    if response.has_header('ETag') and response['ETag'].startswith('"'):
+        # The compressed representation is not byte-identical to the original one
+        response['ETag'] = 'W/' + response['ETag']
+    return response
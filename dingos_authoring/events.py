@@ -0,0 +1,186 @@
+# Copyright (c) Siemens AG, 2014
+#
+# This file is part of MANTIS.  MANTIS is free software: you can
+# redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation; either version 2
+# of the License, or(at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Events about the progress of imports, published per authoring group and per
+user and served to the browser by ``ImportEventsView``.
+
+Events are appended to a log per scope (``group:<pk>`` or ``user:<pk>``)
+that is kept in the cache (see ``DINGOS_AUTHORING_CACHE``) and numbered by
+a counter, so that the Celery workers and all web processes share them and
+a client can resume after the last event it has seen. Within a process,
+subscribers are woken up immediately by a local pub/sub (``LocalPubSub``);
+events published by other processes are picked up by polling the counter,
+which is a single cache lookup per second and stream.
+
+The counter is increased before the event is written, so a reader may see
+the position of an event that is not there yet: readers stop before such
+a gap and retry it, unless a later event has been written long enough ago
+(``GAP_GRACE``), in which case the event is considered lost.
+
+If the cache is local to the process (e.g., when running without a broker
+and with ``CELERY_ALWAYS_EAGER``), the local pub/sub alone delivers the events.
+
+The state of each running import is kept next to the log (``import_state``),
+so that the list of imports need not ask the result backend.
+"""
+
+import json, threading, time
+
+import dingos_authoring.read_settings
+
+from dingos_authoring import DINGOS_AUTHORING_EVENT_RETENTION
+
+from .caching import get_authoring_cache
+
+
+# Maximal number of events delivered to a client that lags behind
+
+MAX_EVENTS = 100
+
+POLL_INTERVAL = 1
+
+# Time (in seconds) after which an event missing from the log is skipped,
+# if later events exist
+
+GAP_GRACE = 5
+
+
+class LocalPubSub(object):
+    """
+    In-process publish/subscribe on named channels.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._versions = {}
+
+    def publish(self, channel):
+        with self._condition:
+            self._versions[channel] = self._versions.get(channel, 0) + 1
+            self._condition.notify_all()
+
+    def version(self, channel):
+        with self._condition:
+            return self._versions.get(channel, 0)
+
+    def wait(self, channel, version, timeout):
+        """
+        Wait until something is published on ``channel`` after ``version``
+        has been read or until ``timeout`` seconds have passed.
+        """
+        deadline = time.time() + timeout
+        with self._condition:
+            while self._versions.get(channel, 0) == version:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+            return True
+
+
+local_pubsub = LocalPubSub()
+
+
+def _position_key(scope):
+    return 'dingos_authoring:events:%s:position' % scope
+
+
+def _event_key(scope, position):
+    return 'dingos_authoring:events:%s:%s' % (scope, position)
+
+
+def current_position(scope):
+    return get_authoring_cache().get(_position_key(scope)) or 0
+
+
+def publish(scope, event_type, data):
+    """
+    Append an event to the log of ``scope``.
+    """
+    cache = get_authoring_cache()
+    key = _position_key(scope)
+    try:
+        position = cache.incr(key)
+    except ValueError:
+        if cache.add(key, 1, None):
+            position = 1
+        else:
+            position = cache.incr(key)
+    cache.set(_event_key(scope, position),
+              {'id': position, 'type': event_type, 'data': data, 'time': time.time()},
+              DINGOS_AUTHORING_EVENT_RETENTION)
+    local_pubsub.publish(scope)
+    return position
+
+
+def events_since(scope, last_id):
+    """
+    Return the events of ``scope`` after the event with id ``last_id``
+    (at most ``MAX_EVENTS`` of them), up to the first event that
+    has been counted but not yet written.
+    """
+    position = current_position(scope)
+    if position <= last_id:
+        return []
+    first = max(last_id + 1, position - MAX_EVENTS + 1)
+    keys = [_event_key(scope, x) for x in range(first, position + 1)]
+    found = get_authoring_cache().get_many(keys)
+
+    result = []
+    for (index, key) in enumerate(keys):
+        if key in found:
+            result.append(found[key])
+            continue
+        later = [found[x] for x in keys[index + 1:] if x in found]
+        if not later or time.time() - later[0].get('time', 0) <= GAP_GRACE:
+            break
+    return result
+
+
+def wait_for_events(scope, last_id, timeout):
+    """
+    Return the events after ``last_id``, waiting up to ``timeout``
+    seconds for new events if there are none.
+    """
+    deadline = time.time() + timeout
+    while True:
+        version = local_pubsub.version(scope)
+        events = events_since(scope, last_id)
+        remaining = deadline - time.time()
+        if events or remaining <= 0:
+            return events
+        local_pubsub.wait(scope, version, min(POLL_INTERVAL, remaining))
+
+
+def format_sse(event):
+    return "id: %s\nevent: %s\ndata: %s\n\n" % (event['id'], event['type'], json.dumps(event['data']))
+
+
+def _import_state_key(import_pk):
+    return 'dingos_authoring:events:import:%s:state' % import_pk
+
+
+def set_import_state(import_pk, state):
+    get_authoring_cache().set(_import_state_key(import_pk), state, DINGOS_AUTHORING_EVENT_RETENTION)
+
+
+def import_state(import_pk):
+    """
+    Return the state of import ``import_pk`` as published last (or ``None``).
+    """
+    return get_authoring_cache().get(_import_state_key(import_pk))
@@ -0,0 +1,159 @@
+# Copyright (c) Siemens AG, 2014
+#
+# This file is part of MANTIS.  MANTIS is free software: you can
+# redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation; either version 2
+# of the License, or(at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Export of the metadata (and optionally the payloads) of AuthoredData objects
+as NDJSON or CSV.
+
+Rows are read in chunks of ``DINGOS_AUTHORING_EXPORT_CHUNK_SIZE`` by seeking
+on the primary key and written out one line at a time, such that
+memory does not grow with the number of exported objects. The generators
+defined here are used both by ``ExportView`` (streaming response) and the
+``dingos_authoring_export`` management command.
+"""
+
+import csv, json
+
+from StringIO import StringIO
+
+import dingos_authoring.read_settings
+
+from dingos_authoring import DINGOS_AUTHORING_EXPORT_CHUNK_SIZE
+
+from .models import AuthoredData
+
+
+EXPORT_FORMATS = ('ndjson', 'csv')
+
+EXPORT_SCOPES = ('imports', 'history')
+
+EXPORT_FIELDS = (('id', 'pk'),
+                 ('identifier', 'identifier__name'),
+                 ('name', 'name'),
+                 ('kind', 'kind'),
+                 ('status', 'status'),
+                 ('group', 'group__name'),
+                 ('user', 'user__username'),
+                 ('timestamp', 'timestamp'),
+                 ('latest', 'latest'),
+                 ('processing_id', 'processing_id'),
+                 ('processing_error', 'processing_error'),
+                 ('yielded', 'yielded_id'),
+                 ('top_level_iobject', 'top_level_iobject_id'))
+
+CONTENT_TYPES = {'ndjson': 'application/x-ndjson',
+                 'csv': 'text/csv'}
+
+_KIND_NAMES = dict(AuthoredData.DATA_KIND)
+
+_STATUS_NAMES = dict(AuthoredData.STATUS)
+
+
+def export_queryset(group, scope='imports', identifier=None):
+    """
+    Return the AuthoredData objects of ``group`` to be exported: for scope
+    ``imports`` the XML imports, for scope ``history`` all revisions
+    except autosaves, optionally restricted to the report ``identifier``.
+    """
+    if scope not in EXPORT_SCOPES:
+        raise ValueError("Unknown export scope '%s'" % scope)
+    queryset = AuthoredData.objects.filter(group=group)
+    if scope == 'imports':
+        queryset = queryset.filter(kind=AuthoredData.XML, status=AuthoredData.IMPORTED)
+    else:
+        queryset = queryset.exclude(status=AuthoredData.AUTOSAVE)
+    if identifier:
+        queryset = queryset.filter(identifier__name=identifier)
+    return queryset
+
+
+def export_fields(with_data=False):
+    fields = [x for (x, y) in EXPORT_FIELDS]
+    if with_data:
+        fields.append('data')
+    return fields
+
+
+def export_rows(queryset, with_data=False, chunk_size=None):
+    """
+    Yield a dictionary per object in ``queryset`` (in order of primary keys),
+    reading the database in chunks of ``chunk_size`` rows.
+    """
+    chunk_size = chunk_size or DINGOS_AUTHORING_EXPORT_CHUNK_SIZE
+    lookups = [y for (x, y) in EXPORT_FIELDS]
+    if with_data:
+        lookups.append('data')
+    fields = export_fields(with_data)
+
+    queryset = queryset.order_by('pk').values_list(*lookups)
+
+    last_pk = None
+    while True:
+        chunk = queryset
+        if last_pk is not None:
+            chunk = chunk.filter(pk__gt=last_pk)
+        chunk = list(chunk[:chunk_size])
+        for values in chunk:
+            row = dict(zip(fields, values))
+            row['kind'] = _KIND_NAMES.get(row['kind'], row['kind'])
+            row['status'] = _STATUS_NAMES.get(row['status'], row['status'])
+            row['timestamp'] = row['timestamp'].isoformat()
+            yield row
+        if len(chunk) < chunk_size:
+            break
+        last_pk = chunk[-1][0]
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps(row) + "\n"
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, unicode):
+        return value.encode('utf-8')
+    return value
+
+
+def csv_lines(rows, fields):
+    buf = StringIO()
+    writer = csv.writer(buf)
+
+    def line(values):
+        writer.writerow(values)
+        result = buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+        return result
+
+    yield line(fields)
+    for row in rows:
+        yield line([_csv_value(row[x]) for x in fields])
+
+
+def export_lines(queryset, format='ndjson', with_data=False, chunk_size=None):
+    """
+    Yield the lines of the export of ``queryset`` in the given format.
+    """
+    if format not in EXPORT_FORMATS:
+        raise ValueError("Unknown export format '%s'" % format)
+    rows = export_rows(queryset, with_data=with_data, chunk_size=chunk_size)
+    if format == 'csv':
+        return csv_lines(rows, export_fields(with_data))
+    return ndjson_lines(rows)
@@ -1,14 +1,28 @@
 import django_filters
 
-from .models import AuthoredData
+from .models import AuthoredData, ReportSummary
 
 from dingos.filter import ExtendedDateRangeFilter, create_order_keyword_list
 
+from .search import search_reports
+
+
+class FullTextFilter(django_filters.CharFilter):
+    """
+    Filter for reports whose latest revision contains the given words
+    in its name or content (see ``search.py``).
+    """
+
+    def filter(self, qs, value):
+        return search_reports(qs, value)
+
 class ImportFilter(django_filters.FilterSet):
 
     name = django_filters.CharFilter(lookup_type='icontains',
                                      label='Name contains')
 
+    search = FullTextFilter(label='Report contains')
+
     kind = django_filters.ChoiceFilter(choices=list(AuthoredData.DATA_KIND) + [('','Any kind')],required=False)
 
     timestamp = ExtendedDateRangeFilter(label="Import Timestamp")
@@ -23,6 +37,8 @@ class AuthoringObjectFilter(django_filters.FilterSet):
     name = django_filters.CharFilter(lookup_type='icontains',
                                      label='Name contains')
 
+    search = FullTextFilter(label='Report contains')
+
     timestamp = ExtendedDateRangeFilter(label="Import Timestamp")
 
 
@@ -34,7 +50,19 @@ class AuthoringObjectFilter(django_filters.FilterSet):
         fields = ['timestamp','name','status','user']
 
 
+class ReportSummaryFilter(django_filters.FilterSet):
+
+    name = django_filters.CharFilter(lookup_type='icontains',
+                                     label='Name contains')
 
+    search = FullTextFilter(label='Report contains')
 
+    timestamp = ExtendedDateRangeFilter(label="Timestamp")
 
 
+    status = django_filters.ChoiceFilter(choices=list(AuthoredData.STATUS_WO_AUTOSAVE) + [('','Any status')],required=False)
+
+    class Meta:
+        order_by = create_order_keyword_list(['user','timestamp','name','status'])
+        model = ReportSummary
+        fields = ['timestamp','name','status','user']
@@ -0,0 +1,137 @@
+# Copyright (c) Siemens AG, 2014
+#
+# This file is part of MANTIS.  MANTIS is free software: you can
+# redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation; either version 2
+# of the License, or(at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Application of JSON patches (RFC 6902) with JSON pointers (RFC 6901),
+used for saving reports by sending the changes made in the editor
+rather than the complete report.
+"""
+
+import copy
+
+
+class JSONPatchError(StandardError):
+    pass
+
+
+def _parse_pointer(pointer):
+    if not isinstance(pointer, basestring):
+        raise JSONPatchError("Invalid pointer %r" % (pointer,))
+    if pointer == '':
+        return []
+    if not pointer.startswith('/'):
+        raise JSONPatchError("Invalid pointer '%s'" % pointer)
+    return [x.replace('~1', '/').replace('~0', '~') for x in pointer[1:].split('/')]
+
+
+def _array_index(container, token, allow_end=False):
+    if token == '-' and allow_end:
+        return len(container)
+    if not token.isdigit() or (len(token) > 1 and token.startswith('0')):
+        raise JSONPatchError("Invalid array index '%s'" % token)
+    index = int(token)
+    if index > len(container) or (index == len(container) and not allow_end):
+        raise JSONPatchError("Array index %s out of range" % index)
+    return index
+
+
+def _resolve(document, tokens):
+    for token in tokens:
+        if isinstance(document, dict):
+            if token not in document:
+                raise JSONPatchError("Member '%s' does not exist" % token)
+            document = document[token]
+        elif isinstance(document, list):
+            document = document[_array_index(document, token)]
+        else:
+            raise JSONPatchError("Cannot descend into a scalar value at '%s'" % token)
+    return document
+
+
+def _add(document, tokens, value):
+    if not tokens:
+        return value
+    parent = _resolve(document, tokens[:-1])
+    token = tokens[-1]
+    if isinstance(parent, dict):
+        parent[token] = value
+    elif isinstance(parent, list):
+        parent.insert(_array_index(parent, token, allow_end=True), value)
+    else:
+        raise JSONPatchError("Cannot add a member to a scalar value")
+    return document
+
+
+def _remove(document, tokens):
+    if not tokens:
+        raise JSONPatchError("Cannot remove the whole document")
+    parent = _resolve(document, tokens[:-1])
+    token = tokens[-1]
+    if isinstance(parent, dict):
+        if token not in parent:
+            raise JSONPatchError("Member '%s' does not exist" % token)
+        return parent.pop(token)
+    elif isinstance(parent, list):
+        return parent.pop(_array_index(parent, token))
+    raise JSONPatchError("Cannot remove a member from a scalar value")
+
+
+def apply_patch(document, patch):
+    """
+    Apply the list of operations ``patch`` to ``document`` (which is
+    modified in place, where possible) and return the resulting document.
+    Raises ``JSONPatchError`` if the patch is invalid or cannot be applied.
+    """
+    if not isinstance(patch, list):
+        raise JSONPatchError("A patch must be a list of operations")
+
+    for operation in patch:
+        if not isinstance(operation, dict) or 'op' not in operation or 'path' not in operation:
+            raise JSONPatchError("Invalid operation %r" % (operation,))
+        op = operation['op']
+        tokens = _parse_pointer(operation['path'])
+
+        if op in ('add', 'replace', 'test') and 'value' not in operation:
+            raise JSONPatchError("Operation '%s' requires a value" % op)
+        if op in ('move', 'copy'):
+            if 'from' not in operation:
+                raise JSONPatchError("Operation '%s' requires 'from'" % op)
+            from_tokens = _parse_pointer(operation['from'])
+
+        if op == 'add':
+            document = _add(document, tokens, copy.deepcopy(operation['value']))
+        elif op == 'remove':
+            _remove(document, tokens)
+        elif op == 'replace':
+            if tokens:
+                _remove(document, tokens)
+            document = _add(document, tokens, copy.deepcopy(operation['value']))
+        elif op == 'move':
+            if tokens[:len(from_tokens)] == from_tokens and tokens != from_tokens:
+                raise JSONPatchError("Cannot move a value into itself")
+            if tokens != from_tokens:
+                value = _remove(document, from_tokens)
+                document = _add(document, tokens, value)
+        elif op == 'copy':
+            document = _add(document, tokens, copy.deepcopy(_resolve(document, from_tokens)))
+        elif op == 'test':
+            if _resolve(document, tokens) != operation['value']:
+                raise JSONPatchError("Test of '%s' failed" % operation['path'])
+        else:
+            raise JSONPatchError("Unknown operation '%s'" % op)
+
+    return document
@@ -0,0 +1,95 @@
+# Copyright (c) Siemens AG, 2014
+#
+# This file is part of MANTIS.  MANTIS is free software: you can
+# redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation; either version 2
+# of the License, or(at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+import sys
+
+from optparse import make_option
+
+from django.contrib.auth.models import Group
+from django.core.exceptions import ObjectDoesNotExist
+from django.core.management.base import BaseCommand, CommandError
+
+from dingos_authoring.export import export_queryset, export_lines, EXPORT_FORMATS, EXPORT_SCOPES
+
+
+class Command(BaseCommand):
+    """
+    This class implements the command for exporting the imports or
+    the history of reports of an authoring group as NDJSON or CSV.
+    """
+    args = 'authoring-group'
+    help = 'Exports the imports or report history of an authoring group as NDJSON or CSV'
+
+    option_list = BaseCommand.option_list + (
+        make_option('-f', '--format',
+                    action='store',
+                    dest='format',
+                    default='ndjson',
+                    help="""Output format: %s (default: ndjson)""" % ", ".join(EXPORT_FORMATS)),
+        make_option('-s', '--scope',
+                    action='store',
+                    dest='scope',
+                    default='imports',
+                    help="""Exported objects: %s (default: imports)""" % ", ".join(EXPORT_SCOPES)),
+        make_option('-i', '--identifier',
+                    action='store',
+                    dest='identifier',
+                    default=None,
+                    help="""Restrict the export to the report with the given identifier"""),
+        make_option('-d', '--data',
+                    action='store_true',
+                    dest='data',
+                    default=False,
+                    help="""Include the payloads (JSON/XML) of the exported objects"""),
+        make_option('-o', '--output',
+                    action='store',
+                    dest='output',
+                    default=None,
+                    help="""Output file (default: standard output)"""),
+    )
+
+    def handle(self, *args, **options):
+        if len(args) != 1:
+            raise CommandError('Please specify exactly one authoring group.')
+
+        if options['format'] not in EXPORT_FORMATS:
+            raise CommandError("Unknown format '%s'" % options['format'])
+        if options['scope'] not in EXPORT_SCOPES:
+            raise CommandError("Unknown scope '%s'" % options['scope'])
+
+        try:
+            group = Group.objects.get(name=args[0])
+        except ObjectDoesNotExist:
+            raise CommandError("Authoring group '%s' does not exist" % args[0])
+
+        queryset = export_queryset(group,
+                                   scope=options['scope'],
+                                   identifier=options['identifier'])
+
+        if options['output']:
+            out = open(options['output'], 'wb')
+        else:
+            out = sys.stdout
+
+        try:
+            for line in export_lines(queryset,
+                                     format=options['format'],
+                                     with_data=options['data']):
+                out.write(line)
+        finally:
+            if options['output']:
+                out.close()
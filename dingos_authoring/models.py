@@ -16,11 +16,20 @@
 #
 
 
+import hashlib
+import json
 import logging
 import pprint
+from collections import OrderedDict
+from datetime import timedelta
 from django.utils import timezone
 
-from django.db import models
+import sys
+
+from django.db import models, connections, transaction, IntegrityError
+from django.db.models import Q
+from django.db.models.signals import post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver
 
 from django.contrib.auth.models import User, Group
 
@@ -30,6 +39,13 @@ from dingos.models import IdentifierNameSpace, InfoObject
 
 import dingos_authoring.read_settings
 
+from dingos_authoring import DINGOS_AUTHORING_OWNERSHIP_TTL, DINGOS_AUTHORING_IMPORT_CHUNK_SIZE
+
+from dingos_authoring.caching import invalidate_namespace_info, invalidate_cached_count, bump_generation_on_commit, \
+    atomic_with_invalidation
+
+from dingos_authoring.search import extract_text, create_search_index
+
 
 
 
@@ -121,6 +137,44 @@ class UserAuthoringInfo(models.Model):
 
 
 
+class ReportSearchEntry(models.Model):
+    """
+    Searchable text of the latest revision of a report; a full-text
+    index is created on top of the table (see ``search.py``).
+    """
+
+    group = models.ForeignKey(Group)
+
+    identifier = models.ForeignKey(Identifier)
+
+    name = models.CharField(max_length=256)
+
+    body = models.TextField(blank=True)
+
+    def __unicode__(self):
+        return "%s" % self.name
+
+    class Meta:
+        unique_together = ("group",
+                           "identifier")
+
+    @staticmethod
+    def update_for(obj):
+        """
+        Update the search entry of the report with the content of ``obj``,
+        which must be the latest revision of the report.
+        """
+        body = extract_text(obj.data)
+        updated = ReportSearchEntry.objects.filter(group_id=obj.group_id,
+                                                   identifier_id=obj.identifier_id).update(name=obj.name,
+                                                                                           body=body)
+        if not updated:
+            ReportSearchEntry.objects.create(group_id=obj.group_id,
+                                             identifier_id=obj.identifier_id,
+                                             name=obj.name,
+                                             body=body)
+
+
 class AuthoredData(models.Model):
     """
 
@@ -161,15 +215,29 @@ class AuthoredData(models.Model):
 
     processing_id = models.CharField(max_length=128,blank=True)
 
+    processing_error = models.TextField(blank=True,
+                                        help_text="""Reason for the failure of an import""")
+
+    processed = models.DateTimeField(null=True,
+                                     help_text="""Time at which the import has finished""")
+
     name = models.CharField(max_length=256)
 
     data = models.TextField(blank=True)
 
+    content_hash = models.CharField(max_length=64,
+                                    blank=True,
+                                    help_text="""SHA256 of the data; set when saving""")
+
+    # The user who saved the revision. This is not necessarily the owner of
+    # the report, which is recorded in ``ReportOwnership`` (before migration
+    # 0020, taking a report copied its latest revision with the new owner as user).
+
     user = models.ForeignKey(User,null=True)
 
     group = models.ForeignKey(Group)
 
-    timestamp = models.DateTimeField()
+    timestamp = models.DateTimeField(db_index=True)
 
     latest = models.BooleanField(default=False)
 
@@ -186,14 +254,16 @@ class AuthoredData(models.Model):
 
     @property
     def import_status(self):
-        if self.processing_id:
-            import dingos_authoring.tasks as our_tasks
-            result = our_tasks.scheduled_import.AsyncResult(self.processing_id)
-            if result:
-                return result.status
-            else:
-                return 'n/a'
-
+        # The outcome of finished imports is recorded in the object itself;
+        # the state of running imports is taken from the import events
+        # (see ``events.py``), which are kept in the cache.
+        if self.top_level_iobject_id or (self.processed and not self.processing_error):
+            return 'SUCCESS'
+        elif self.processing_error:
+            return 'FAILURE'
+        elif self.processing_id:
+            from dingos_authoring.events import import_state
+            return import_state(self.pk) or 'PENDING'
         else:
             return 'n/a'
 
@@ -225,6 +295,31 @@ class AuthoredData(models.Model):
     def __unicode__(self):
         return "%s " % (self.name)
 
+    @staticmethod
+    def serialize_report(document):
+        """
+        Serialize the parsed report ``document`` in the canonical form in which
+        reports are stored: reports sent completely and reports resulting from
+        a JSON patch thus have the same content hash if their content is equal.
+        """
+        return json.dumps(document, sort_keys=True, separators=(',',':'))
+
+    @staticmethod
+    def hash_content(data):
+        if isinstance(data,unicode):
+            data = data.encode('utf-8')
+        return hashlib.sha256(data or '').hexdigest()
+
+    def save(self, *args, **kwargs):
+        # The content hash allows to detect changes without loading the data
+        # (see ``BasicProcessingView.post``); it must be kept in sync on every write.
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'data' in update_fields:
+            self.content_hash = AuthoredData.hash_content(self.data)
+            if update_fields is not None and 'content_hash' not in update_fields:
+                kwargs['update_fields'] = list(update_fields) + ['content_hash']
+        super(AuthoredData,self).save(*args, **kwargs)
+
     class Meta:
         unique_together = ("group",
                            "user",
@@ -233,7 +328,75 @@ class AuthoredData(models.Model):
                            "timestamp")
 
 
+    def link_yielded_iobjects(self,iobject_pks,chunk_size=None):
+        """
+        Record that the InfoObjects with the primary keys ``iobject_pks`` have been
+        yielded by this import. The links are written in chunks straight into the
+        through table, so no InfoObjects are loaded; existing links are skipped.
+        """
+        chunk_size = chunk_size or DINGOS_AUTHORING_IMPORT_CHUNK_SIZE
+        field = AuthoredData._meta.get_field('yielded_iobjects')
+        through = field.rel.through
+        source = '%s_id' % field.m2m_field_name()
+        target = '%s_id' % field.m2m_reverse_field_name()
+
+        iobject_pks = sorted(set(iobject_pks))
+
+        for i in range(0,len(iobject_pks),chunk_size):
+            chunk = iobject_pks[i:i+chunk_size]
+            existing = set(through.objects.filter(**{source: self.pk,
+                                                     '%s__in' % target: chunk}).values_list(target,flat=True))
+            through.objects.bulk_create([through(**{source: self.pk, target: x})
+                                         for x in chunk if x not in existing])
+
+    # Revisions are identified towards the editor by a token, which is used
+    # as ETag when loading a report and as base of JSON-patch saves.
+
+    @staticmethod
+    def make_revision_token(pk,timestamp):
+        return "%s-%s" % (pk,timestamp.isoformat())
+
+    @property
+    def revision_token(self):
+        return AuthoredData.make_revision_token(self.pk,self.timestamp)
+
+    # Signatures under which the counts of the list of reports and
+    # of the history of a report are cached (see ``CachedCountMixin``)
+
+    REPORT_COUNT_SIGNATURE = 'reports'
+
+    @staticmethod
+    def history_count_signature(identifier_name):
+        if isinstance(identifier_name,unicode):
+            identifier_name = identifier_name.encode('utf-8')
+        return 'history:%s' % hashlib.sha1(identifier_name).hexdigest()
+
+    @staticmethod
+    def is_listed_report(kind,status):
+        """
+        Does a latest object with given kind and status appear in the list of reports?
+        """
+        return kind == AuthoredData.AUTHORING_JSON and status in (AuthoredData.DRAFT,
+                                                                   AuthoredData.UPDATE,
+                                                                   AuthoredData.IMPORTED)
+
+    @staticmethod
+    def _invalidate_cached_counts(obj,identifier_name,previous_latest):
+        """
+        Invalidate the cached counts of the list of reports and of the history of
+        the report that change by writing ``obj``; ``previous_latest``
+        contains kind and status of the objects that were latest before.
+        """
+        if obj.latest:
+            delta = int(AuthoredData.is_listed_report(obj.kind,obj.status)) \
+                    - len([x for x in previous_latest if AuthoredData.is_listed_report(*x)])
+            if delta:
+                invalidate_cached_count(obj.group_id,AuthoredData.REPORT_COUNT_SIGNATURE)
+        invalidate_cached_count(obj.group_id,AuthoredData.history_count_signature(identifier_name))
+
+
     @staticmethod
+    @atomic_with_invalidation()
     def object_copy(obj,**kwargs):
         """
         Copy a AuthoredData object with modifications as specified by key-value arguments
@@ -247,6 +410,8 @@ class AuthoredData(models.Model):
 
         kwargs['latest'] = False
 
+        previous_latest = []
+
         # If no timestamp is provided in the kwargs, we default to now
 
         timestamp = kwargs.get('timestamp',timezone.now())
@@ -260,8 +425,8 @@ class AuthoredData(models.Model):
         # We retrieve the existing objects with same group and identifier
         #
 
-        existing_objs = AuthoredData.objects.filter(group=obj.group,
-                                                    identifier=obj.identifier)
+        existing_objs = AuthoredData.objects.filter(group_id=obj.group_id,
+                                                    identifier_id=obj.identifier_id)
 
         # We now find out how we have to set the  ``latest`` attribute
 
@@ -278,6 +443,7 @@ class AuthoredData(models.Model):
                 # The new object will be the most recent object, so we set the attribute
                 # and remove a possible ``latest=True`` from all existing objects.
                 kwargs['latest'] = True
+                previous_latest = list(existing_objs.filter(latest=True).values_list('kind','status'))
                 existing_objs.update(latest=False)
             else:
                 kwargs['latest'] = False
@@ -298,12 +464,24 @@ class AuthoredData(models.Model):
 
         obj.save()
 
+        AuthoredData._invalidate_cached_counts(obj,obj.identifier.name,previous_latest)
+
+        # The search entry only needs an update if the content has changed.
+
+        if obj.latest and obj.kind == AuthoredData.AUTHORING_JSON and ('data' in kwargs or 'name' in kwargs):
+            ReportSearchEntry.update_for(obj)
+
+        if obj.latest:
+            ReportSummary.update_for(obj)
+
         return obj
 
 
 
 
+
     @staticmethod
+    @atomic_with_invalidation()
     def object_create(kind=None,
                       status=None,
                       author_view='',
@@ -331,14 +509,17 @@ class AuthoredData(models.Model):
 
         latest=False
 
+        previous_latest = []
+
         if status != AuthoredData.AUTOSAVE:
             younger_objs_count = existing_objs.exclude(status=AuthoredData.AUTOSAVE).\
                                                        filter(timestamp__gt=timestamp).count()
             if not younger_objs_count:
+                previous_latest = list(existing_objs.filter(latest=True).values_list('kind','status'))
                 existing_objs.update(latest=False)
                 latest= True
 
-        return AuthoredData.objects.create(kind=kind,
+        obj = AuthoredData.objects.create(kind=kind,
                                            user=user,
                                            group=group,
                                            identifier=identifier_obj,
@@ -351,7 +532,403 @@ class AuthoredData(models.Model):
                                            processing_id=processing_id,
                                            yielded=yielded)
 
+        AuthoredData._invalidate_cached_counts(obj,identifier_obj.name,previous_latest)
+
+        if latest and kind == AuthoredData.AUTHORING_JSON:
+            ReportSearchEntry.update_for(obj)
+
+        if latest:
+            ReportSummary.update_for(obj)
+
+        return obj
+
+
+
+class ReportOwnership(models.Model):
+    """
+    Ownership of a report: only the owner may save the report. Ownership is
+    a lease that is taken, renewed and released in place, so that revisions
+    of a report are only written when its content changes. If
+    ``DINGOS_AUTHORING_OWNERSHIP_TTL`` is set, a lease that has not been
+    renewed for that long has expired, and the report is no longer owned by anybody.
+    """
+
+    group = models.ForeignKey(Group)
+
+    identifier = models.ForeignKey(Identifier)
+
+    # ``None``: the report has been released
+
+    user = models.ForeignKey(User,null=True)
+
+    acquired = models.DateTimeField(null=True)
+
+    expires = models.DateTimeField(null=True)
+
+    def __unicode__(self):
+        return "%s: %s" % (self.identifier, self.user)
+
+    class Meta:
+        unique_together = ("group",
+                           "identifier")
+
+    @staticmethod
+    def lease_expiry(now):
+        if DINGOS_AUTHORING_OWNERSHIP_TTL is None:
+            return None
+        return now + timedelta(seconds=DINGOS_AUTHORING_OWNERSHIP_TTL)
+
+    @staticmethod
+    def active(group):
+        """
+        Query for the leases of ``group`` that are currently held by a user.
+        """
+        return ReportOwnership.objects.filter(Q(expires__isnull=True) | Q(expires__gt=timezone.now()),
+                                              group=group,
+                                              user__isnull=False)
+
+    @staticmethod
+    def holder_id(group_id,identifier_id):
+        """
+        Return the primary key of the user currently owning the report (or ``None``).
+        """
+        holders = ReportOwnership.active(group_id).filter(identifier_id=identifier_id).values_list('user_id',flat=True)
+        for holder in holders:
+            return holder
+        return None
+
+    @staticmethod
+    def holders(group_id,identifier_ids):
+        """
+        Return a dictionary mapping the identifiers of those of the given reports
+        that are currently owned to their owners, retrieved with one query.
+        """
+        leases = ReportOwnership.active(group_id).filter(identifier_id__in=identifier_ids).select_related('user')
+        return dict((x.identifier_id,x.user) for x in leases)
+
+    @staticmethod
+    def with_owner(queryset):
+        """
+        Add the primary key and the username of the current owner of the report
+        (``owner_id`` and ``owner_name``, ``None`` if the report is not owned)
+        to the objects of ``queryset``, whose model must have the fields ``group``
+        and ``identifier``. Only the leases of the retrieved objects are read.
+        """
+        condition = "lease.group_id = %(table)s.group_id AND lease.identifier_id = %(table)s.identifier_id " \
+                    "AND (lease.expires IS NULL OR lease.expires > %%s)" % {'table': queryset.model._meta.db_table}
+        now = timezone.now()
+        return queryset.extra(select=OrderedDict([('owner_id', "SELECT lease.user_id FROM %s lease WHERE %s"
+                                                               % (ReportOwnership._meta.db_table, condition)),
+                                                  ('owner_name', "SELECT owner.username FROM %s lease "
+                                                                 "INNER JOIN %s owner ON owner.id = lease.user_id WHERE %s"
+                                                                 % (ReportOwnership._meta.db_table,
+                                                                    User._meta.db_table,
+                                                                    condition))]),
+                              select_params=[now, now])
+
+    @staticmethod
+    def _owner_changed(group_id,identifier_ids,user_pk):
+        ReportSummary.objects.filter(group_id=group_id,
+                                     identifier_id__in=identifier_ids).update(user=user_pk)
+        bump_generation_on_commit('group:%s' % group_id)
+
+    @staticmethod
+    def renew(group_id,identifier_id,user):
+        """
+        Renew the lease of ``user`` on the report, unless another user has taken
+        the report or it has been released. Returns whether ``user`` is the owner.
+        """
+        return bool(ReportOwnership.objects.filter(group_id=group_id,
+                                                   identifier_id=identifier_id,
+                                                   user=user).update(expires=ReportOwnership.lease_expiry(timezone.now())))
+
+    @staticmethod
+    def acquire(group_id,identifier_id,user):
+        """
+        Make ``user`` the owner of the report or renew the lease of ``user``, unless
+        the report is owned by another user. Returns whether ``user`` is the owner.
+        """
+        now = timezone.now()
+        expires = ReportOwnership.lease_expiry(now)
+        leases = ReportOwnership.objects.filter(group_id=group_id,identifier_id=identifier_id)
+
+        if leases.filter(user=user).update(expires=expires):
+            return True
+
+        # The condition is part of the update, so that two users cannot
+        # take the same report concurrently.
+        if leases.filter(Q(user__isnull=True) | Q(expires__lte=now)).update(user=user,
+                                                                             acquired=now,
+                                                                             expires=expires):
+            ReportOwnership._owner_changed(group_id,[identifier_id],user.pk)
+            return True
+
+        if leases.exists():
+            return False
+
+        try:
+            with transaction.atomic():
+                ReportOwnership.objects.create(group_id=group_id,
+                                               identifier_id=identifier_id,
+                                               user=user,
+                                               acquired=now,
+                                               expires=expires)
+        except IntegrityError:
+            # Created concurrently by another request
+            return ReportOwnership.holder_id(group_id,identifier_id) == user.pk
+
+        ReportOwnership._owner_changed(group_id,[identifier_id],user.pk)
+        return True
+
+    @staticmethod
+    def release(group_id,identifier_id):
+        ReportOwnership.objects.filter(group_id=group_id,
+                                       identifier_id=identifier_id).update(user=None,
+                                                                           acquired=None,
+                                                                           expires=None)
+        ReportOwnership._owner_changed(group_id,[identifier_id],None)
+
+    @staticmethod
+    @atomic_with_invalidation()
+    def bulk_acquire(group_id,identifier_ids,user):
+        """
+        Make ``user`` the owner of the reports ``identifier_ids`` regardless of their
+        current owners, with a fixed number of statements.
+        """
+        identifier_ids = set(identifier_ids)
+        if not identifier_ids:
+            return
+        now = timezone.now()
+        expires = ReportOwnership.lease_expiry(now)
+
+        leases = ReportOwnership.objects.filter(group_id=group_id,identifier_id__in=identifier_ids)
+        existing = set(leases.select_for_update().values_list('identifier_id',flat=True))
+        leases.update(user=user,acquired=now,expires=expires)
+        ReportOwnership.objects.bulk_create([ReportOwnership(group_id=group_id,
+                                                             identifier_id=x,
+                                                             user=user,
+                                                             acquired=now,
+                                                             expires=expires)
+                                             for x in identifier_ids - existing])
+
+        ReportOwnership._owner_changed(group_id,identifier_ids,user.pk)
+
+
+
+
+class ReportSummary(models.Model):
+    """
+    Denormalized summary of the latest revision of a report as shown
+    in the list of reports. A summary exists for each report whose latest
+    revision is an authoring JSON with status draft, update or imported;
+    it is maintained by the write paths of ``AuthoredData`` and by the
+    import task.
+    """
+
+    group = models.ForeignKey(Group)
+
+    identifier = models.ForeignKey(Identifier)
+
+    latest_revision = models.ForeignKey(AuthoredData,
+                                        related_name='+')
+
+    # Import that yielded the latest revision (if any)
 
+    yielded = models.ForeignKey(AuthoredData,
+                                null=True,
+                                related_name='+')
 
+    # Owner of the report as of the last change of ownership (see ``ReportOwnership``);
+    # the expiry of leases (``DINGOS_AUTHORING_OWNERSHIP_TTL``) is not reflected here,
+    # so views showing the owner take it from the active leases.
 
+    user = models.ForeignKey(User,null=True)
+
+    status = models.SmallIntegerField(choices=AuthoredData.STATUS_WO_AUTOSAVE)
+
+    timestamp = models.DateTimeField(db_index=True)
+
+    name = models.CharField(max_length=256)
+
+    author_view = models.ForeignKey(AuthorView,
+                                    null=True)
+
+    top_level_iobject = models.ForeignKey(InfoObject,
+                                          null=True,
+                                          related_name='+')
+
+    top_level_display = models.CharField(max_length=1024,blank=True)
+
+    def __unicode__(self):
+        return "%s" % self.name
 
+    class Meta:
+        unique_together = ("group",
+                           "identifier")
+
+    @property
+    def is_imported(self):
+        return self.status == AuthoredData.IMPORTED
+
+    @property
+    def action_object(self):
+        """
+        Stand-in for the latest revision in list actions, which only
+        require the primary key; no query is made.
+        """
+        return AuthoredData(pk=self.latest_revision_id)
+
+    @staticmethod
+    def top_level_display_for(iobject):
+        return "%s (%s:%s)" % (iobject.name, iobject.identifier.namespace.uri, iobject.identifier.uid)
+
+    @staticmethod
+    def update_for(obj):
+        """
+        Update the summary of the report after ``obj`` has become its latest revision.
+        """
+        if not AuthoredData.is_listed_report(obj.kind,obj.status):
+            ReportSummary.objects.filter(group_id=obj.group_id,
+                                         identifier_id=obj.identifier_id).delete()
+            return
+
+        values = {'latest_revision_id': obj.pk,
+                  'yielded_id': obj.yielded_id,
+                  'user_id': ReportOwnership.holder_id(obj.group_id,obj.identifier_id),
+                  'status': obj.status,
+                  'timestamp': obj.timestamp,
+                  'name': obj.name,
+                  'author_view_id': obj.author_view_id,
+                  'top_level_iobject_id': None,
+                  'top_level_display': ''}
+
+        if obj.yielded_id:
+            # The import may already have finished; we read the top-level object
+            # from the database rather than from the possibly outdated ``obj.yielded``.
+            iobjects = InfoObject.objects.filter(top_level_of__pk=obj.yielded_id).select_related('identifier__namespace')
+            for iobject in iobjects:
+                values['top_level_iobject_id'] = iobject.pk
+                values['top_level_display'] = ReportSummary.top_level_display_for(iobject)
+
+        # ``update`` expects the names of the foreign keys rather than of their columns
+        updated = ReportSummary.objects.filter(group_id=obj.group_id,
+                                               identifier_id=obj.identifier_id).\
+            update(**dict((x[:-3] if x.endswith('_id') else x, y) for (x,y) in values.items()))
+        if not updated:
+            ReportSummary.objects.create(group_id=obj.group_id,
+                                         identifier_id=obj.identifier_id,
+                                         **values)
+
+    @staticmethod
+    def set_top_level_iobject(xml_import_obj_pk, iobject):
+        """
+        Record the top-level object created by an import in the summary of the report
+        whose latest revision has been yielded by the import.
+        """
+        summaries = ReportSummary.objects.filter(yielded_id=xml_import_obj_pk)
+        group_ids = set(summaries.values_list('group_id',flat=True))
+        summaries.update(top_level_iobject=iobject,
+                         top_level_display=ReportSummary.top_level_display_for(iobject))
+        # ``update`` does not send signals, so we invalidate cached lists here.
+        for group_id in group_ids:
+            bump_generation_on_commit('group:%s' % group_id)
+
+
+#
+# Invalidation of cached data derived from AuthoredData
+# -----------------------------------------------------
+#
+
+@receiver(post_save, sender=AuthoredData)
+@receiver(post_delete, sender=AuthoredData)
+def bump_authored_data_generation(sender, instance, **kwargs):
+    bump_generation_on_commit('group:%s' % instance.group_id)
+    if instance.user_id:
+        bump_generation_on_commit('user:%s' % instance.user_id)
+
+#
+# Creation of the full-text index
+# -------------------------------
+#
+# If the tables are created by ``syncdb`` rather than via migrations
+# (e.g., when running the tests), the full-text index on the search
+# entries must be created here.
+
+try:
+    from django.db.models.signals import post_syncdb
+
+    @receiver(post_syncdb, sender=sys.modules[__name__])
+    def create_search_index_after_syncdb(sender, created_models=(), db='default', **kwargs):
+        if ReportSearchEntry in created_models:
+            create_search_index(connections[db])
+
+except ImportError:
+    pass
+
+#
+# Invalidation of cached authoring namespace information
+# ------------------------------------------------------
+#
+
+def invalidate_group_namespace_info(group_pks):
+    """
+    Invalidate the cached namespace information of the members of the given groups.
+    """
+    for user_pk in User.objects.filter(groups__in=group_pks).values_list('pk',flat=True).distinct():
+        invalidate_namespace_info(user_pk)
+
+@receiver(post_save, sender=GroupNamespaceMap)
+@receiver(post_delete, sender=GroupNamespaceMap)
+def invalidate_namespace_info_on_map_change(sender, instance, **kwargs):
+    invalidate_group_namespace_info([instance.group_id])
+
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def invalidate_namespace_info_on_group_change(sender, instance, created=False, **kwargs):
+    # A new group has no members yet; the members of a deleted group
+    # are removed along with it, so they have to be looked up beforehand.
+    if not created:
+        invalidate_group_namespace_info([instance.pk])
+
+@receiver(post_save, sender=IdentifierNameSpace)
+@receiver(pre_delete, sender=IdentifierNameSpace)
+def invalidate_namespace_info_on_namespace_change(sender, instance, created=False, **kwargs):
+    # Namespaces created during imports are not used by any mapping yet
+    if created:
+        return
+    maps = GroupNamespaceMap.objects.filter(Q(default_namespace=instance) | Q(allowed_namespaces=instance))
+    invalidate_group_namespace_info(list(maps.values_list('group_id',flat=True).distinct()))
+
+@receiver(m2m_changed, sender=GroupNamespaceMap.allowed_namespaces.through)
+def invalidate_namespace_info_on_allowed_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        # ``instance`` is a mapping whose allowed namespaces have changed
+        invalidate_group_namespace_info([instance.group_id])
+    elif pk_set:
+        # ``instance`` is a namespace; ``pk_set`` contains the affected mappings
+        invalidate_group_namespace_info(list(GroupNamespaceMap.objects.filter(pk__in=pk_set).values_list('group_id',flat=True)))
+    else:
+        # The namespace has been removed from all mappings
+        invalidate_namespace_info()
+
+@receiver(post_save, sender=UserAuthoringInfo)
+@receiver(post_delete, sender=UserAuthoringInfo)
+def invalidate_user_namespace_info(sender, instance, **kwargs):
+    invalidate_namespace_info(instance.user_id)
+
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidate_namespace_info_on_membership_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        # ``instance`` is a user whose groups have changed
+        invalidate_namespace_info(instance.pk)
+    elif pk_set:
+        # ``instance`` is a group; ``pk_set`` contains the affected users
+        for user_pk in pk_set:
+            invalidate_namespace_info(user_pk)
+    else:
+        # All users have been removed from the group
+        invalidate_namespace_info()
@@ -0,0 +1,289 @@
+# Copyright (c) Siemens AG, 2014
+#
+# This file is part of MANTIS.  MANTIS is free software: you can
+# redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation; either version 2
+# of the License, or(at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+import datetime, json, logging
+
+from base64 import urlsafe_b64encode, urlsafe_b64decode
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q, DateTimeField
+from django.db.models.fields import FieldDoesNotExist
+from django.utils.dateparse import parse_datetime
+
+import dingos_authoring.read_settings
+
+from dingos_authoring import DINGOS_AUTHORING_COUNT_CACHE_TIMEOUT
+
+from .caching import get_authoring_cache
+
+
+logger = logging.getLogger(__name__)
+
+
+def _nulls_largest(queryset):
+    """
+    Whether the database sorts NULL after all other values in ascending order.
+    """
+    return connections[queryset.db].vendor in ('postgresql', 'oracle')
+
+
+def keyset_field(queryset, name):
+    """
+    Return the model field ``name`` of ``queryset`` if the queryset can be
+    paginated by seeking on it; otherwise return ``None``.
+    """
+    try:
+        field = queryset.model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+    # Ordering by a relation uses the ordering of the related model, unless it has none.
+    if field.rel and field.rel.to._meta.ordering:
+        return None
+    return field
+
+
+def encode_cursor(field, value, pk):
+    """
+    Encode the position of an object within a list ordered by ``(field, pk)``.
+    """
+    if isinstance(value, datetime.datetime):
+        value = value.isoformat()
+    return urlsafe_b64encode(json.dumps([field.name, value, pk]))
+
+
+def decode_cursor(cursor, field):
+    """
+    Decode a cursor created by ``encode_cursor`` for ``field``; returns ``None``
+    for invalid cursors and cursors of a list ordered by some other field.
+    """
+    try:
+        name, value, pk = json.loads(urlsafe_b64decode(str(cursor)))
+        if name != field.name:
+            return None
+        if value is not None:
+            if isinstance(field, DateTimeField):
+                value = parse_datetime(value)
+                if not value:
+                    return None
+            else:
+                value = field.to_python(value)
+        return (value, int(pk))
+    except (TypeError, ValueError, ValidationError):
+        return None
+
+
+def keyset_ordering(queryset):
+    """
+    Determine whether ``queryset`` can be paginated by seeking on ``(field, pk)``:
+    returns a tuple of the name of the field and ``True`` for descending or
+    ``False`` for ascending order; returns ``None`` if the queryset is ordered
+    in some other way. Querysets without explicit ordering are paginated
+    by descending timestamp.
+    """
+    ordering = [x for x in queryset.query.order_by if x not in ('pk', '-pk', 'id', '-id')]
+
+    if not ordering:
+        ordering = ['-timestamp']
+    if len(ordering) != 1:
+        return None
+
+    descending = ordering[0].startswith('-')
+    name = ordering[0].lstrip('-')
+    if '__' in name or keyset_field(queryset, name) is None:
+        return None
+    return (name, descending)
+
+
+class KeysetPage(object):
+    """
+    Page of a list paginated by seeking rather than by offset; ``count``
+    is the total number of objects, if known.
+    """
+
+    keyset = True
+
+    count = None
+
+    def __init__(self, object_list, has_next, has_previous, field):
+        self.object_list = object_list
+        self._has_next = has_next
+        self._has_previous = has_previous
+        if object_list:
+            self.next_cursor = encode_cursor(field, getattr(object_list[-1], field.attname), object_list[-1].pk)
+            self.previous_cursor = encode_cursor(field, getattr(object_list[0], field.attname), object_list[0].pk)
+        else:
+            self.next_cursor = None
+            self.previous_cursor = None
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+
+def _seek(queryset, name, value, pk, descending):
+    """
+    Restrict ``queryset`` ordered by ``(name, pk)`` to the objects following
+    the position ``(value, pk)``, taking into account where the database
+    sorts NULL values.
+    """
+    after = 'lt' if descending else 'gt'
+    # Whether NULL values come after all other values in the direction of the seek
+    nulls_last = _nulls_largest(queryset) != descending
+
+    if value is None:
+        condition = Q(**{'%s__isnull' % name: True, 'pk__%s' % after: pk})
+        if not nulls_last:
+            condition |= Q(**{'%s__isnull' % name: False})
+    else:
+        condition = Q(**{'%s__%s' % (name, after): value}) | Q(**{name: value, 'pk__%s' % after: pk})
+        if nulls_last:
+            condition |= Q(**{'%s__isnull' % name: True})
+    return queryset.filter(condition)
+
+
+def keyset_paginate(queryset, page_size, after=None, before=None, descending=True, field='timestamp'):
+    """
+    Return the page of ``page_size`` objects following the object identified by
+    the cursor ``after`` or preceding the object identified by the cursor
+    ``before`` in the list ordered by ``(field, pk)``; without cursor, the
+    first page is returned.
+
+    The cost of retrieving a page does not depend on its position in the list,
+    since no offset is used: the database seeks directly to the position given
+    by the cursor, using an index on ``field`` where there is one.
+    """
+
+    model_field = queryset.model._meta.get_field(field)
+
+    position = None
+    backwards = False
+    if after:
+        position = decode_cursor(after, model_field)
+    elif before:
+        position = decode_cursor(before, model_field)
+        backwards = position is not None
+
+    # Moving backwards through a descending list is the same as
+    # moving forward through an ascending list and vice versa.
+    seek_descending = descending != backwards
+
+    if seek_descending:
+        queryset = queryset.order_by('-%s' % field, '-pk')
+    else:
+        queryset = queryset.order_by(field, 'pk')
+
+    if position:
+        value, pk = position
+        queryset = _seek(queryset, field, value, pk, seek_descending)
+
+    object_list = list(queryset[:page_size + 1])
+    more = len(object_list) > page_size
+    object_list = object_list[:page_size]
+
+    if backwards:
+        object_list.reverse()
+        return KeysetPage(object_list, has_next=True, has_previous=more, field=model_field)
+    else:
+        return KeysetPage(object_list, has_next=more, has_previous=position is not None, field=model_field)
+
+
+def estimate_count(queryset):
+    """
+    Return the query planner's estimate of the number of rows returned by
+    ``queryset``. This is only supported for PostgreSQL; for other databases,
+    ``None`` is returned.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    sql, params = queryset.query.sql_with_params()
+    cursor = connection.cursor()
+    try:
+        cursor.execute("EXPLAIN (FORMAT JSON) %s" % sql, params)
+        plan = cursor.fetchone()[0]
+    finally:
+        cursor.close()
+    if isinstance(plan, basestring):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Paginator that takes the count of objects from the cache under ``count_key``
+    (computing and storing it, if it is not available). If ``approximate`` is set,
+    the estimate of the query planner is used where available.
+    """
+
+    def __init__(self, object_list, per_page, count_key=None, approximate=False, **kwargs):
+        super(CachedCountPaginator, self).__init__(object_list, per_page, **kwargs)
+        self.count_key = count_key
+        self.approximate = approximate
+        self._cached_count = None
+
+    def _get_count(self):
+        if self._cached_count is None:
+            count = None
+            if self.approximate:
+                try:
+                    count = estimate_count(self.object_list)
+                except Exception, e:
+                    logger.warning("Could not estimate count: %s" % e)
+            if count is None and self.count_key:
+                cache = get_authoring_cache()
+                count = cache.get(self.count_key)
+                if count is None:
+                    count = self.object_list.count()
+                    cache.add(self.count_key, count, DINGOS_AUTHORING_COUNT_CACHE_TIMEOUT)
+            if count is None:
+                count = self.object_list.count()
+            self._cached_count = count
+        return self._cached_count
+
+    count = property(_get_count)
+
+
+class FixedCountPaginator(Paginator):
+    """
+    Paginator for a page restored from the cache: the count is known
+    and the objects of the page are provided with the page itself.
+    """
+
+    def __init__(self, count, per_page, **kwargs):
+        super(FixedCountPaginator, self).__init__([], per_page, **kwargs)
+        self._fixed_count = count
+
+    def _get_count(self):
+        return self._fixed_count
+
+    count = property(_get_count)
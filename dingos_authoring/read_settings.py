@@ -26,3 +26,72 @@ if settings.configured and 'DINGOS_AUTHORING' in dir(settings):
 if settings.configured and 'DINGOS_AUTHORING' in dir(settings):
     dingos_authoring.DINGOS_AUTHORING_CELERY_BUG_WORKAROUND = settings.DINGOS_AUTHORING.get('CELERY_BUG_WORKAROUND', dingos_authoring.DINGOS_AUTHORING_CELERY_BUG_WORKAROUND)
 
+
+if settings.configured and 'DINGOS_AUTHORING' in dir(settings):
+    dingos_authoring.DINGOS_AUTHORING_IMPORT_TIME_LIMIT = settings.DINGOS_AUTHORING.get('IMPORT_TIME_LIMIT', dingos_authoring.DINGOS_AUTHORING_IMPORT_TIME_LIMIT)
+
+if settings.configured and 'DINGOS_AUTHORING' in dir(settings):
+    dingos_authoring.DINGOS_AUTHORING_IMPORT_MEMORY_LIMIT = settings.DINGOS_AUTHORING.get('IMPORT_MEMORY_LIMIT', dingos_authoring.DINGOS_AUTHORING_IMPORT_MEMORY_LIMIT)
+
+if settings.configured and 'DINGOS_AUTHORING' in dir(settings):
+    dingos_authoring.DINGOS_AUTHORING_STIX_CACHE_SIZE = settings.DINGOS_AUTHORING.get('STIX_CACHE_SIZE', dingos_authoring.DINGOS_AUTHORING_STIX_CACHE_SIZE)
+
+if settings.configured and 'DINGOS_AUTHORING' in dir(settings):
+    dingos_authoring.DINGOS_AUTHORING_STIX_CACHE_TIMEOUT = settings.DINGOS_AUTHORING.get('STIX_CACHE_TIMEOUT', dingos_authoring.DINGOS_AUTHORING_STIX_CACHE_TIMEOUT)
+
+if settings.configured and 'DINGOS_AUTHORING' in dir(settings):
+    dingos_authoring.DINGOS_AUTHORING_ASYNC_GENERATION_THRESHOLD = settings.DINGOS_AUTHORING.get('ASYNC_GENERATION_THRESHOLD', dingos_authoring.DINGOS_AUTHORING_ASYNC_GENERATION_THRESHOLD)
+
+if settings.configured and 'DINGOS_AUTHORING' in dir(settings):
+    dingos_authoring.DINGOS_AUTHORING_CACHE = settings.DINGOS_AUTHORING.get('CACHE', dingos_authoring.DINGOS_AUTHORING_CACHE)
+
+if settings.configured and 'DINGOS_AUTHORING' in dir(settings):
+    dingos_authoring.DINGOS_AUTHORING_CACHE_TIMEOUT = settings.DINGOS_AUTHORING.get('CACHE_TIMEOUT', dingos_authoring.DINGOS_AUTHORING_CACHE_TIMEOUT)
+
+if settings.configured and 'DINGOS_AUTHORING' in dir(settings):
+    dingos_authoring.DINGOS_AUTHORING_COUNT_MODE = settings.DINGOS_AUTHORING.get('COUNT_MODE', dingos_authoring.DINGOS_AUTHORING_COUNT_MODE)
+
+if settings.configured and 'DINGOS_AUTHORING' in dir(settings):
+    dingos_authoring.DINGOS_AUTHORING_COUNT_CACHE_TIMEOUT = settings.DINGOS_AUTHORING.get('COUNT_CACHE_TIMEOUT', dingos_authoring.DINGOS_AUTHORING_COUNT_CACHE_TIMEOUT)
+
+if settings.configured and 'DINGOS_AUTHORING' in dir(settings):
+    dingos_authoring.DINGOS_AUTHORING_KEYSET_PAGINATION = settings.DINGOS_AUTHORING.get('KEYSET_PAGINATION', dingos_authoring.DINGOS_AUTHORING_KEYSET_PAGINATION)
+
+if settings.configured and 'DINGOS_AUTHORING' in dir(settings):
+    dingos_authoring.DINGOS_AUTHORING_EXPORT_CHUNK_SIZE = settings.DINGOS_AUTHORING.get('EXPORT_CHUNK_SIZE', dingos_authoring.DINGOS_AUTHORING_EXPORT_CHUNK_SIZE)
+
+if settings.configured and 'DINGOS_AUTHORING' in dir(settings):
+    dingos_authoring.DINGOS_AUTHORING_LIST_CACHE_TIMEOUT = settings.DINGOS_AUTHORING.get('LIST_CACHE_TIMEOUT', dingos_authoring.DINGOS_AUTHORING_LIST_CACHE_TIMEOUT)
+
+if settings.configured and 'DINGOS_AUTHORING' in dir(settings):
+    dingos_authoring.DINGOS_AUTHORING_DRAFT_LIST_PAGE_SIZE = settings.DINGOS_AUTHORING.get('DRAFT_LIST_PAGE_SIZE', dingos_authoring.DINGOS_AUTHORING_DRAFT_LIST_PAGE_SIZE)
+
+if settings.configured and 'DINGOS_AUTHORING' in dir(settings):
+    dingos_authoring.DINGOS_AUTHORING_COMPRESSION_THRESHOLD = settings.DINGOS_AUTHORING.get('COMPRESSION_THRESHOLD', dingos_authoring.DINGOS_AUTHORING_COMPRESSION_THRESHOLD)
+
+if settings.configured and 'DINGOS_AUTHORING' in dir(settings):
+    dingos_authoring.DINGOS_AUTHORING_MAX_DECOMPRESSED_REQUEST_SIZE = settings.DINGOS_AUTHORING.get('MAX_DECOMPRESSED_REQUEST_SIZE', dingos_authoring.DINGOS_AUTHORING_MAX_DECOMPRESSED_REQUEST_SIZE)
+
+if settings.configured and 'DINGOS_AUTHORING' in dir(settings):
+    dingos_authoring.DINGOS_AUTHORING_AUTOSAVE_FLUSH_INTERVAL = settings.DINGOS_AUTHORING.get('AUTOSAVE_FLUSH_INTERVAL', dingos_authoring.DINGOS_AUTHORING_AUTOSAVE_FLUSH_INTERVAL)
+
+if settings.configured and 'DINGOS_AUTHORING' in dir(settings):
+    dingos_authoring.DINGOS_AUTHORING_AUTOSAVE_BUFFER_TIMEOUT = settings.DINGOS_AUTHORING.get('AUTOSAVE_BUFFER_TIMEOUT', dingos_authoring.DINGOS_AUTHORING_AUTOSAVE_BUFFER_TIMEOUT)
+
+if settings.configured and 'DINGOS_AUTHORING' in dir(settings):
+    dingos_authoring.DINGOS_AUTHORING_BATCH_LOAD_LIMIT = settings.DINGOS_AUTHORING.get('BATCH_LOAD_LIMIT', dingos_authoring.DINGOS_AUTHORING_BATCH_LOAD_LIMIT)
+
+if settings.configured and 'DINGOS_AUTHORING' in dir(settings):
+    dingos_authoring.DINGOS_AUTHORING_EVENT_RETENTION = settings.DINGOS_AUTHORING.get('EVENT_RETENTION', dingos_authoring.DINGOS_AUTHORING_EVENT_RETENTION)
+
+if settings.configured and 'DINGOS_AUTHORING' in dir(settings):
+    dingos_authoring.DINGOS_AUTHORING_EVENT_STREAM_TIMEOUT = settings.DINGOS_AUTHORING.get('EVENT_STREAM_TIMEOUT', dingos_authoring.DINGOS_AUTHORING_EVENT_STREAM_TIMEOUT)
+
+if settings.configured and 'DINGOS_AUTHORING' in dir(settings):
+    dingos_authoring.DINGOS_AUTHORING_REPORT_SCHEMAS = settings.DINGOS_AUTHORING.get('REPORT_SCHEMAS', dingos_authoring.DINGOS_AUTHORING_REPORT_SCHEMAS)
+
+if settings.configured and 'DINGOS_AUTHORING' in dir(settings):
+    dingos_authoring.DINGOS_AUTHORING_OWNERSHIP_TTL = settings.DINGOS_AUTHORING.get('OWNERSHIP_TTL', dingos_authoring.DINGOS_AUTHORING_OWNERSHIP_TTL)
+
+if settings.configured and 'DINGOS_AUTHORING' in dir(settings):
+    dingos_authoring.DINGOS_AUTHORING_IMPORT_CHUNK_SIZE = settings.DINGOS_AUTHORING.get('IMPORT_CHUNK_SIZE', dingos_authoring.DINGOS_AUTHORING_IMPORT_CHUNK_SIZE)
\ No newline at end of file
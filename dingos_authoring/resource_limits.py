@@ -0,0 +1,153 @@
+# Copyright (c) Siemens AG, 2014
+#
+# This file is part of MANTIS.  MANTIS is free software: you can
+# redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation; either version 2
+# of the License, or(at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+import cPickle, errno, logging, os, resource, select, signal, time, traceback
+
+from django.db import connections
+
+
+logger = logging.getLogger(__name__)
+
+
+class ResourceLimitExceeded(StandardError):
+    """
+    Raised when a function run via ``run_with_limits`` exceeded its
+    wall-time or memory limit or died in some other way.
+    """
+    pass
+
+
+def run_with_limits(func, args=(), kwargs=None, time_limit=None, memory_limit=None):
+    """
+    Run ``func(*args,**kwargs)`` in a forked child process and return its result.
+
+    - ``time_limit``: wall time in seconds after which the child is killed.
+    - ``memory_limit``: maximal address space of the child in megabytes.
+
+    If neither limit is given, the function is simply called in-process.
+
+    We fork directly rather than using ``multiprocessing``, because the daemonic
+    processes of the celery worker pool are not allowed to have children.
+    The result is handed back via a pipe and must therefore be picklable.
+    If a limit is exceeded, the child is killed and ``ResourceLimitExceeded``
+    is raised in the parent, which stays unaffected. Other exceptions
+    in the child are re-raised in the parent, with the child's traceback
+    in the attribute ``child_traceback``; exceptions that cannot be pickled
+    are re-raised as ``StandardError``.
+    """
+    if kwargs is None:
+        kwargs = {}
+
+    if not time_limit and not memory_limit:
+        return func(*args, **kwargs)
+
+    # Database connections must not be shared between parent and child:
+    # we close them here; both processes reconnect when required.
+    for conn in connections.all():
+        conn.close()
+
+    read_fd, write_fd = os.pipe()
+
+    pid = os.fork()
+
+    if pid == 0:
+        # Child process
+        os.close(read_fd)
+        exit_code = 0
+        try:
+            if memory_limit:
+                limit = int(memory_limit) * 1024 * 1024
+                resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+            try:
+                outcome = ('ok', func(*args, **kwargs))
+            except MemoryError:
+                outcome = ('limit', "Memory limit of %s MB exceeded." % memory_limit)
+            except Exception, e:
+                details = "%s: %s\n%s" % (e.__class__.__name__, e, traceback.format_exc())
+                try:
+                    cPickle.loads(cPickle.dumps(e, cPickle.HIGHEST_PROTOCOL))
+                    outcome = ('error', (e, details))
+                except Exception:
+                    outcome = ('error', (None, details))
+            with os.fdopen(write_fd, 'wb') as pipe:
+                cPickle.dump(outcome, pipe, cPickle.HIGHEST_PROTOCOL)
+        except BaseException:
+            exit_code = 1
+        finally:
+            for conn in connections.all():
+                conn.close()
+            os._exit(exit_code)
+
+    # Parent process
+    os.close(write_fd)
+
+    chunks = []
+    deadline = time.time() + time_limit if time_limit else None
+    timed_out = False
+
+    try:
+        while True:
+            if deadline:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    timed_out = True
+                    break
+            else:
+                remaining = None
+            try:
+                ready, _, _ = select.select([read_fd], [], [], remaining)
+            except select.error, e:
+                if e.args[0] == errno.EINTR:
+                    continue
+                raise
+            if not ready:
+                continue
+            chunk = os.read(read_fd, 65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    finally:
+        os.close(read_fd)
+        if timed_out:
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except OSError:
+                pass
+        _, status = os.waitpid(pid, 0)
+
+    if timed_out:
+        raise ResourceLimitExceeded("Time limit of %s seconds exceeded." % time_limit)
+
+    if not chunks:
+        if os.WIFSIGNALED(status):
+            raise ResourceLimitExceeded("Process killed by signal %s (memory limit of %s MB exceeded?)."
+                                        % (os.WTERMSIG(status), memory_limit))
+        raise ResourceLimitExceeded("Process exited with status %s without returning a result."
+                                    % os.WEXITSTATUS(status))
+
+    kind, value = cPickle.loads(''.join(chunks))
+
+    if kind == 'limit':
+        raise ResourceLimitExceeded(value)
+    elif kind == 'error':
+        (exception, details) = value
+        if exception is None:
+            raise StandardError(details)
+        exception.child_traceback = details
+        raise exception
+
+    return value
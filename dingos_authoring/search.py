@@ -0,0 +1,179 @@
+# Copyright (c) Siemens AG, 2014
+#
+# This file is part of MANTIS.  MANTIS is free software: you can
+# redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation; either version 2
+# of the License, or(at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Full-text search over the name and content of the latest revision of reports.
+
+The searchable text is kept in ``ReportSearchEntry`` objects; on top of the table
+of these objects, a full-text index is created with the means of the database:
+
+- SQLite: an FTS5 table that is kept in sync with triggers
+- PostgreSQL: a GIN index on the ``tsvector`` of name and body
+- MySQL: a FULLTEXT index on name and body
+
+For other databases, search falls back to ``icontains``.
+"""
+
+import json, logging
+
+from django.db import connection, connections
+from django.db.models import Q
+
+logger = logging.getLogger(__name__)
+
+
+ENTRY_TABLE = 'dingos_authoring_reportsearchentry'
+
+FTS_TABLE = 'dingos_authoring_reportsearch_fts'
+
+PG_INDEX = 'dingos_authoring_reportsearchentry_fts'
+
+MYSQL_INDEX = 'dingos_authoring_reportsearchentry_fts'
+
+
+def search_index_statements(vendor):
+    """
+    Return the SQL statements creating the full-text index for the given database vendor.
+    """
+    if vendor == 'sqlite':
+        return ["CREATE VIRTUAL TABLE IF NOT EXISTS %(fts)s USING fts5(name, body, content='%(entry)s', content_rowid='id')",
+                "CREATE TRIGGER IF NOT EXISTS %(fts)s_ai AFTER INSERT ON %(entry)s BEGIN "
+                "INSERT INTO %(fts)s(rowid, name, body) VALUES (new.id, new.name, new.body); END",
+                "CREATE TRIGGER IF NOT EXISTS %(fts)s_ad AFTER DELETE ON %(entry)s BEGIN "
+                "INSERT INTO %(fts)s(%(fts)s, rowid, name, body) VALUES ('delete', old.id, old.name, old.body); END",
+                "CREATE TRIGGER IF NOT EXISTS %(fts)s_au AFTER UPDATE ON %(entry)s BEGIN "
+                "INSERT INTO %(fts)s(%(fts)s, rowid, name, body) VALUES ('delete', old.id, old.name, old.body); "
+                "INSERT INTO %(fts)s(rowid, name, body) VALUES (new.id, new.name, new.body); END",
+                "INSERT INTO %(fts)s(%(fts)s) VALUES ('rebuild')"]
+    elif vendor == 'postgresql':
+        return ["CREATE INDEX %(pg_index)s ON %(entry)s USING gin(to_tsvector('simple', name || ' ' || body))"]
+    elif vendor == 'mysql':
+        return ["CREATE FULLTEXT INDEX %(mysql_index)s ON %(entry)s (name, body)"]
+    return []
+
+
+def drop_search_index_statements(vendor):
+    if vendor == 'sqlite':
+        return ["DROP TRIGGER IF EXISTS %(fts)s_ai",
+                "DROP TRIGGER IF EXISTS %(fts)s_ad",
+                "DROP TRIGGER IF EXISTS %(fts)s_au",
+                "DROP TABLE IF EXISTS %(fts)s"]
+    elif vendor == 'postgresql':
+        return ["DROP INDEX IF EXISTS %(pg_index)s"]
+    elif vendor == 'mysql':
+        return ["DROP INDEX %(mysql_index)s ON %(entry)s"]
+    return []
+
+
+def _format(statements):
+    names = {'fts': FTS_TABLE,
+             'entry': ENTRY_TABLE,
+             'pg_index': PG_INDEX,
+             'mysql_index': MYSQL_INDEX}
+    return [x % names for x in statements]
+
+
+def create_search_index(db_connection=None):
+    db_connection = db_connection or connection
+    cursor = db_connection.cursor()
+    for statement in _format(search_index_statements(db_connection.vendor)):
+        cursor.execute(statement)
+
+
+def drop_search_index(db_connection=None):
+    db_connection = db_connection or connection
+    cursor = db_connection.cursor()
+    for statement in _format(drop_search_index_statements(db_connection.vendor)):
+        cursor.execute(statement)
+
+
+def _collect_strings(value, result):
+    if isinstance(value, basestring):
+        if value.strip():
+            result.append(value)
+    elif isinstance(value, dict):
+        for element in value.values():
+            _collect_strings(element, result)
+    elif isinstance(value, (list, tuple)):
+        for element in value:
+            _collect_strings(element, result)
+    return result
+
+
+def extract_text(data):
+    """
+    Extract the searchable text from the JSON of a report: all string
+    values contained in the JSON structure.
+    """
+    if not data:
+        return ''
+    try:
+        return "\n".join(_collect_strings(json.loads(data), []))
+    except ValueError:
+        return data
+
+
+def _fts5_query(value):
+    # Each word becomes a quoted phrase, such that characters with
+    # a special meaning in the FTS5 query syntax are harmless;
+    # the phrases are implicitly connected with AND.
+    return " ".join('"%s"' % word.replace('"', '""') for word in value.split())
+
+
+def search_entries(value, using='default'):
+    """
+    Return a queryset of the ``ReportSearchEntry`` objects matching the search term ``value``.
+    """
+    from .models import ReportSearchEntry
+
+    entries = ReportSearchEntry.objects.using(using)
+    vendor = connections[using].vendor
+
+    if vendor == 'sqlite':
+        return entries.extra(where=["%s.id IN (SELECT rowid FROM %s WHERE %s MATCH %%s)"
+                                    % (ENTRY_TABLE, FTS_TABLE, FTS_TABLE)],
+                             params=[_fts5_query(value)])
+    elif vendor == 'postgresql':
+        return entries.extra(where=["to_tsvector('simple', %s.name || ' ' || %s.body) @@ plainto_tsquery('simple', %%s)"
+                                    % (ENTRY_TABLE, ENTRY_TABLE)],
+                             params=[value])
+    elif vendor == 'mysql':
+        return entries.extra(where=["MATCH (%s.name, %s.body) AGAINST (%%s IN NATURAL LANGUAGE MODE)"
+                                    % (ENTRY_TABLE, ENTRY_TABLE)],
+                             params=[value])
+    else:
+        condition = Q()
+        for word in value.split():
+            condition &= (Q(name__icontains=word) | Q(body__icontains=word))
+        return entries.filter(condition)
+
+
+def search_reports(queryset, value):
+    """
+    Restrict ``queryset`` (of AuthoredData or ReportSummary objects) to the reports
+    whose latest revision matches the search term ``value``. Reports are identified
+    by group and identifier, since the same identifier may be used in several groups.
+    """
+    if not value or not value.strip():
+        return queryset
+    sql, params = search_entries(value, using=queryset.db).values('id').query.sql_with_params()
+    return queryset.extra(where=["EXISTS (SELECT 1 FROM %(entry)s entry WHERE entry.group_id = %(table)s.group_id "
+                                 "AND entry.identifier_id = %(table)s.identifier_id AND entry.id IN (%(sql)s))"
+                                 % {'entry': ENTRY_TABLE,
+                                    'table': queryset.model._meta.db_table,
+                                    'sql': sql}],
+                          params=list(params))
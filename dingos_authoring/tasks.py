@@ -2,9 +2,23 @@ from __future__ import absolute_import
 
 from celery import shared_task
 
+from django.db import transaction
+from django.utils import timezone
+
 from dingos.models import InfoObject
 
-from dingos_authoring.models import AuthoredData
+from dingos_authoring.models import AuthoredData, ReportSummary
+
+from dingos_authoring import DINGOS_AUTHORING_IMPORT_TIME_LIMIT, DINGOS_AUTHORING_IMPORT_MEMORY_LIMIT, \
+    DINGOS_AUTHORING_IMPORT_CHUNK_SIZE
+
+from dingos_authoring.resource_limits import run_with_limits
+
+from dingos_authoring.xml_delta import strip_unchanged_objects, object_uids
+
+from dingos_authoring.caching import bump_generation_on_commit, stix_cache, stix_cache_key
+
+from dingos_authoring.events import publish, set_import_state
 
 
 import logging
@@ -18,47 +32,177 @@ logger = logging.getLogger(__name__)
 def add(x, y):
     return x + y
 
+@shared_task(ignore_result=False)
+def scheduled_generation(transformer_class,
+                         jsn,
+                         author_view,
+                         namespace_uri,
+                         namespace_slug,
+                         user_pk):
+    """
+    Generate STIX for large reports outside of the request; the result
+    contains the primary key of the requesting user such that
+    the views serving the result can check who may access it.
+
+    Like a generation in the request, the XML is stored in the STIX cache;
+    the result contains the cache key, such that the views serving the
+    result can store it in the cache of their process as well.
+    """
+
+    t = transformer_class(jsn=jsn,
+                          namespace_uri=namespace_uri,
+                          namespace_slug=namespace_slug)
+
+    key = stix_cache_key(jsn, author_view, namespace_uri, namespace_slug)
+    stix = t.getStix()
+    if stix:
+        stix_cache.set(key, stix)
+
+    return {'user': user_pk,
+            'key': key,
+            'xml': stix}
+
+@shared_task(ignore_result=True)
+def flush_autosaves():
+    """
+    Write the autosaves buffered in the cache to the database (see ``autosave.py``).
+    """
+    from dingos_authoring.autosave import flush_autosaves as flush
+
+    return flush()
+
+def dispatch_on_commit(task, task_id, **kwargs):
+    """
+    Send ``task`` with the given id and arguments once the current transaction has
+    been committed, such that the worker finds the objects written in it. Without
+    ``transaction.on_commit`` (Django < 1.9), the task is sent right away: callers
+    then have to leave their atomic block first.
+    """
+    def dispatch():
+        task.apply_async(kwargs=kwargs, task_id=task_id)
+
+    on_commit = getattr(transaction, 'on_commit', None)
+    if on_commit:
+        on_commit(dispatch)
+    else:
+        dispatch()
+
+def publish_import_event(xml_import_obj, state, **kwargs):
+    """
+    Tell the editors of the authoring group and the user who started an import
+    about its progress (see ``events.py``); failures to do so must not affect
+    the import.
+    """
+    data = {'import': xml_import_obj.pk,
+            'identifier': xml_import_obj.identifier.name,
+            'name': xml_import_obj.name,
+            'user': xml_import_obj.user_id,
+            'state': state}
+    data.update(kwargs)
+    try:
+        set_import_state(xml_import_obj.pk, state)
+        publish('group:%s' % xml_import_obj.group_id, 'import', data)
+        if xml_import_obj.user_id:
+            publish('user:%s' % xml_import_obj.user_id, 'import', data)
+    except Exception, e:
+        logger.warning("Could not publish event for import %s: %s" % (xml_import_obj.pk, e))
+
 @shared_task(ignore_result=False)
 def scheduled_import(importer,
                      xml,
-                     xml_import_obj):
+                     xml_import_obj,
+                     previous_xml_import_pk=None):
+
+    publish_import_event(xml_import_obj, 'STARTED')
+
+    # If the report has been imported before (``previous_xml_import_pk`` is the
+    # primary key of the previous XML import), we only import
+    # objects that are new or have changed with respect to the
+    # previous import; unchanged objects are replaced by references
+    # in the imported document and the objects yielded by the previous
+    # import are linked to this import.
+
+    relinked_object_ids = []
+
+    previous_xml_import_obj = None
+    if previous_xml_import_pk:
+        try:
+            previous_xml_import_obj = AuthoredData.objects.get(pk=previous_xml_import_pk)
+        except AuthoredData.DoesNotExist:
+            logger.warning("Previous import %s does not exist anymore, importing complete document"
+                           % previous_xml_import_pk)
+
+    if previous_xml_import_obj and previous_xml_import_obj.data:
+        try:
+            available_uids = set(previous_xml_import_obj.yielded_iobjects.values_list('identifier__uid',flat=True))
+            reduced_xml, unchanged_ids = strip_unchanged_objects(xml,
+                                                                 previous_xml_import_obj.data,
+                                                                 available_uids)
+            if unchanged_ids:
+                relinked_object_ids = list(previous_xml_import_obj.yielded_iobjects.filter(
+                    identifier__uid__in=object_uids(unchanged_ids)).values_list('pk',flat=True))
+                xml = reduced_xml
+        except Exception, e:
+            logger.warning("Comparison with previous import %s failed, importing complete document: %s"
+                           % (previous_xml_import_obj.pk, e))
+            relinked_object_ids = []
+
+    # The import runs under the configured time and memory limits
+    # (see ``run_with_limits``), so that a huge or malformed document
+    # cannot take down the worker. If the import fails, we record
+    # the reason in the AuthoredData object and re-raise, such that
+    # the task is marked as failed.
 
-    created_object_info = importer.xml_import(xml_content = xml,
-                                              track_created_objects=True)
+    try:
+        created_object_info = run_with_limits(importer.xml_import,
+                                              kwargs={'xml_content': xml,
+                                                      'track_created_objects': True},
+                                              time_limit=DINGOS_AUTHORING_IMPORT_TIME_LIMIT,
+                                              memory_limit=DINGOS_AUTHORING_IMPORT_MEMORY_LIMIT)
+    except Exception, e:
+        logger.error("Import of %s failed: %s" % (xml_import_obj.pk, e))
+        AuthoredData.objects.filter(pk=xml_import_obj.pk).update(processing_error="%s" % e,
+                                                                  processed=timezone.now())
+        bump_generation_on_commit('group:%s' % xml_import_obj.group_id)
+        bump_generation_on_commit('user:%s' % xml_import_obj.user_id)
+        publish_import_event(xml_import_obj, 'FAILURE', msg="%s" % e)
+        raise
 
     # Now call set_name on each object once more;
     # this is required, because object names may depend on
     # names of referenced objects, and they do not always
-    # get created in the proper order.
+    # get created in the proper order. The objects are loaded
+    # in chunks, so that large imports are not held in memory.
 
     created_object_ids = [x['pk'] for x in created_object_info]
 
-    created_objects = list(InfoObject.objects.filter(pk__in=created_object_ids))
-
-
-    for object in created_objects:
-        name = object.set_name()
+    for i in range(0,len(created_object_ids),DINGOS_AUTHORING_IMPORT_CHUNK_SIZE):
+        for object in InfoObject.objects.filter(pk__in=created_object_ids[i:i+DINGOS_AUTHORING_IMPORT_CHUNK_SIZE]):
+            name = object.set_name()
 
-    xml_import_obj.yielded_iobjects.add(*created_objects)
+    xml_import_obj.link_yielded_iobjects(created_object_ids + relinked_object_ids)
 
     try:
-        top_level_iobject = InfoObject.objects.get(pk=created_object_ids[-1])
+        top_level_iobject = InfoObject.objects.select_related('identifier__namespace').get(pk=created_object_ids[-1])
     except:
         top_level_iobject = None
 
     if top_level_iobject:
-        # We need to retrieve the object once more, because
-        # if we save now, we are going to overwrite the object
-        # that has been written directly after the scheduled
-        # import was called.
-        # The 'add' call above, on the other hand, was ok,
-        # because that does not change the object -- it creates
-        # objects in an internal through-model
-
-        xml_import_obj_reloaded = AuthoredData.objects.get(pk=xml_import_obj.pk)
-
-        xml_import_obj_reloaded.top_level_iobject = top_level_iobject
-
-        xml_import_obj_reloaded.save()
+        # Only the top-level object is written, such that nothing else
+        # of the (possibly outdated) ``xml_import_obj`` is overwritten.
+
+        AuthoredData.objects.filter(pk=xml_import_obj.pk).update(top_level_iobject=top_level_iobject,
+                                                                  processed=timezone.now())
+        bump_generation_on_commit('user:%s' % xml_import_obj.user_id)
+
+        ReportSummary.set_top_level_iobject(xml_import_obj.pk, top_level_iobject)
+
+        publish_import_event(xml_import_obj, 'SUCCESS',
+                             top_level_iobject=top_level_iobject.pk,
+                             top_level_display=ReportSummary.top_level_display_for(top_level_iobject))
+    else:
+        AuthoredData.objects.filter(pk=xml_import_obj.pk).update(processed=timezone.now())
+        bump_generation_on_commit('user:%s' % xml_import_obj.user_id)
+        publish_import_event(xml_import_obj, 'SUCCESS')
 
     return created_object_info
@@ -33,6 +33,8 @@ urlpatterns = [
     url(r'^XMLImport/$', views.XMLImportView.as_view(), name= "dingos_authoring.action.xml_import"),
 
     url(r'^Imports$', views.ImportsView.as_view(), name="url.dingos_authoring.imports"),
+    url(r'^Imports/events$', views.ImportEventsView.as_view(), name="url.dingos_authoring.imports.events"),
+    url(r'^Export$', views.ExportView.as_view(), name="url.dingos_authoring.export"),
     url(r'^Action/_take_reports$', views.TakeReportView.as_view(), name="url.dingos_authoring.index.action.take"),
     url(r'^Action/SwitchAuthoringGroup$', views.SwitchAuthoringGroupView.as_view(), name="url.dingos_authoring.action.switch_authoring_group"),
 
@@ -40,6 +42,11 @@ urlpatterns = [
     # Cross-authoring-app functionality
     url(r'^load$', views.GetDraftJSON.as_view(), name="url.dingos_authoring.load_json"),
     url(r'/load$', views.GetDraftJSON.as_view(), name="url.dingos_authoring.load_json"),
+    url(r'^load_batch$', views.GetDraftsJSON.as_view(), name="url.dingos_authoring.load_json_batch"),
+    url(r'/load_batch$', views.GetDraftsJSON.as_view(), name="url.dingos_authoring.load_json_batch"),
+
+    url(r'^generation/(?P<job>[^/]+)$', views.GenerationStatusView.as_view(), name="url.dingos_authoring.generation_status"),
+    url(r'^generation/(?P<job>[^/]+)/xml$', views.GenerationResultView.as_view(), name="url.dingos_authoring.generation_result"),
 
     url(r'^get_namespace$', views.GetAuthoringNamespace.as_view(), name="url.dingos_authoring.get_namespace"),
     url(r'/get_namespace$', views.GetAuthoringNamespace.as_view(), name="url.dingos_authoring.get_namespace"),
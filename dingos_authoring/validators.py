@@ -15,11 +15,24 @@
 # Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
 #
 
+import json, logging, threading
 
 from django.core.exceptions import ValidationError
 
 import libxml2
 
+try:
+    import jsonschema
+except ImportError:
+    jsonschema = None
+
+import dingos_authoring.read_settings
+
+from dingos_authoring import DINGOS_AUTHORING_REPORT_SCHEMAS
+
+
+logger = logging.getLogger(__name__)
+
 
 def validate_xml(value):
     try:
@@ -27,3 +40,81 @@ def validate_xml(value):
         root = doc.getRootElement()
     except libxml2.parserError, e:
         raise ValidationError('Invalid XML')
+
+
+
+class ReportValidationError(StandardError):
+    """
+    Raised if a report does not conform to the schema of its author view;
+    ``path`` is the JSON pointer of the offending part of the report.
+    """
+
+    def __init__(self, msg, path=''):
+        super(ReportValidationError, self).__init__(msg)
+        self.path = path
+
+
+# Validators are compiled once per process and author view
+
+_report_validators = {}
+
+_report_validators_lock = threading.Lock()
+
+
+def _load_schema(schema):
+    if isinstance(schema, basestring):
+        with open(schema) as f:
+            return json.load(f)
+    return schema
+
+
+def get_report_validator(author_view, default_schema=None):
+    """
+    Return the validator for the reports of ``author_view``, compiled from the schema
+    registered in ``DINGOS_AUTHORING_REPORT_SCHEMAS`` or else ``default_schema``;
+    ``None`` if there is no schema or ``jsonschema`` is not installed.
+    """
+    try:
+        return _report_validators[author_view]
+    except KeyError:
+        pass
+
+    with _report_validators_lock:
+        if author_view in _report_validators:
+            return _report_validators[author_view]
+
+        schema = _load_schema(DINGOS_AUTHORING_REPORT_SCHEMAS.get(author_view, default_schema))
+        validator = None
+        if schema is not None:
+            if jsonschema is None:
+                logger.warning("No validation of reports of %s: jsonschema is not installed." % author_view)
+            else:
+                validator_class = jsonschema.validators.validator_for(schema)
+                validator_class.check_schema(schema)
+                validator = validator_class(schema)
+        _report_validators[author_view] = validator
+        return validator
+
+
+def validate_report(author_view, jsn, default_schema=None):
+    """
+    Parse the report ``jsn`` and validate it against the schema of ``author_view``
+    (see ``get_report_validator``). Returns the parsed report; raises
+    ``ReportValidationError`` if the report is invalid.
+    """
+    try:
+        document = json.loads(jsn)
+    except ValueError, e:
+        raise ReportValidationError("Invalid JSON: %s" % e)
+
+    if not isinstance(document, dict):
+        raise ReportValidationError("The report is not a JSON object.")
+
+    validator = get_report_validator(author_view, default_schema)
+    if validator is not None:
+        error = jsonschema.exceptions.best_match(validator.iter_errors(document))
+        if error is not None:
+            path = ''.join('/%s' % unicode(x).replace('~', '~0').replace('/', '~1') for x in error.path)
+            raise ReportValidationError(error.message, path)
+
+    return document
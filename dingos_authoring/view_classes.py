@@ -15,16 +15,36 @@
 # Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
 #
 
-import json, logging, traceback
+import json, logging, traceback, hashlib
+
+from uuid import uuid4
 
 from dingos.view_classes import BasicView
+from django.contrib.auth.models import User
 from django.core.exceptions import ObjectDoesNotExist
-from django.http import HttpResponse, HttpResponseRedirect
+from django.core.paginator import Page
+from django.core.urlresolvers import reverse
+from django.http import HttpResponse, HttpResponseRedirect, HttpResponseBadRequest
 from django.utils import timezone
 
-from .models import AuthoredData, GroupNamespaceMap, UserAuthoringInfo
+from .models import AuthoredData, GroupNamespaceMap, UserAuthoringInfo, ReportOwnership
+
+from .pagination import keyset_ordering, keyset_paginate, CachedCountPaginator, FixedCountPaginator
+
+from .caching import stix_cache, stix_cache_key, get_cached_namespace_info, set_cached_namespace_info, \
+    count_cache_key, list_cache_key, get_authoring_cache, authoring_cache_is_shared, atomic_with_invalidation
+
+from .compression import decompress_request, compress_response, DecompressionError
+
+from .json_patch import apply_patch, JSONPatchError
 
-from . import DINGOS_AUTHORING_CELERY_BUG_WORKAROUND
+from .autosave import buffer_autosave
+
+from .validators import validate_report, ReportValidationError
+
+from . import DINGOS_AUTHORING_CELERY_BUG_WORKAROUND, DINGOS_AUTHORING_ASYNC_GENERATION_THRESHOLD, \
+    DINGOS_AUTHORING_COUNT_MODE, DINGOS_AUTHORING_LIST_CACHE_TIMEOUT, DINGOS_AUTHORING_AUTOSAVE_FLUSH_INTERVAL, \
+    DINGOS_AUTHORING_KEYSET_PAGINATION
 
 from . import tasks
 
@@ -49,6 +69,36 @@ class AuthoringMethodMixin(object):
 
     @staticmethod
     def get_authoring_namespaces(user,fail_silently=True,return_available_groups=False):
+        """
+        Determine the authoring group and namespaces of the user.
+
+        Since this requires several queries, the result is cached across requests
+        (see ``caching.get_cached_namespace_info``); the cache is invalidated
+        via signals when groups, namespaces, namespace mappings, authoring info or group memberships
+        change.
+        """
+
+        if return_available_groups or not user.pk:
+            return AuthoringMethodMixin._resolve_authoring_namespaces(user,
+                                                                      fail_silently=fail_silently,
+                                                                      return_available_groups=return_available_groups)
+
+        found, namespace_info = get_cached_namespace_info(user.pk)
+
+        if not found:
+            namespace_info = AuthoringMethodMixin._resolve_authoring_namespaces(user,fail_silently=True)
+            set_cached_namespace_info(user.pk,namespace_info)
+
+        if not fail_silently:
+            if not namespace_info:
+                raise StandardError("User not allowed to author data.")
+            elif isinstance(namespace_info,list):
+                raise StandardError("Current user is member of more than one authoring groups")
+
+        return namespace_info
+
+    @staticmethod
+    def _resolve_authoring_namespaces(user,fail_silently=True,return_available_groups=False):
 
         namespace_infos = None
 
@@ -57,12 +107,13 @@ class AuthoringMethodMixin(object):
 
         # Is there a default authoring namespace for this user?
         try:
-            user_authoring_info = UserAuthoringInfo.objects.get(user=user)
+            user_authoring_info = UserAuthoringInfo.objects.select_related('default_authoring_namespace_info__group',
+                                                                           'default_authoring_namespace_info__default_namespace').get(user=user)
             namespace_info_obj = user_authoring_info.default_authoring_namespace_info
             # Make sure that the user is in the group associated with this namespace map!!!
             # This is necessary to make sure that once a user has been removed from a group,
             # the user cannot continue to work in the group's namespace
-            if user in namespace_info_obj.group.user_set.all():
+            if namespace_info_obj.group.user_set.filter(pk=user.pk).exists():
                 namespace_info =  {'authoring_group' : namespace_info_obj.group,
                                    'default':namespace_info_obj.default_namespace,
                                    'allowed':namespace_info_obj.allowed_namespaces.all()}
@@ -137,11 +188,333 @@ class AuthoringMethodMixin(object):
 
 
 
-class BasicProcessingView(AuthoringMethodMixin,BasicView):
+class KeysetPaginationMixin(object):
+    """
+    Mixin for list views that replaces offset pagination by seeking on
+    ``(field, pk)`` whenever the list is ordered by a single field of the
+    model (e.g., timestamp, name, status or user): neither a count nor an offset
+    scan is required, so the cost of a page does not depend on how far back
+    the user is browsing. For other orderings, the ordinary pagination is used.
+
+    The position in the list is passed in the GET parameters ``after``
+    or ``before``; the page object provides the query strings for
+    the next and previous page (see ``includes/_KeysetPagination.html``).
+    Keyset pagination can be switched off with ``DINGOS_AUTHORING_KEYSET_PAGINATION``.
+    """
+
+    keyset_pagination = DINGOS_AUTHORING_KEYSET_PAGINATION
+
+    def paginate_queryset(self, queryset, page_size):
+        ordering = keyset_ordering(queryset) if self.keyset_pagination else None
+
+        if ordering is None:
+            return super(KeysetPaginationMixin,self).paginate_queryset(queryset, page_size)
+
+        field, descending = ordering
+
+        page = keyset_paginate(queryset,
+                               page_size,
+                               after=self.request.GET.get('after'),
+                               before=self.request.GET.get('before'),
+                               descending=descending,
+                               field=field)
+
+        page.next_query = self._keyset_query('after', page.next_cursor)
+        page.previous_query = self._keyset_query('before', page.previous_cursor)
+        page.count = self.keyset_count(queryset)
+
+        return (None, page, page.object_list, False)
+
+    def keyset_count(self, queryset):
+        """
+        Total number of objects shown with a keyset page, or ``None``: keyset
+        pagination avoids counting, unless the count is cached anyhow
+        (see ``CachedCountMixin``).
+        """
+        return None
+
+    def _keyset_query(self, direction, cursor):
+        query = self.request.GET.copy()
+        for key in ('page', 'after', 'before'):
+            if key in query:
+                del query[key]
+        if cursor:
+            query[direction] = cursor
+        return query.urlencode()
+
+
+
+
+class CachedCountMixin(object):
+    """
+    Mixin for list views with ``counting_paginator = True`` that takes the
+    count of objects from the cache rather than counting on every request
+    (see ``DINGOS_AUTHORING_COUNT_MODE``). The view must also use the
+    ``AuthoringMethodMixin``.
+
+    The count is cached for the authoring group under the signature returned by
+    ``count_signature`` plus the filter parameters of the request.
+    For unfiltered lists, the write paths in ``AuthoredData`` invalidate the count
+    when it changes (see ``AuthoredData.object_create``); counts of filtered lists
+    become invalid with every write to the group's data.
+
+    Keyset pages (see ``KeysetPaginationMixin``) show the cached count
+    as total; the mixin must precede ``KeysetPaginationMixin``.
+    """
+
+    # GET parameters that do not influence the count
+
+    non_filter_parameters = ('o', 'page', 'after', 'before')
+
+    def count_signature(self):
+        return None
+
+    def get_paginator(self, queryset, per_page, orphans=0, allow_empty_first_page=True, **kwargs):
+        signature = self.count_signature()
+
+        namespace_info = self.namespace_info
+
+        if not getattr(self, 'counting_paginator', False) or DINGOS_AUTHORING_COUNT_MODE == 'exact' \
+                or not signature or not namespace_info or isinstance(namespace_info,list):
+            return super(CachedCountMixin,self).get_paginator(queryset, per_page, orphans=orphans,
+                                                              allow_empty_first_page=allow_empty_first_page,
+                                                              **kwargs)
+
+        filter_parameters = sorted((key, value) for (key, value) in self.request.GET.items()
+                                   if value and key not in self.non_filter_parameters)
+
+        if filter_parameters:
+            signature = "%s:%s" % (signature, hashlib.sha1(repr(filter_parameters)).hexdigest())
+
+        count_key = count_cache_key(namespace_info['authoring_group'].pk,
+                                    signature,
+                                    incremental=not filter_parameters)
+
+        return CachedCountPaginator(queryset, per_page,
+                                    count_key=count_key,
+                                    approximate=(DINGOS_AUTHORING_COUNT_MODE == 'approximate'
+                                                 and not filter_parameters),
+                                    orphans=orphans,
+                                    allow_empty_first_page=allow_empty_first_page)
+
+    def keyset_count(self, queryset):
+        paginator = self.get_paginator(queryset, 1)
+        if isinstance(paginator, CachedCountPaginator):
+            return paginator.count
+        return super(CachedCountMixin,self).keyset_count(queryset)
+
+
+
+
+class CachedListMixin(object):
+    """
+    Mixin for list views that caches the page shown for a request
+    (the objects of the page and the count) for the scope returned by
+    ``list_cache_scope`` -- by default the user's authoring group --
+    and the request's parameters. Must precede the pagination mixins.
+
+    Cache keys contain the generation of the scope, which is increased
+    by every write to the AuthoredData objects of the scope (see ``models.py``),
+    so a stale page is never served. This requires a cache shared by all
+    processes; for a process-local cache, pages are not cached
+    (see ``DINGOS_AUTHORING_LIST_CACHE_TIMEOUT``).
+    """
+
+    def list_cache_scope(self):
+        namespace_info = self.namespace_info
+        if not namespace_info or isinstance(namespace_info,list):
+            return None
+        return 'group:%s' % namespace_info['authoring_group'].pk
+
+    def paginate_queryset(self, queryset, page_size):
+        scope = None
+        if DINGOS_AUTHORING_LIST_CACHE_TIMEOUT and authoring_cache_is_shared():
+            scope = self.list_cache_scope()
+
+        if not scope:
+            return super(CachedListMixin,self).paginate_queryset(queryset, page_size)
+
+        signature = repr((self.__class__.__name__,
+                          page_size,
+                          sorted(self.kwargs.items()),
+                          sorted(self.request.GET.lists())))
+        key = list_cache_key(scope,signature)
+        cache = get_authoring_cache()
+
+        cached = cache.get(key)
+        if cached is not None:
+            return self._restore_page(cached)
+
+        result = super(CachedListMixin,self).paginate_queryset(queryset, page_size)
+        cache.set(key,self._freeze_page(result),DINGOS_AUTHORING_LIST_CACHE_TIMEOUT)
+        return result
+
+    @staticmethod
+    def _freeze_page(result):
+        # The paginator refers to the queryset, which must not be pickled
+        # (this would retrieve all objects); we keep what is needed to
+        # rebuild the page.
+        (paginator, page, object_list, is_paginated) = result
+        if getattr(page,'keyset',False):
+            return ('keyset', page)
+        return ('offset',
+                list(page.object_list),
+                page.number,
+                paginator.count,
+                paginator.per_page,
+                paginator.orphans,
+                paginator.allow_empty_first_page,
+                is_paginated)
+
+    @staticmethod
+    def _restore_page(cached):
+        if cached[0] == 'keyset':
+            page = cached[1]
+            return (None, page, page.object_list, False)
+        (kind, object_list, number, count, per_page, orphans, allow_empty_first_page, is_paginated) = cached
+        paginator = FixedCountPaginator(count,
+                                        per_page,
+                                        orphans=orphans,
+                                        allow_empty_first_page=allow_empty_first_page)
+        page = Page(object_list, number, paginator)
+        return (paginator, page, object_list, is_paginated)
+
+
+
+
+class RevisionConflict(JSONPatchError):
+    """
+    Raised if a JSON patch has been created against an outdated revision.
+    """
+    pass
+
+
+
+
+class CompressionMixin(object):
+    """
+    Mixin for views exchanging report payloads: accepts gzip-encoded request
+    bodies and compresses responses if the client accepts it
+    (see ``compression.py``).
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            decompress_request(request)
+        except DecompressionError, e:
+            return HttpResponseBadRequest("%s" % e)
+        response = super(CompressionMixin,self).dispatch(request, *args, **kwargs)
+        return compress_response(request, response)
+
+
+
+
+class BasicProcessingView(CompressionMixin,AuthoringMethodMixin,BasicView):
     importer_class = None
     author_view = None
     transformer = None
 
+    # JSON schema (or path of a file containing it) for the reports of this
+    # view; can be overridden per author view in ``DINGOS_AUTHORING_REPORT_SCHEMAS``.
+    report_schema = None
+
+    def _stix_cache_key(self, jsn, namespace_info):
+        return stix_cache_key(jsn,
+                              self.author_view,
+                              namespace_info['default_ns_uri'],
+                              namespace_info['default_ns_slug'])
+
+    def generate_in_background(self, jsn, namespace_info):
+        """
+        Decide whether STIX for ``jsn`` is to be generated by a background task:
+        this is the case for large reports or if the editor asks for it -- unless
+        the result is available from the cache anyhow.
+        """
+        if not (self.request.POST.get(u'async') or
+                    (DINGOS_AUTHORING_ASYNC_GENERATION_THRESHOLD is not None
+                     and len(jsn) >= DINGOS_AUTHORING_ASYNC_GENERATION_THRESHOLD)):
+            return False
+        return stix_cache.get(self._stix_cache_key(jsn, namespace_info)) is None
+
+    def generate_stix(self, jsn, namespace_info):
+        """
+        Transform ``jsn`` into STIX. Since editors often generate the same
+        report several times and importing requires a generation
+        as well, the result is cached.
+        """
+        key = self._stix_cache_key(jsn, namespace_info)
+        stix = stix_cache.get(key)
+        if stix is None:
+            t = self.transformer(jsn=jsn,
+                                 namespace_uri=namespace_info['default_ns_uri'],
+                                 namespace_slug=namespace_info['default_ns_slug'],)
+            stix = t.getStix()
+            if stix:
+                stix_cache.set(key, stix)
+        return stix
+
+    def validate_report(self, jsn):
+        """
+        Validate ``jsn`` against the schema of the author view before it
+        is stored or transformed; raises ``ReportValidationError``.
+        """
+        return validate_report(self.author_view, jsn, self.report_schema)
+
+    def check_ownership(self, group_id, identifier_id):
+        """
+        Only the owner of a report may save it; saving renews the owner's lease.
+        Returns an error message if the user does not own the report (anymore).
+        """
+        if ReportOwnership.renew(group_id,identifier_id,self.request.user):
+            return None
+        owner = User.objects.filter(pk=ReportOwnership.holder_id(group_id,identifier_id))
+        if not owner:
+            return 'You do not own the authoring object anymore; take the object in order to save it.'
+        return 'The authoring object has been taken from you by user %s; you are not allowed' \
+               ' to save the object anymore.' % owner[0]
+
+    @staticmethod
+    def is_unchanged(previous_obj, jsn):
+        """
+        Compare ``jsn`` with the data of ``previous_obj`` via the stored content hash,
+        such that the data need not be loaded. Both must have been serialized
+        with ``AuthoredData.serialize_report``. Objects without hash (which the
+        migration computing the hashes has missed) are treated as changed.
+        """
+        if not previous_obj.content_hash:
+            return False
+        return previous_obj.content_hash == AuthoredData.hash_content(jsn)
+
+    def apply_patch(self, identifier, namespace_info, patch, base_token):
+        """
+        Apply the JSON patch ``patch`` to the latest revision of the report, which
+        must be the revision identified by ``base_token``. Returns a tuple of the
+        base revision and the patched JSON.
+        """
+        try:
+            base_obj = AuthoredData.objects.select_related('user').get(identifier__name=identifier,
+                                                                       group=namespace_info['authoring_group'],
+                                                                       latest=True)
+        except ObjectDoesNotExist:
+            raise JSONPatchError("Report %s does not exist." % identifier)
+
+        if base_obj.revision_token != base_token:
+            raise RevisionConflict("The report has been changed since you loaded it; please reload the report.")
+
+        try:
+            operations = json.loads(patch)
+        except ValueError, e:
+            raise JSONPatchError("Invalid JSON: %s" % e)
+
+        if not operations:
+            return (base_obj, base_obj.data)
+
+        document = apply_patch(json.loads(base_obj.data), operations)
+        if not isinstance(document, dict):
+            raise JSONPatchError("The patched report is not a JSON object.")
+
+        return (base_obj, AuthoredData.serialize_report(document))
+
     def post(self, request, *args, **kwargs):
         res = {
             'status': False,
@@ -152,8 +525,8 @@ class BasicProcessingView(AuthoringMethodMixin,BasicView):
             POST = request.POST
             res['msg']=''
             jsn = ''
-            if POST.has_key(u'jsn'):
-                jsn = POST[u'jsn']
+            if POST.has_key(u'jsn') or POST.has_key(u'patch'):
+                jsn = POST.get(u'jsn','')
                 submit_name = POST[u'submit_name']
                 identifier = POST.get(u'id')
                 submit_action = POST.get(u'action')
@@ -173,124 +546,242 @@ class BasicProcessingView(AuthoringMethodMixin,BasicView):
                     res['status'] = False
                     return HttpResponse(json.dumps(res), content_type="application/json")
 
-                if submit_action in ['save','release','import']:
+                # Instead of the complete report, the editor may send a JSON patch
+                # against the revision identified by the token ``base``.
 
+                base_obj = None
+                if POST.has_key(u'patch'):
                     try:
-                        previous_obj = AuthoredData.objects.get(identifier__name=identifier,
-                                                                group = namespace_info['authoring_group'],
-                                                                latest = True)
-                        status = previous_obj.status
-                        if status == AuthoredData.IMPORTED:
-                            status = AuthoredData.UPDATE
-                    except ObjectDoesNotExist:
-                        previous_obj = None
-                        status = AuthoredData.DRAFT
-
-                    if previous_obj and previous_obj.user != self.request.user:
-                        res['msg'] = 'The authoring object has been taken from you by user %s; you are not allowed' \
-                                     ' to save the object anymore.' % previous_obj.user
-
+                        base_obj, jsn = self.apply_patch(identifier,
+                                                                    namespace_info,
+                                                                    POST[u'patch'],
+                                                                    POST.get(u'base'))
+                    except RevisionConflict, e:
+                        res['msg'] = "%s" % e
+                        res['status'] = False
+                        res['conflict'] = True
+                        return HttpResponse(json.dumps(res), content_type="application/json")
+                    except JSONPatchError, e:
+                        res['msg'] = 'The changes could not be applied: %s' % e
                         res['status'] = False
                         return HttpResponse(json.dumps(res), content_type="application/json")
 
-                    if previous_obj and previous_obj.data == jsn:
-                        res['msg'] = "No changes to be saved. "
+                if submit_action == 'autosave':
+                    # Autosaves are subject to the ownership of the report like saves.
+                    previous_identifier_ids = AuthoredData.objects.filter(identifier__name=identifier,
+                                                                          group=namespace_info['authoring_group'],
+                                                                          latest=True).\
+                        values_list('identifier_id',flat=True)[:1]
+                    if previous_identifier_ids:
+                        msg = self.check_ownership(namespace_info['authoring_group'].pk,previous_identifier_ids[0])
+                        if msg:
+                            res['msg'] = msg
+                            res['status'] = False
+                            return HttpResponse(json.dumps(res), content_type="application/json")
+
+                    # Autosaves go into the buffer, which is flushed to the database
+                    # periodically by a task (see ``autosave.py``); the worker only
+                    # sees the buffer if the cache is shared between processes.
+                    if authoring_cache_is_shared():
+                        if buffer_autosave(namespace_info['authoring_group'],
+                                           identifier,
+                                           request.user,
+                                           jsn,
+                                           submit_name,
+                                           self.author_view):
+                            tasks.flush_autosaves.apply_async(countdown=DINGOS_AUTHORING_AUTOSAVE_FLUSH_INTERVAL)
                     else:
-                        obj = AuthoredData.object_create(kind=AuthoredData.AUTHORING_JSON,
-                                                   user=self.request.user,
-                                                   group=namespace_info['authoring_group'],
-                                                   identifier= identifier,
-                                                   timestamp=timezone.now(),
-                                                   status=status,
-                                                   name=submit_name,
-                                                   author_view=self.author_view,
-                                                   data = jsn)
-
-                        res['msg'] = 'Changes saved. '
-
-                    if submit_action == 'release':
-                        obj = AuthoredData.object_create(kind=AuthoredData.AUTHORING_JSON,
-                                                   user=None,
+                        AuthoredData.object_create(kind=AuthoredData.AUTHORING_JSON,
+                                                   status=AuthoredData.AUTOSAVE,
+                                                   user=request.user,
                                                    group=namespace_info['authoring_group'],
-                                                   identifier= identifier,
+                                                   identifier=identifier,
                                                    timestamp=timezone.now(),
-                                                   status=status,
                                                    name=submit_name,
                                                    author_view=self.author_view,
-                                                   data = jsn)
-                        res['msg'] += 'Report released. '
-
+                                                   data=jsn)
+                    res['msg'] = 'Autosaved. '
                     res['status'] = True
+                    return HttpResponse(json.dumps(res), content_type="application/json")
 
-                if submit_action in ["generate", "import"]:
-                    t = self.transformer(jsn=jsn,
-                                         namespace_uri=namespace_info['default_ns_uri'],
-                                         namespace_slug=namespace_info['default_ns_slug'],)
-                    stix = t.getStix()
-
-                    if not stix:
-                        res['msg'] += "STIX could not be created."
+                if submit_action in ['save','release','import','generate']:
+                    try:
+                        document = self.validate_report(jsn)
+                    except ReportValidationError, e:
+                        res['msg'] = 'The report is invalid: %s' % e
+                        if e.path:
+                            res['msg'] += ' (at %s)' % e.path
+                        res['path'] = e.path
                         res['status'] = False
                         return HttpResponse(json.dumps(res), content_type="application/json")
-                    else:
-                        res['status'] = True
-                        res['msg'] += "STIX successfully generated. "
-                        res['xml'] = stix
-
-                    if submit_action == 'import':
-                        self.importer_class.xml_import
-
-                        importer = self.importer_class(allowed_identifier_ns_uris=namespace_info['allowed_ns_uris'] + [namespace_info['default_ns_uri']],
-                                                            default_identifier_ns_uri=namespace_info['default_ns_uri'],
-                                                            substitute_unallowed_namespaces=True)
-
-
-                        xml_import_obj = AuthoredData.object_create(kind=AuthoredData.XML,
-                                                                    user=request.user,
-                                                                    group=namespace_info['authoring_group'],
-                                                                    identifier= identifier,
-                                                                    timestamp=timezone.now(),
-                                                                    status=AuthoredData.IMPORTED,
-                                                                    name=submit_name,
-                                                                    author_view=None,
-                                                                    data = res['xml'])
-
-
-                        #result = scheduled_import.delay(importer=importer,
-
-                        if DINGOS_AUTHORING_CELERY_BUG_WORKAROUND:
-                            # This is an ugly hack which breaks the independence of the django-dingos-authoring
-                            # app from the top-level configuration.
-                            # The hack may be required in instances where the celery tasks defined in Django
-                            # are not instantiated correctly: we have a system on which the configuration of
-                            # celery as seen when starting the worker is perfectly ok, yet within Django,
-                            # the tasks are not assigned the correct backend.
-                            from mantis.celery import app as celery_app
-
-
-
-                        result = tasks.scheduled_import.delay(importer=importer,
-                                                        xml=res['xml'],
-                                                        xml_import_obj=xml_import_obj)
-
-                        xml_import_obj.processing_id = result.id
-
-                        xml_import_obj.save()
-
-                        AuthoredData.object_create(kind=AuthoredData.AUTHORING_JSON,
-                                                   user=None,
-                                                   group=namespace_info['authoring_group'],
-                                                   identifier= identifier,
-                                                   timestamp= timezone.now(),
-                                                   status=AuthoredData.IMPORTED,
-                                                   name=submit_name,
-                                                   author_view=self.author_view,
-                                                   data = jsn,
-                                                   yielded = xml_import_obj)
+                    jsn = AuthoredData.serialize_report(document)
+
+                # For imports, STIX is generated before the transaction is
+                # opened, since the transformer may take a while.
+
+                stix = None
+                if submit_action == 'import':
+                    stix = self.generate_stix(jsn, namespace_info)
+
+                # Saving, releasing and importing are submitted in one transaction;
+                # the import task is only sent once it has been committed, such
+                # that the worker finds all rows written here.
+
+                import_task = None
+
+                with atomic_with_invalidation():
+                    if submit_action in ['save','release','import']:
+
+                        try:
+                            previous_obj = base_obj or \
+                                           AuthoredData.objects.select_related('user').defer('data').\
+                                               get(identifier__name=identifier,
+                                                   group = namespace_info['authoring_group'],
+                                                   latest = True)
+                            status = previous_obj.status
+                            if status == AuthoredData.IMPORTED:
+                                status = AuthoredData.UPDATE
+                        except ObjectDoesNotExist:
+                            previous_obj = None
+                            status = AuthoredData.DRAFT
+
+                        if previous_obj:
+                            msg = self.check_ownership(previous_obj.group_id,previous_obj.identifier_id)
+                            if msg:
+                                res['msg'] = msg
+                                res['status'] = False
+                                return HttpResponse(json.dumps(res), content_type="application/json")
+
+                        if previous_obj and self.is_unchanged(previous_obj, jsn):
+                            res['msg'] = "No changes to be saved. "
+                            res['token'] = previous_obj.revision_token
+                        else:
+                            obj = AuthoredData.object_create(kind=AuthoredData.AUTHORING_JSON,
+                                                       user=self.request.user,
+                                                       group=namespace_info['authoring_group'],
+                                                       identifier= identifier,
+                                                       timestamp=timezone.now(),
+                                                       status=status,
+                                                       name=submit_name,
+                                                       author_view=self.author_view,
+                                                       data = jsn)
+
+                            if not previous_obj:
+                                ReportOwnership.acquire(obj.group_id,obj.identifier_id,self.request.user)
+
+                            res['msg'] = 'Changes saved. '
+                            res['token'] = obj.revision_token
+
+                        if submit_action == 'release':
+                            ReportOwnership.release(namespace_info['authoring_group'].pk,
+                                                    (previous_obj or obj).identifier_id)
+                            res['msg'] += 'Report released. '
 
+                        res['status'] = True
 
+                    if submit_action == "generate" and self.generate_in_background(jsn, namespace_info):
+                        result = tasks.scheduled_generation.delay(transformer_class=self.transformer,
+                                                                  jsn=jsn,
+                                                                  author_view=self.author_view,
+                                                                  namespace_uri=namespace_info['default_ns_uri'],
+                                                                  namespace_slug=namespace_info['default_ns_slug'],
+                                                                  user_pk=request.user.pk)
                         res['status'] = True
-                        res['msg'] += "Import started and report released. "
+                        res['msg'] += "STIX generation started. "
+                        res['job'] = result.id
+                        res['status_url'] = reverse('url.dingos_authoring.generation_status', kwargs={'job': result.id})
+                        return HttpResponse(json.dumps(res), content_type="application/json")
+
+                    if submit_action in ["generate", "import"]:
+                        if submit_action == "generate":
+                            stix = self.generate_stix(jsn, namespace_info)
+
+                        if not stix:
+                            res['msg'] += "STIX could not be created."
+                            res['status'] = False
+                            return HttpResponse(json.dumps(res), content_type="application/json")
+                        else:
+                            res['status'] = True
+                            res['msg'] += "STIX successfully generated. "
+                            res['xml'] = stix
+
+                        if submit_action == 'import':
+                            self.importer_class.xml_import
+
+                            importer = self.importer_class(allowed_identifier_ns_uris=namespace_info['allowed_ns_uris'] + [namespace_info['default_ns_uri']],
+                                                                default_identifier_ns_uri=namespace_info['default_ns_uri'],
+                                                                substitute_unallowed_namespaces=True)
+
+
+                            # The id of the import task is chosen here, such that it is
+                            # written together with the object rather than afterwards.
+
+                            task_id = "%s" % uuid4()
+
+                            xml_import_obj = AuthoredData.object_create(kind=AuthoredData.XML,
+                                                                        user=request.user,
+                                                                        group=namespace_info['authoring_group'],
+                                                                        identifier= identifier,
+                                                                        timestamp=timezone.now(),
+                                                                        status=AuthoredData.IMPORTED,
+                                                                        name=submit_name,
+                                                                        author_view=None,
+                                                                        processing_id=task_id,
+                                                                        data = res['xml'])
+
+
+                            #result = scheduled_import.delay(importer=importer,
+
+                            if DINGOS_AUTHORING_CELERY_BUG_WORKAROUND:
+                                # This is an ugly hack which breaks the independence of the django-dingos-authoring
+                                # app from the top-level configuration.
+                                # The hack may be required in instances where the celery tasks defined in Django
+                                # are not instantiated correctly: we have a system on which the configuration of
+                                # celery as seen when starting the worker is perfectly ok, yet within Django,
+                                # the tasks are not assigned the correct backend.
+                                from mantis.celery import app as celery_app
+
+
+
+                            # If the report has been imported before, we hand the
+                            # previous import to the import task such that
+                            # only new or changed objects are imported. Only its
+                            # primary key is sent, since the task message would
+                            # otherwise carry the previous document.
+
+                            previous_xml_import_pks = AuthoredData.objects.filter(kind=AuthoredData.AUTHORING_JSON,
+                                                                                  group=namespace_info['authoring_group'],
+                                                                                  identifier__name=identifier,
+                                                                                  status=AuthoredData.IMPORTED,
+                                                                                  yielded__top_level_iobject__isnull=False,
+                                                                                  yielded__processing_error='').\
+                                order_by('-timestamp').values_list('yielded_id',flat=True)[:1]
+
+                            import_task = {'task_id': task_id,
+                                           'importer': importer,
+                                           'xml': res['xml'],
+                                           'xml_import_obj': xml_import_obj,
+                                           'previous_xml_import_pk': previous_xml_import_pks[0] if previous_xml_import_pks else None}
+
+                            imported_obj = AuthoredData.object_create(kind=AuthoredData.AUTHORING_JSON,
+                                                       user=None,
+                                                       group=namespace_info['authoring_group'],
+                                                       identifier= identifier,
+                                                       timestamp= timezone.now(),
+                                                       status=AuthoredData.IMPORTED,
+                                                       name=submit_name,
+                                                       author_view=self.author_view,
+                                                       data = jsn,
+                                                       yielded = xml_import_obj)
+
+                            ReportOwnership.release(imported_obj.group_id,imported_obj.identifier_id)
+
+
+                            res['status'] = True
+                            res['msg'] += "Import started and report released. "
+
+                if import_task:
+                    tasks.dispatch_on_commit(tasks.scheduled_import, **import_task)
 
         except Exception, e:
             res['msg'] = "An error occured: %s" % str(e)
@@ -15,7 +15,7 @@
 # Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
 #
 
-import sys, re, traceback, json, collections, logging, libxml2, importlib, pkgutil, hashlib
+import sys, re, traceback, json, collections, logging, libxml2, importlib, pkgutil, hashlib, time
 from uuid import uuid4
 from base64 import b64encode
 from operator import itemgetter
@@ -27,10 +27,13 @@ from django.contrib import messages
 from django.contrib.auth.models import User, Group
 from django.core.exceptions import ObjectDoesNotExist, MultipleObjectsReturned
 from django.db.models import Q
-from django.http import HttpResponse, HttpResponseRedirect
+from django.core.urlresolvers import reverse
+from django.http import HttpResponse, HttpResponseRedirect, Http404, HttpResponseBadRequest, \
+    HttpResponseForbidden, HttpResponseNotModified, StreamingHttpResponse
 from django.shortcuts import render_to_response
 from django.template import RequestContext
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 
 
 from braces.views import LoginRequiredMixin, SuperuserRequiredMixin
@@ -39,18 +42,28 @@ from dingos import DINGOS_INTERNAL_IOBJECT_FAMILY_NAME, DINGOS_TEMPLATE_FAMILY
 from dingos.core.utilities import lookup_in_re_list
 from dingos.importer import Generic_XML_Import
 from dingos.models import InfoObject, InfoObject2Fact
-from dingos.view_classes import BasicListView, BasicTemplateView, BasicJSONView, BasicFilterView, BasicListActionView
+from dingos.view_classes import BasicListView, BasicTemplateView, BasicJSONView, BasicFilterView, BasicListActionView, BasicView
 
 
 
 from forms import XMLImportForm, SwitchAuthoringGroupForm
 import forms as observables
 
-from . import DINGOS_AUTHORING_IMPORTER_REGISTRY, DINGOS_AUTHORING_CELERY_BUG_WORKAROUND
+from . import DINGOS_AUTHORING_IMPORTER_REGISTRY, DINGOS_AUTHORING_CELERY_BUG_WORKAROUND, \
+    DINGOS_AUTHORING_DRAFT_LIST_PAGE_SIZE, DINGOS_AUTHORING_BATCH_LOAD_LIMIT, DINGOS_AUTHORING_EVENT_STREAM_TIMEOUT, \
+    DINGOS_AUTHORING_OWNERSHIP_TTL
 
-from .filter import ImportFilter, AuthoringObjectFilter
-from .models import GroupNamespaceMap, AuthoredData, Identifier, UserAuthoringInfo
-from .view_classes import AuthoringMethodMixin
+from . import events
+
+from .caching import stix_cache, atomic_with_invalidation
+
+from .autosave import buffered_autosave
+from .export import export_queryset, export_lines, EXPORT_FORMATS, EXPORT_SCOPES, CONTENT_TYPES
+from .filter import ImportFilter, ReportSummaryFilter
+from .pagination import keyset_paginate
+from .models import GroupNamespaceMap, AuthoredData, Identifier, UserAuthoringInfo, ReportSummary, ReportOwnership
+from .view_classes import AuthoringMethodMixin, KeysetPaginationMixin, CachedCountMixin, CachedListMixin, \
+    CompressionMixin
 
 
 
@@ -88,7 +101,7 @@ for (matcher,module,class_name) in DINGOS_AUTHORING_IMPORTER_REGISTRY:
 #
 #    #celery_app = FakeCeleryApp(tasks=fake_tasks)
 
-class AuthoredDataHistoryView(AuthoringMethodMixin,BasicListView):
+class AuthoredDataHistoryView(AuthoringMethodMixin,CachedListMixin,CachedCountMixin,KeysetPaginationMixin,BasicListView):
     """
     Overview of history of an Authoring object.
     """
@@ -120,19 +133,27 @@ class AuthoredDataHistoryView(AuthoringMethodMixin,BasicListView):
 
         return AuthoredData.objects.filter(group=self.namespace_info['authoring_group'],
                                                   identifier__name=self.kwargs['id']).order_by('-timestamp'). \
-            prefetch_related('identifier','group','user','author_view').prefetch_related('top_level_iobject',
-                                                                                         'top_level_iobject__identifier',
-                                                                                         'top_level_iobject__identifier__namespace')
+            select_related('identifier','user','author_view','yielded')
+
+    def count_signature(self):
+        return AuthoredData.history_count_signature(self.kwargs['id'])
 
     def get_context_data(self, **kwargs):
         context = super(AuthoredDataHistoryView, self).get_context_data(**kwargs)
         context['highlight_pk'] = self.request.GET.get('highlight',None)
+        # The revisions record who saved them; who may edit the report
+        # is determined by its current owner.
+        context['owner_id'] = None
+        if self.namespace_info and not isinstance(self.namespace_info,list):
+            for owner_id in ReportOwnership.active(self.namespace_info['authoring_group']).\
+                    filter(identifier__name=self.kwargs['id']).values_list('user_id',flat=True):
+                context['owner_id'] = owner_id
         return context
 
 
 
 
-class index(AuthoringMethodMixin,BasicFilterView):
+class index(AuthoringMethodMixin,CachedListMixin,CachedCountMixin,KeysetPaginationMixin,BasicFilterView):
     """
     Overview of saved drafts.
     """
@@ -150,39 +171,55 @@ class index(AuthoringMethodMixin,BasicFilterView):
             return "No drafts or imports to be shown (user not member of an authoring group)"
 
     template_name = 'dingos_authoring/%s/AuthoredObjectList.html' % DINGOS_TEMPLATE_FAMILY
-    filterset_class = AuthoringObjectFilter
+    filterset_class = ReportSummaryFilter
 
 
     @property
     def queryset(self):
+        """
+        The list is served from the summaries of the latest revisions
+        of reports (see ``ReportSummary``), which are maintained
+        by the write paths of ``AuthoredData``.
+        """
 
         namespace_info = self.namespace_info
 
         if not namespace_info:
             messages.error(self.request,'You are not member of an Authoring Group.')
-            return AuthoredData.objects.exclude(pk__gt=-1)
+            return ReportSummary.objects.exclude(pk__gt=-1)
 
         elif isinstance(namespace_info,list):
             messages.error(self.request,'You are member of several authoring groups but you have not selected an' \
                                         ' active authoring group. Please do so in the "Switch Authoring Group" dialogue'
                                         ' available from the user menu (top right-hand corner).')
-            return  AuthoredData.objects.exclude(pk__gt=-1)
+            return  ReportSummary.objects.exclude(pk__gt=-1)
 
-        return AuthoredData.objects.filter(Q(kind=AuthoredData.AUTHORING_JSON,group=namespace_info['authoring_group'],latest=True)
-                                       &
-                                       (Q(status=AuthoredData.UPDATE) | Q(status=AuthoredData.DRAFT) | Q(status=AuthoredData.IMPORTED))). \
-        prefetch_related('identifier','group','user','author_view').prefetch_related('top_level_iobject',
-                                                                                     'top_level_iobject__identifier',
-                                                                                     'top_level_iobject__identifier__namespace')
+        return ReportSummary.objects.filter(group=namespace_info['authoring_group']).\
+            select_related('identifier','user','author_view')
 
 
+    def count_signature(self):
+        return AuthoredData.REPORT_COUNT_SIGNATURE
+
+    def paginate_queryset(self, queryset, page_size):
+        result = super(index,self).paginate_queryset(queryset, page_size)
+        if DINGOS_AUTHORING_OWNERSHIP_TTL is not None and self.namespace_info \
+                and not isinstance(self.namespace_info,list):
+            # Leases may have expired since the summaries were written
+            object_list = result[2]
+            owners = ReportOwnership.holders(self.namespace_info['authoring_group'].pk,
+                                             [x.identifier_id for x in object_list])
+            for obj in object_list:
+                obj.user = owners.get(obj.identifier_id)
+        return result
+
     list_actions = [('Take from owner', 'url.dingos_authoring.index.action.take', 0)]
 
 
 
 
 
-class ImportsView(BasicFilterView):
+class ImportsView(CachedListMixin,KeysetPaginationMixin,BasicFilterView):
     """
     Overview of saved drafts.
     """
@@ -199,19 +236,144 @@ class ImportsView(BasicFilterView):
     def queryset(self):
         queryset = AuthoredData.objects.filter(
                                            user=self.request.user,
-                                           status=AuthoredData.IMPORTED)
+                                           status=AuthoredData.IMPORTED).\
+            select_related('top_level_iobject__identifier__namespace','yielded_by__identifier')
 
         return queryset
 
+    def list_cache_scope(self):
+        # The imports of a user are listed regardless of the authoring group
+        return 'user:%s' % self.request.user.pk
+
+
+
+
+
+
+class ExportView(AuthoringMethodMixin,BasicView):
+    """
+    Streaming export of the imports or the history of the reports of the
+    user's authoring group as NDJSON or CSV (see ``export.py``).
+
+    Query parameters: ``format`` (``ndjson`` or ``csv``), ``scope`` (``imports``
+    or ``history``), ``identifier`` (restrict to one report) and ``data``
+    (include the payloads unless empty, ``0`` or ``false``).
+    """
+
+    def get(self, request, *args, **kwargs):
+        namespace_info = self.namespace_info
+        if not namespace_info or isinstance(namespace_info,list):
+            return HttpResponseForbidden("No active authoring group.")
+
+        format = request.GET.get('format','ndjson')
+        scope = request.GET.get('scope','imports')
+        if format not in EXPORT_FORMATS or scope not in EXPORT_SCOPES:
+            return HttpResponseBadRequest("Unknown export format or scope.")
 
+        queryset = export_queryset(namespace_info['authoring_group'],
+                                   scope=scope,
+                                   identifier=request.GET.get('identifier'))
 
+        with_data = request.GET.get('data','').lower() not in ('','0','false')
 
+        response = StreamingHttpResponse(export_lines(queryset,
+                                                      format=format,
+                                                      with_data=with_data),
+                                         content_type=CONTENT_TYPES[format])
+        response['Content-Disposition'] = 'attachment; filename="%s.%s"' % (scope,format)
+        return response
 
 
-class GetDraftJSON(AuthoringMethodMixin,BasicJSONView):
+class GetDraftJSON(CompressionMixin,AuthoringMethodMixin,BasicJSONView):
     """
     View serving latest draft of given name, or respond with the list of available templates
+
+    Loaded reports carry an ETag identifying the revision; if the editor sends
+    it in ``If-None-Match`` and the revision is still the latest one, a 304 response
+    is returned without retrieving the payload.
+
+    If the user has autosaved the report after its latest revision and the
+    autosave is still buffered (see ``autosave.py``), it is sent along
+    with the revision in ``autosave``; such responses carry no ETag.
     """
+
+    etag = None
+
+    @staticmethod
+    def revision_etag(pk,timestamp):
+        return '"%s"' % AuthoredData.make_revision_token(pk,timestamp)
+
+    def loadable_revisions(self):
+        """
+        Query for the latest revisions of reports that the user may load.
+        """
+        return AuthoredData.objects.filter(Q(kind=AuthoredData.AUTHORING_JSON,
+                                             group=self.namespace_info['authoring_group'],
+                                             latest=True,
+                                             )
+                                           & (Q(status=AuthoredData.DRAFT)
+                                              |Q(status=AuthoredData.UPDATE)
+                                              |Q(status=AuthoredData.IMPORTED))).\
+            exclude(identifier__in=ReportOwnership.active(self.namespace_info['authoring_group']).\
+                    exclude(user=self.request.user).values('identifier'))
+
+    def revision_query(self,name):
+        """
+        Query for the latest revision of report ``name`` that the user may load.
+        """
+        return self.loadable_revisions().filter(identifier__name=name)
+
+    def load_revision(self,json_obj):
+        """
+        The user needs to own the report in order to edit it: a report that is
+        not owned by anybody is taken when loaded, and the user's lease is renewed.
+        Returns whether the user owns the report.
+        """
+        return ReportOwnership.acquire(json_obj.group_id,json_obj.identifier_id,self.request.user)
+
+    def pending_autosave(self,name,timestamp):
+        """
+        Return the buffered autosave of report ``name`` by the user if it is
+        more recent than ``timestamp`` (or ``None``).
+        """
+        autosave = buffered_autosave(self.namespace_info['authoring_group'],name,self.request.user)
+        if autosave and autosave['timestamp'] > timestamp:
+            return autosave
+        return None
+
+    @staticmethod
+    def revision_data(json_obj):
+        return {'jsn': json_obj.data,
+                'name': json_obj.name,
+                'id': json_obj.identifier.name,
+                'token': json_obj.revision_token}
+
+    def get(self, request, *args, **kwargs):
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        namespace_info = self.namespace_info
+
+        if if_none_match and 'name' in request.GET and 'list' not in request.GET \
+                and namespace_info and not isinstance(namespace_info,list):
+            revisions = list(self.revision_query(request.GET['name']).\
+                values_list('pk','timestamp','group_id','identifier_id')[:2])
+            if len(revisions) == 1:
+                (pk,timestamp,group_id,identifier_id) = revisions[0]
+                etag = self.revision_etag(pk,timestamp)
+                # Compression may have turned our ETag into a weak one. Loading
+                # takes the report, also if the editor's copy is up to date.
+                if etag in [x.strip().replace('W/','',1) for x in if_none_match.split(',')] \
+                        and not self.pending_autosave(request.GET['name'],timestamp) \
+                        and ReportOwnership.acquire(group_id,identifier_id,request.user):
+                    response = HttpResponseNotModified()
+                    response['ETag'] = etag
+                    return response
+
+        response = super(GetDraftJSON,self).get(request, *args, **kwargs)
+        if self.etag:
+            response['ETag'] = self.etag
+            response['Cache-Control'] = 'private, no-cache'
+        return response
+
     @property
     def returned_obj(self):
         authoring_group = self.namespace_info['authoring_group']
@@ -222,32 +384,53 @@ class GetDraftJSON(AuthoringMethodMixin,BasicJSONView):
         }
 
         if 'list' in self.request.GET:
+            # Only the columns shown in the draft picker are retrieved; the list is
+            # paginated by seeking on (timestamp, pk) with the cursor passed
+            # in ``after``; ``since`` restricts the list to drafts saved later
+            # than the given time (ISO 8601).
+            owned = ReportOwnership.active(authoring_group).filter(user=self.request.user)
             json_obj_l = AuthoredData.objects.filter(kind=AuthoredData.AUTHORING_JSON,
-                                                     user=self.request.user,
+                                                     identifier__in=owned.values('identifier'),
                                                      group=authoring_group,
                                                      status=AuthoredData.DRAFT,
-                                                     latest=True)
+                                                     latest=True).select_related('identifier').\
+                only('name','timestamp','status','identifier__name')
+
+            since = self.request.GET.get('since')
+            if since:
+                since = parse_datetime(since)
+                if not since:
+                    res['msg'] = 'Could not parse time %s' % self.request.GET['since']
+                    return res
+                if timezone.is_naive(since):
+                    # Times without offset are sent by the client in UTC
+                    since = timezone.make_aware(since,timezone.utc)
+                json_obj_l = json_obj_l.filter(timestamp__gt=since)
+
+            try:
+                page_size = min(int(self.request.GET.get('limit',DINGOS_AUTHORING_DRAFT_LIST_PAGE_SIZE)),
+                                DINGOS_AUTHORING_DRAFT_LIST_PAGE_SIZE)
+            except ValueError:
+                page_size = DINGOS_AUTHORING_DRAFT_LIST_PAGE_SIZE
+
+            page = keyset_paginate(json_obj_l,
+                                   max(page_size,1),
+                                   after=self.request.GET.get('after'))
+
             res['status'] = True
             res['msg'] = ''
             res['data'] = []
-            for el in json_obj_l:
-                res['data'].append({'id': el.identifier.name, 'name': el.name})
+            for el in page.object_list:
+                res['data'].append({'id': el.identifier.name,
+                                    'name': el.name,
+                                    'timestamp': el.timestamp.isoformat(),
+                                    'status': el.status})
+            res['next'] = page.next_cursor if page.has_next() else None
 
         else:
             name = self.request.GET.get('name',False)
             try:
-                json_obj = AuthoredData.objects.get(Q(kind=AuthoredData.AUTHORING_JSON,
-                                                      group=authoring_group,
-                                                      identifier__name=name,
-                                                      latest=True,
-                                                      )
-                                                     & (Q(status=AuthoredData.DRAFT)
-                                                        |Q(status=AuthoredData.UPDATE)
-                                                        |Q(status=AuthoredData.IMPORTED))
-                                                     &
-                                                     (Q(user__isnull=True) | Q(user=self.request.user))
-
-                                                      )
+                json_obj = self.revision_query(name).select_related('identifier').get()
             except ObjectDoesNotExist:
                 res['msg'] = 'Could not access object %s of group %s' %(name,authoring_group)
                 res['status'] = False
@@ -260,27 +443,222 @@ class GetDraftJSON(AuthoringMethodMixin,BasicJSONView):
 
 
 
-            if not json_obj.user:
-                # The user needs to take the object in order to edit it -- this is
-                # done automatically here.
-                if json_obj.status == AuthoredData.IMPORTED:
-                    status = AuthoredData.UPDATE
-                else:
-                    status = json_obj.status
-                json_obj = AuthoredData.object_copy(json_obj,user=self.request.user,status=status)
+            if not self.load_revision(json_obj):
+                res['msg'] = 'Report %s has just been taken by another user.' % name
+                return res
 
-            res['data'] = {}
-            res['data']['jsn'] = json_obj.data
-            res['data']['name'] = json_obj.name
-            res['data']['id'] = json_obj.identifier.name
+            res['data'] = self.revision_data(json_obj)
             res['status'] = True
             res['msg'] = 'Loaded \'' + json_obj.name + '\''
 
+            autosave = self.pending_autosave(name,json_obj.timestamp)
+            if autosave:
+                res['data']['autosave'] = {'jsn': autosave['jsn'],
+                                           'name': autosave['name'],
+                                           'timestamp': autosave['timestamp'].isoformat()}
+            else:
+                self.etag = self.revision_etag(json_obj.pk,json_obj.timestamp)
+
         return res
 
 
 
 
+class GetDraftsJSON(GetDraftJSON):
+    """
+    Batch variant of ``GetDraftJSON``: serves the latest revisions of the reports
+    whose identifiers are given in the (repeated) parameter ``id`` with one query.
+    The same reports as for loading a single report can be retrieved, but the batch
+    is only read: the user does not take the reports (editing a report requires
+    loading it with ``GetDraftJSON``). The result contains an entry with status
+    and message for each requested report.
+    """
+
+    @property
+    def returned_obj(self):
+        res = {'status': False,
+               'msg': '',
+               'data': None}
+
+        namespace_info = self.namespace_info
+        if not namespace_info or isinstance(namespace_info,list):
+            res['msg'] = 'No active authoring group.'
+            return res
+
+        names = []
+        for name in self.request.GET.getlist('id') + self.request.POST.getlist('id'):
+            if name not in names:
+                names.append(name)
+
+        if len(names) > DINGOS_AUTHORING_BATCH_LOAD_LIMIT:
+            res['msg'] = 'At most %s reports can be loaded at once.' % DINGOS_AUTHORING_BATCH_LOAD_LIMIT
+            return res
+
+        json_objs = {}
+        for json_obj in self.loadable_revisions().filter(identifier__name__in=names).select_related('identifier'):
+            json_objs.setdefault(json_obj.identifier.name,[]).append(json_obj)
+
+        authoring_group = namespace_info['authoring_group']
+        res['data'] = []
+        for name in names:
+            item = {'id': name,
+                    'status': False,
+                    'data': None}
+            found = json_objs.get(name,[])
+            if not found:
+                item['msg'] = 'Could not access object %s of group %s' % (name,authoring_group)
+            elif len(found) > 1:
+                item['msg'] = """Something is wrong in the database: there are several "latest" objects
+                                of group %s with identifier %s""" % (authoring_group,name)
+            else:
+                json_obj = found[0]
+                item['data'] = self.revision_data(json_obj)
+                item['status'] = True
+                item['msg'] = 'Loaded \'' + json_obj.name + '\''
+            res['data'].append(item)
+
+        res['status'] = True
+        return res
+
+    def post(self, request, *args, **kwargs):
+        # Long lists of identifiers may be posted
+        return self.get(request, *args, **kwargs)
+
+
+
+
+class ImportEventsView(AuthoringMethodMixin,BasicView):
+    """
+    Stream of the events about imports of the user's authoring group
+    (see ``events.py``) as server-sent events; browsers reconnect
+    automatically and resume after the last event they received
+    (``Last-Event-ID``). With ``scope=user``, the events about the
+    user's own imports are served instead.
+
+    With the parameter ``poll``, the view answers as long poll instead: it
+    returns the events after ``last_id`` as JSON as soon as there are any,
+    but waits at most ``wait`` seconds (``0`` answers right away).
+    """
+
+    poll_timeout = 25
+
+    keepalive_interval = 15
+
+    def get(self, request, *args, **kwargs):
+        if request.GET.get('scope') == 'user':
+            scope = 'user:%s' % request.user.pk
+        else:
+            namespace_info = self.namespace_info
+            if not namespace_info or isinstance(namespace_info,list):
+                return HttpResponseForbidden("No active authoring group.")
+            scope = 'group:%s' % namespace_info['authoring_group'].pk
+
+        try:
+            last_id = int(request.META.get('HTTP_LAST_EVENT_ID') or request.GET.get('last_id') or -1)
+        except ValueError:
+            last_id = -1
+        if last_id < 0:
+            # New clients only receive events from now on
+            last_id = events.current_position(scope)
+
+        if request.GET.get('poll'):
+            try:
+                timeout = max(min(int(request.GET.get('wait',self.poll_timeout)),self.poll_timeout),0)
+            except ValueError:
+                timeout = self.poll_timeout
+            found = events.wait_for_events(scope, last_id, timeout)
+            return HttpResponse(json.dumps({'status': True,
+                                            'last_id': found[-1]['id'] if found else last_id,
+                                            'events': found}),
+                                content_type="application/json")
+
+        response = StreamingHttpResponse(self.stream(scope, last_id),
+                                         content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    def stream(self, scope, last_id):
+        deadline = time.time() + DINGOS_AUTHORING_EVENT_STREAM_TIMEOUT
+        yield "retry: 3000\n\n"
+        while time.time() < deadline:
+            found = events.wait_for_events(scope, last_id,
+                                           min(self.keepalive_interval, max(deadline - time.time(),0)))
+            if found:
+                for event in found:
+                    yield events.format_sse(event)
+                last_id = found[-1]['id']
+            else:
+                yield ": keepalive\n\n"
+
+
+
+
+def generation_result(job):
+    """
+    Return the state and result of the background STIX generation ``job``;
+    the XML of a successful generation is stored in the STIX cache of this
+    process, such that generating or importing the same report need not
+    transform it once more.
+    """
+    result = tasks.scheduled_generation.AsyncResult(job)
+    if result.status == 'SUCCESS' and result.result.get('key') and result.result.get('xml'):
+        if stix_cache.get(result.result['key']) is None:
+            stix_cache.set(result.result['key'], result.result['xml'])
+    return result
+
+
+class GenerationStatusView(BasicJSONView):
+    """
+    View serving the state of a STIX generation running in the background
+    (see ``BasicProcessingView.generate_in_background``); once the generation
+    has finished, a link for downloading the XML is provided.
+    """
+    @property
+    def returned_obj(self):
+        job = self.kwargs['job']
+        result = generation_result(job)
+
+        res = {'status': True,
+               'msg': '',
+               'job': job,
+               'state': result.status}
+
+        if result.status == 'SUCCESS':
+            if result.result.get('user') != self.request.user.pk:
+                res['status'] = False
+                res['msg'] = 'Job %s has not been started by you.' % job
+            elif not result.result.get('xml'):
+                res['status'] = False
+                res['msg'] = 'STIX could not be created.'
+            else:
+                res['msg'] = 'STIX successfully generated. '
+                res['download_url'] = reverse('url.dingos_authoring.generation_result', kwargs={'job': job})
+        elif result.status == 'FAILURE':
+            res['status'] = False
+            res['msg'] = 'STIX could not be created: %s' % result.result
+
+        return res
+
+
+class GenerationResultView(CompressionMixin,BasicView):
+    """
+    View serving the XML created by a STIX generation running in the background.
+    """
+
+    def get(self, request, *args, **kwargs):
+        job = kwargs['job']
+        result = generation_result(job)
+
+        if result.status != 'SUCCESS' or result.result.get('user') != request.user.pk \
+                or not result.result.get('xml'):
+            raise Http404
+
+        response = HttpResponse(result.result['xml'], content_type="application/xml")
+        response['Content-Disposition'] = 'attachment; filename="%s.xml"' % job
+        return response
+
+
 class XMLImportView(AuthoringMethodMixin,SuperuserRequiredMixin,BasicTemplateView):
     """
     View for importing XML.
@@ -350,24 +728,25 @@ class XMLImportView(AuthoringMethodMixin,SuperuserRequiredMixin,BasicTemplateVie
                     messages.success(self.request,"Imported objects: %s" % ", ".join(map(lambda x: "%s:%s" % (x['identifier_namespace_uri'], x['identifier_uid']), list(result))))
 
                 else:
-                    identifier = Identifier.objects.create(name="%s" % uuid4())
-                    authored_data = AuthoredData.objects.create(identifier = identifier,
-                                                                name = data.get('name',"Import of XML via GUI"),
-                                                                status = AuthoredData.IMPORTED,
-                                                                kind = AuthoredData.XML,
-                                                                data = data['xml'],
-                                                                user = self.request.user,
-                                                                group = namespace_info['authoring_group'],
-                                                                timestamp = timezone.now(),
-                                                                latest=True)
-
-
-                    result = tasks.scheduled_import.delay(importer=importer,
-                                                    xml=data['xml'],
-                                                    xml_import_obj=authored_data)
+                    task_id = "%s" % uuid4()
+                    with atomic_with_invalidation():
+                        identifier = Identifier.objects.create(name="%s" % uuid4())
+                        authored_data = AuthoredData.objects.create(identifier = identifier,
+                                                                    name = data.get('name',"Import of XML via GUI"),
+                                                                    status = AuthoredData.IMPORTED,
+                                                                    kind = AuthoredData.XML,
+                                                                    data = data['xml'],
+                                                                    user = self.request.user,
+                                                                    group = namespace_info['authoring_group'],
+                                                                    timestamp = timezone.now(),
+                                                                    processing_id = task_id,
+                                                                    latest=True)
 
-                    authored_data.processing_id = result.id
-                    authored_data.save()
+                    tasks.dispatch_on_commit(tasks.scheduled_import,
+                                             task_id,
+                                             importer=importer,
+                                             xml=data['xml'],
+                                             xml_import_obj=authored_data)
 
 
 
@@ -407,25 +786,49 @@ class TakeReportView(AuthoringMethodMixin,BasicListActionView):
                                                    latest=True) &
                                                  (Q(status=AuthoredData.DRAFT)
                                                   | Q(status=AuthoredData.UPDATE)
-                                                  | Q(status=AuthoredData.IMPORTED)))
-        return base_query
+                                                  | Q(status=AuthoredData.IMPORTED))).select_related('user','identifier')
+        # The current owners are retrieved with the reports acted upon
+        return ReportOwnership.with_owner(base_query)
 
 
 
 
+    def post(self, request, *args, **kwargs):
+        # The action function only collects the reports to be taken; they are
+        # taken together by ``take_reports`` in the same transaction.
+        self.reports_to_take = []
+        with atomic_with_invalidation():
+            response = super(TakeReportView,self).post(request, *args, **kwargs)
+            self.take_reports()
+        return response
+
+    def take_reports(self):
+        """
+        Take all collected reports with a fixed number of statements (see ``ReportOwnership.bulk_acquire``);
+        imported reports are put into UPDATE mode with a new revision.
+        """
+        reports = getattr(self,'reports_to_take',[])
+        self.reports_to_take = []
+        ReportOwnership.bulk_acquire(self.namespace_info['authoring_group'].pk,
+                                     [x.identifier_id for x in reports],
+                                     self.request.user)
+        for report in reports:
+            if report.status == AuthoredData.IMPORTED:
+                AuthoredData.object_copy(report,
+                                         user=self.request.user,
+                                         status=AuthoredData.UPDATE)
+
     def _take_authoring_data_obj(self,form_data,authoring_data_obj):
-        if authoring_data_obj.user == self.request.user:
+        if authoring_data_obj.owner_id == self.request.user.pk:
             return (None,"'%s' is already owned by you." % authoring_data_obj.name)
-        elif authoring_data_obj.status in [AuthoredData.DRAFT,AuthoredData.UPDATE]:
-            old_user = authoring_data_obj.user
-            obj = AuthoredData.object_copy(authoring_data_obj, user= self.request.user)
-
-            return (True, "'%s' is now owned by you instead of %s" % (obj.name, old_user))
-        elif authoring_data_obj.status == AuthoredData.IMPORTED:
-            obj= AuthoredData.object_copy(authoring_data_obj,
-                                         user= self.request.user,
-                                         status = AuthoredData.UPDATE)
-            return (True, "'%s' has been put into DRAFT mode and is now owned by you." % obj.name)
+        elif authoring_data_obj.status in [AuthoredData.DRAFT,AuthoredData.UPDATE,AuthoredData.IMPORTED]:
+            self.reports_to_take.append(authoring_data_obj)
+            if authoring_data_obj.status == AuthoredData.IMPORTED:
+                return (True, "'%s' has been put into DRAFT mode and is now owned by you." % authoring_data_obj.name)
+            if authoring_data_obj.owner_id:
+                return (True, "'%s' is now owned by you instead of %s" % (authoring_data_obj.name,
+                                                                           authoring_data_obj.owner_name))
+            return (True, "'%s' is now owned by you." % authoring_data_obj.name)
         else:
             return (False, "Do not know how to treat '%s'" % authoring_data_obj.name)
 
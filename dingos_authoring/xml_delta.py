@@ -0,0 +1,166 @@
+# Copyright (c) Siemens AG, 2014
+#
+# This file is part of MANTIS.  MANTIS is free software: you can
+# redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation; either version 2
+# of the License, or(at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+import hashlib
+
+import libxml2
+
+
+XSI_NAMESPACE = 'http://www.w3.org/2001/XMLSchema-instance'
+
+
+def _element_children(node):
+    child = node.children
+    while child:
+        if child.type == 'element':
+            yield child
+        child = child.next
+
+
+def _uid(object_id):
+    """
+    Identifiers in generated STIX have the form ``<namespace slug>:<uid>``.
+    """
+    return object_id.split(':', 1)[-1]
+
+
+def _parse(xml):
+    """
+    Parse ``xml`` without the whitespace used for indentation, which is
+    therefore not taken into account when comparing objects.
+    """
+    if isinstance(xml, unicode):
+        xml = xml.encode('utf-8')
+    return libxml2.readMemory(xml, len(xml), None, None, libxml2.XML_PARSE_NOBLANKS)
+
+
+def _object_hash(node):
+    """
+    Hash of the exclusive canonical form (C14N) of the element ``node``: it
+    does not depend on the order of attributes or on namespace declarations
+    made on ancestors of the element.
+    """
+    doc = libxml2.newDoc("1.0")
+    try:
+        doc.setRootElement(node.docCopyNode(doc, 1))
+        return hashlib.sha1(doc.c14nMemory(exclusive=1)).hexdigest()
+    finally:
+        doc.freeDoc()
+
+
+def _object_hashes(node, result):
+    """
+    Collect a hash of every element below ``node`` that carries an ``id`` attribute.
+    """
+    for child in _element_children(node):
+        object_id = child.prop('id')
+        if object_id:
+            result[object_id] = _object_hash(child)
+        _object_hashes(child, result)
+    return result
+
+
+def _contained_ids(node, result):
+    object_id = node.prop('id')
+    if object_id:
+        result.append(object_id)
+    for child in _element_children(node):
+        _contained_ids(child, result)
+    return result
+
+
+def _reference(node, object_id):
+    """
+    Create an empty element of the same name and ``xsi:type`` as ``node``
+    that refers to the object ``object_id``. Namespaces declared on ``node``
+    are declared on the reference as well, since the prefixes of the element
+    and of its type may have been defined there.
+    """
+    stub = libxml2.newNode(node.name)
+    ns_def = node.nsDefs()
+    while ns_def:
+        stub.newNs(ns_def.content, ns_def.name)
+        ns_def = ns_def.next
+
+    # Namespaces are looked up among the declarations of the reference and
+    # of the ancestors of ``node``, which become the ancestors of the reference.
+    def lookup(href):
+        declared = stub.nsDefs()
+        while declared:
+            if declared.content == href:
+                return declared
+            declared = declared.next
+        return node.parent.searchNsByHref(node.doc, href)
+
+    if node.ns():
+        stub.setNs(lookup(node.ns().content))
+    xsi_type = node.nsProp('type', XSI_NAMESPACE)
+    if xsi_type:
+        stub.setNsProp(lookup(XSI_NAMESPACE), 'type', xsi_type)
+    stub.setProp('idref', object_id)
+    return stub
+
+
+def _strip(node, previous_hashes, available_uids, stubbed_ids):
+    for child in list(_element_children(node)):
+        object_id = child.prop('id')
+        if object_id and object_id in previous_hashes and previous_hashes[object_id] == _object_hash(child):
+            contained_ids = _contained_ids(child, [])
+            # We can only leave out the object if all objects defined in it
+            # exist from the previous import; otherwise we look deeper.
+            if all(_uid(x) in available_uids for x in contained_ids):
+                stub = _reference(child, object_id)
+                child.replaceNode(stub)
+                child.freeNode()
+                stubbed_ids.extend(contained_ids)
+                continue
+        _strip(child, previous_hashes, available_uids, stubbed_ids)
+
+
+def strip_unchanged_objects(xml, previous_xml, available_uids):
+    """
+    Compare the STIX document ``xml`` with the previously imported document ``previous_xml``
+    and replace every object (i.e., element with an ``id`` attribute) below the root
+    that is unchanged with respect to the previous document by a reference
+    to that object, i.e., an empty element with an ``idref`` attribute.
+
+    ``available_uids`` is the set of identifier uids of the objects yielded by
+    the previous import: only objects for which these exist are replaced.
+
+    Returns a tuple of the reduced document and the list of identifiers of
+    objects that have been left out (including objects embedded in them).
+    """
+
+    previous_doc = _parse(previous_xml)
+    try:
+        previous_hashes = _object_hashes(previous_doc.getRootElement(), {})
+    finally:
+        previous_doc.freeDoc()
+
+    doc = _parse(xml)
+    try:
+        stubbed_ids = []
+        _strip(doc.getRootElement(), previous_hashes, available_uids, stubbed_ids)
+        if not stubbed_ids:
+            return (xml, [])
+        return (doc.serialize(encoding='utf-8'), stubbed_ids)
+    finally:
+        doc.freeDoc()
+
+
+def object_uids(object_ids):
+    return set(map(_uid, object_ids))
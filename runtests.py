@@ -11,14 +11,39 @@ try:
                 "ENGINE": "django.db.backends.sqlite3",
             }
         },
-        ROOT_URLCONF="dingos_authoring.urls",
+        CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            }
+        },
+        ROOT_URLCONF="tests.urls",
         INSTALLED_APPS=[
+            "grappelli",
+            "django.contrib.admin",
             "django.contrib.auth",
             "django.contrib.contenttypes",
+            "django.contrib.sessions",
+            "django.contrib.messages",
             "django.contrib.sites",
+            "django.contrib.staticfiles",
+            "dingos",
             "dingos_authoring",
         ],
+        MIDDLEWARE_CLASSES=[
+            "django.contrib.sessions.middleware.SessionMiddleware",
+            "django.middleware.common.CommonMiddleware",
+            "django.contrib.auth.middleware.AuthenticationMiddleware",
+            "django.contrib.messages.middleware.MessageMiddleware",
+        ],
+        TEMPLATE_CONTEXT_PROCESSORS=[
+            "django.contrib.auth.context_processors.auth",
+            "django.core.context_processors.request",
+            "django.core.context_processors.static",
+            "django.contrib.messages.context_processors.messages",
+        ],
+        STATIC_URL="/static/",
         SITE_ID=1,
+        SOUTH_TESTS_MIGRATE=False,
         NOSE_ARGS=['-s'],
     )
 
@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for the autosave buffer, using the local-memory cache configured in ``runtests.py``.
+"""
+
+from django.contrib.auth.models import User, Group
+from django.test import TestCase
+
+from dingos_authoring.autosave import buffer_autosave, buffered_autosave, flush_autosaves
+from dingos_authoring.caching import get_authoring_cache
+from dingos_authoring.models import AuthoredData
+
+
+class AutosaveTestCase(TestCase):
+
+    def setUp(self):
+        get_authoring_cache().clear()
+        self.group = Group.objects.create(name='authors')
+        self.user = User.objects.create_user('author', 'author@example.com', 'secret')
+
+    def autosaves(self):
+        return AuthoredData.objects.filter(status=AuthoredData.AUTOSAVE).order_by('timestamp')
+
+    def test_only_newest_state_is_flushed(self):
+        self.assertTrue(buffer_autosave(self.group, 'report-1', self.user, '{"v": 1}', 'Report', None))
+        self.assertFalse(buffer_autosave(self.group, 'report-1', self.user, '{"v": 2}', 'Report', None))
+        buffer_autosave(self.group, 'report-2', self.user, '{"v": 1}', 'Other report', None)
+
+        self.assertEqual(self.autosaves().count(), 0)
+        self.assertEqual(buffered_autosave(self.group, 'report-1', self.user)['jsn'], '{"v": 2}')
+
+        self.assertEqual(flush_autosaves(), 2)
+        self.assertEqual(sorted(self.autosaves().values_list('identifier__name', 'data')),
+                         [('report-1', '{"v": 2}'), ('report-2', '{"v": 1}')])
+
+    def test_flush_writes_each_state_once(self):
+        buffer_autosave(self.group, 'report-1', self.user, '{"v": 1}', 'Report', None)
+        self.assertEqual(flush_autosaves(), 1)
+        self.assertEqual(flush_autosaves(), 0)
+
+        self.assertTrue(buffer_autosave(self.group, 'report-1', self.user, '{"v": 2}', 'Report', None))
+        self.assertEqual(flush_autosaves(), 1)
+        self.assertEqual(list(self.autosaves().values_list('data', flat=True)), ['{"v": 1}', '{"v": 2}'])
+
+    def test_autosaves_do_not_change_latest_revision(self):
+        AuthoredData.object_create(kind=AuthoredData.AUTHORING_JSON,
+                                   status=AuthoredData.DRAFT,
+                                   user=self.user,
+                                   group=self.group,
+                                   identifier='report-1',
+                                   name='Report',
+                                   data='{"v": 0}')
+        buffer_autosave(self.group, 'report-1', self.user, '{"v": 1}', 'Report', None)
+        flush_autosaves()
+
+        self.assertEqual(AuthoredData.objects.get(identifier__name='report-1', latest=True).data, '{"v": 0}')
@@ -0,0 +1,219 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for the invalidation of cached counts and cached namespace information.
+"""
+
+from django.contrib.auth.models import User, Group
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from dingos.models import IdentifierNameSpace
+
+from dingos_authoring.caching import get_authoring_cache, count_cache_key, get_cached_namespace_info, \
+    set_cached_namespace_info, get_generation, list_cache_key, atomic_with_invalidation
+from dingos_authoring.models import AuthoredData, ReportSummary, GroupNamespaceMap, UserAuthoringInfo
+from dingos_authoring.pagination import CachedCountPaginator
+
+from tests.utils import create_authoring_group
+
+
+class Rollback(Exception):
+    pass
+
+
+class CachedCountTestCase(TransactionTestCase):
+
+    def setUp(self):
+        get_authoring_cache().clear()
+        self.group = Group.objects.create(name='authors')
+        self.user = User.objects.create_user('author', 'author@example.com', 'secret')
+
+    def create(self, identifier, status=AuthoredData.DRAFT):
+        return AuthoredData.object_create(kind=AuthoredData.AUTHORING_JSON,
+                                          status=status,
+                                          user=self.user,
+                                          group=self.group,
+                                          identifier=identifier,
+                                          name=identifier,
+                                          timestamp=timezone.now(),
+                                          data='{}')
+
+    def paginator(self):
+        return CachedCountPaginator(ReportSummary.objects.filter(group=self.group), 10,
+                                    count_key=count_cache_key(self.group.pk, AuthoredData.REPORT_COUNT_SIGNATURE))
+
+    def test_count_is_cached(self):
+        self.create('report-1')
+        self.assertEqual(self.paginator().count, 1)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.paginator().count, 1)
+
+    def test_new_report_invalidates_count(self):
+        self.create('report-1')
+        self.assertEqual(self.paginator().count, 1)
+
+        self.create('report-2')
+
+        self.assertEqual(self.paginator().count, 2)
+
+    def test_new_revision_keeps_report_count(self):
+        self.create('report-1')
+        self.assertEqual(self.paginator().count, 1)
+
+        self.create('report-1', status=AuthoredData.UPDATE)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.paginator().count, 1)
+
+    def test_rolled_back_write_leaves_count_correct(self):
+        self.create('report-1')
+        self.assertEqual(self.paginator().count, 1)
+
+        try:
+            with transaction.atomic():
+                self.create('report-2')
+                raise Rollback()
+        except Rollback:
+            pass
+
+        self.assertEqual(ReportSummary.objects.count(), 1)
+        self.assertEqual(self.paginator().count, 1)
+
+    def test_count_computed_during_write_is_not_served(self):
+        self.create('report-1')
+
+        # A request running concurrently with the write determines the key
+        # and counts before the write, but stores the count after it.
+        key = count_cache_key(self.group.pk, AuthoredData.REPORT_COUNT_SIGNATURE)
+        count = ReportSummary.objects.filter(group=self.group).count()
+        self.create('report-2')
+        get_authoring_cache().add(key, count)
+
+        self.assertEqual(self.paginator().count, 2)
+
+
+class GenerationAfterCommitTestCase(TransactionTestCase):
+
+    def setUp(self):
+        get_authoring_cache().clear()
+        self.group = Group.objects.create(name='authors')
+        self.user = User.objects.create_user('author', 'author@example.com', 'secret')
+        self.scope = 'group:%s' % self.group.pk
+
+    def create(self, identifier):
+        return AuthoredData.object_create(kind=AuthoredData.AUTHORING_JSON,
+                                          status=AuthoredData.DRAFT,
+                                          user=self.user,
+                                          group=self.group,
+                                          identifier=identifier,
+                                          name=identifier,
+                                          timestamp=timezone.now(),
+                                          data='{}')
+
+    def test_list_cached_before_commit_is_not_served(self):
+        with atomic_with_invalidation():
+            self.create('report-1')
+            # A concurrent request still sees the data before the write,
+            # but determines its key under the new generation.
+            key = list_cache_key(self.scope, 'signature')
+
+        self.assertNotEqual(list_cache_key(self.scope, 'signature'), key)
+
+    def test_generation_is_increased_once_more_by_outermost_block(self):
+        with atomic_with_invalidation():
+            with atomic_with_invalidation():
+                self.create('report-1')
+            generation = get_generation(self.scope)
+
+        self.assertEqual(get_generation(self.scope), generation + 1)
+
+    def test_write_outside_transaction(self):
+        generation = get_generation(self.scope)
+        self.create('report-1')
+
+        self.assertTrue(get_generation(self.scope) > generation)
+
+        # Nothing is left to be increased later
+        generation = get_generation(self.scope)
+        with atomic_with_invalidation():
+            pass
+        self.assertEqual(get_generation(self.scope), generation)
+
+
+class NamespaceCacheTestCase(TestCase):
+
+    def setUp(self):
+        get_authoring_cache().clear()
+        self.group, (self.user, self.other) = create_authoring_group(['author', 'other'])
+        self.namespace_map = GroupNamespaceMap.objects.get(group=self.group)
+        self.outsider_group, (self.outsider,) = create_authoring_group(['outsider'], name='outsiders')
+        for user in (self.user, self.other, self.outsider):
+            set_cached_namespace_info(user.pk, {'group': self.group.name})
+
+    def assertCached(self, user, cached=True):
+        self.assertEqual(get_cached_namespace_info(user.pk)[0], cached)
+
+    def test_none_is_cached(self):
+        set_cached_namespace_info(self.user.pk, None)
+        self.assertEqual(get_cached_namespace_info(self.user.pk), (True, None))
+
+    def test_namespace_map_change_invalidates_group_members(self):
+        self.namespace_map.save()
+        self.assertCached(self.user, False)
+        self.assertCached(self.other, False)
+        self.assertCached(self.outsider)
+
+    def test_allowed_namespaces_change_invalidates_group_members(self):
+        namespace = IdentifierNameSpace.objects.create(uri='http://example.com/other', name='other')
+        self.namespace_map.allowed_namespaces.add(namespace)
+        self.assertCached(self.user, False)
+        self.assertCached(self.outsider)
+
+    def test_group_rename_invalidates_group_members(self):
+        self.group.name = 'renamed'
+        self.group.save()
+        self.assertCached(self.user, False)
+        self.assertCached(self.other, False)
+        self.assertCached(self.outsider)
+
+    def test_group_deletion_invalidates_group_members(self):
+        self.group.delete()
+        self.assertCached(self.user, False)
+        self.assertCached(self.outsider)
+
+    def test_new_namespace_keeps_cache(self):
+        IdentifierNameSpace.objects.create(uri='http://example.com/imported', name='imported')
+        self.assertCached(self.user)
+        self.assertCached(self.outsider)
+
+    def test_namespace_change_invalidates_groups_using_it(self):
+        namespace = self.namespace_map.default_namespace
+        namespace.name = 'renamed'
+        namespace.save()
+        self.assertCached(self.user, False)
+        self.assertCached(self.other, False)
+        self.assertCached(self.outsider)
+
+    def test_authoring_info_change_invalidates_its_user(self):
+        UserAuthoringInfo.objects.get(user=self.user).save()
+        self.assertCached(self.user, False)
+        self.assertCached(self.other)
+
+    def test_membership_change_invalidates_its_user(self):
+        self.user.groups.remove(self.group)
+        self.assertCached(self.user, False)
+        self.assertCached(self.other)
+
+    def test_group_membership_change_invalidates_affected_users(self):
+        self.group.user_set.remove(self.other)
+        self.assertCached(self.user)
+        self.assertCached(self.other, False)
+
+    def test_clearing_group_invalidates_all_users(self):
+        self.group.user_set.clear()
+        self.assertCached(self.user, False)
+        self.assertCached(self.other, False)
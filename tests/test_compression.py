@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for the compressed transfer of report payloads.
+"""
+
+import gzip, zlib
+
+from StringIO import StringIO
+
+import mock
+
+from django.http import HttpResponse
+from django.test import TestCase
+from django.test.client import RequestFactory
+
+from dingos_authoring import compression
+from dingos_authoring.compression import decompress_request, compress_response, DecompressionError
+
+
+def gzipped(data):
+    buf = StringIO()
+    with gzip.GzipFile(fileobj=buf, mode='wb') as f:
+        f.write(data)
+    return buf.getvalue()
+
+
+class DecompressRequestTestCase(TestCase):
+
+    def post(self, body, encoding='gzip'):
+        return RequestFactory().post('/save', body,
+                                     content_type='application/x-www-form-urlencoded',
+                                     HTTP_CONTENT_ENCODING=encoding)
+
+    def test_form_data_is_decompressed(self):
+        request = self.post(gzipped('name=report&jsn=%7B%7D'))
+
+        decompress_request(request)
+
+        self.assertEqual(request.POST['name'], 'report')
+        self.assertEqual(request.POST['jsn'], '{}')
+
+    def test_uncompressed_request_is_left_alone(self):
+        request = self.post('name=report', encoding='identity')
+
+        decompress_request(request)
+
+        self.assertEqual(request.POST['name'], 'report')
+
+    def test_invalid_data_is_rejected(self):
+        request = self.post('name=report')
+
+        self.assertRaises(DecompressionError, decompress_request, request)
+
+    def test_decompressed_size_is_capped(self):
+        body = gzipped('jsn=' + 'x' * 10000)
+
+        with mock.patch.object(compression, 'DINGOS_AUTHORING_MAX_DECOMPRESSED_REQUEST_SIZE', 1000):
+            self.assertRaises(DecompressionError, decompress_request, self.post(body))
+
+        with mock.patch.object(compression, 'DINGOS_AUTHORING_MAX_DECOMPRESSED_REQUEST_SIZE', 10004):
+            request = self.post(body)
+            decompress_request(request)
+            self.assertEqual(len(request.POST['jsn']), 10000)
+
+
+class CompressResponseTestCase(TestCase):
+
+    content = '{"jsn": "%s"}' % ('x' * 10000)
+
+    def get(self, accept_encoding='gzip, deflate'):
+        return RequestFactory().get('/load', HTTP_ACCEPT_ENCODING=accept_encoding)
+
+    def test_response_is_compressed_if_accepted(self):
+        response = HttpResponse(self.content, content_type='application/json')
+        response['ETag'] = '"token"'
+
+        response = compress_response(self.get(), response)
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Length'], str(len(response.content)))
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(response['ETag'], 'W/"token"')
+        self.assertEqual(zlib.decompress(response.content, 16 + zlib.MAX_WBITS), self.content)
+
+    def test_response_is_not_compressed_unless_accepted(self):
+        response = compress_response(self.get('identity'), HttpResponse(self.content))
+
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(response.content, self.content)
+
+    def test_small_response_is_not_compressed(self):
+        with mock.patch.object(compression, 'DINGOS_AUTHORING_COMPRESSION_THRESHOLD', len(self.content) + 1):
+            response = compress_response(self.get(), HttpResponse(self.content))
+
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_compression_can_be_disabled(self):
+        with mock.patch.object(compression, 'DINGOS_AUTHORING_COMPRESSION_THRESHOLD', None):
+            response = compress_response(self.get(), HttpResponse(self.content))
+
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertFalse(response.has_header('Vary'))
+
+    def test_not_modified_response_is_not_compressed(self):
+        response = HttpResponse(status=304)
+        response['ETag'] = '"token"'
+
+        response = compress_response(self.get(), response)
+
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response['ETag'], '"token"')
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for dispatching tasks once the transaction submitting them has been committed.
+"""
+
+from unittest import skipUnless
+
+import mock
+
+from django.db import transaction
+from django.test import TransactionTestCase
+
+from dingos_authoring import tasks
+
+
+class Rollback(Exception):
+    pass
+
+
+class FakeTask(object):
+
+    def __init__(self):
+        self.sent = []
+
+    def apply_async(self, kwargs, task_id):
+        self.sent.append((task_id, kwargs))
+
+
+class DispatchOnCommitTestCase(TransactionTestCase):
+
+    def setUp(self):
+        self.task = FakeTask()
+
+    def dispatch(self):
+        tasks.dispatch_on_commit(self.task, 'task-1', xml='<xml/>')
+
+    @skipUnless(hasattr(transaction, 'on_commit'), "requires transaction.on_commit")
+    def test_task_is_sent_on_commit(self):
+        with transaction.atomic():
+            self.dispatch()
+            self.assertEqual(self.task.sent, [])
+
+        self.assertEqual(self.task.sent, [('task-1', {'xml': '<xml/>'})])
+
+    @skipUnless(hasattr(transaction, 'on_commit'), "requires transaction.on_commit")
+    def test_task_is_not_sent_on_rollback(self):
+        try:
+            with transaction.atomic():
+                self.dispatch()
+                raise Rollback()
+        except Rollback:
+            pass
+
+        self.assertEqual(self.task.sent, [])
+
+    def test_task_is_deferred_to_on_commit(self):
+        callbacks = []
+        with mock.patch.object(transaction, 'on_commit', callbacks.append, create=True):
+            try:
+                with transaction.atomic():
+                    self.dispatch()
+                    raise Rollback()
+            except Rollback:
+                pass
+
+        # Only the callback registered with ``on_commit`` sends the task
+        self.assertEqual(self.task.sent, [])
+        self.assertEqual(len(callbacks), 1)
+        callbacks[0]()
+        self.assertEqual(self.task.sent, [('task-1', {'xml': '<xml/>'})])
+
+    def test_task_is_sent_right_away_without_on_commit(self):
+        with mock.patch.object(tasks, 'transaction', object()):
+            self.dispatch()
+
+        self.assertEqual(self.task.sent, [('task-1', {'xml': '<xml/>'})])
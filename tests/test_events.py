@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for the log of import events kept in the cache.
+"""
+
+import json
+import unittest
+
+import mock
+
+from django.core.urlresolvers import reverse
+from django.test import TestCase
+from django.utils import timezone
+
+from dingos_authoring import events, tasks
+from dingos_authoring.caching import get_authoring_cache
+from dingos_authoring.models import AuthoredData
+
+from tests.utils import create_authoring_group
+
+
+class EventLogTestCase(unittest.TestCase):
+
+    def setUp(self):
+        get_authoring_cache().clear()
+
+    def ids(self, found):
+        return [x['id'] for x in found]
+
+    def reserve(self, scope):
+        # A publisher that has increased the counter, but not yet written its event
+        position = events.publish(scope, 'import', {})
+        get_authoring_cache().delete(events._event_key(scope, position))
+        return position
+
+    def test_events_since(self):
+        for state in ('STARTED', 'SUCCESS'):
+            events.publish('group:1', 'import', {'state': state})
+
+        self.assertEqual([x['data']['state'] for x in events.events_since('group:1', 0)], ['STARTED', 'SUCCESS'])
+        self.assertEqual(self.ids(events.events_since('group:1', 1)), [2])
+        self.assertEqual(events.events_since('group:1', 2), [])
+
+    def test_scopes_are_separate(self):
+        events.publish('user:1', 'import', {})
+        events.publish('user:2', 'import', {})
+        events.publish('user:2', 'import', {})
+
+        self.assertEqual(self.ids(events.events_since('user:1', 0)), [1])
+        self.assertEqual(self.ids(events.events_since('user:2', 0)), [1, 2])
+
+    def test_reader_stops_before_missing_event(self):
+        events.publish('group:1', 'import', {})
+        position = self.reserve('group:1')
+        events.publish('group:1', 'import', {})
+
+        self.assertEqual(self.ids(events.events_since('group:1', 0)), [1])
+
+        # Once the event has been written, it is delivered with the following one
+        get_authoring_cache().set(events._event_key('group:1', position),
+                                  {'id': position, 'type': 'import', 'data': {}, 'time': 0})
+        self.assertEqual(self.ids(events.events_since('group:1', 1)), [2, 3])
+
+    def test_lost_event_is_skipped(self):
+        self.reserve('group:1')
+        events.publish('group:1', 'import', {})
+
+        with mock.patch.object(events, 'GAP_GRACE', -1):
+            self.assertEqual(self.ids(events.events_since('group:1', 0)), [2])
+
+    def test_wait_returns_right_away_without_timeout(self):
+        self.assertEqual(events.wait_for_events('group:1', 0, 0), [])
+
+
+class ImportStatusTestCase(TestCase):
+
+    def setUp(self):
+        get_authoring_cache().clear()
+        self.group, (self.user,) = create_authoring_group(['author'])
+        self.xml_import_obj = AuthoredData.object_create(kind=AuthoredData.XML,
+                                                         status=AuthoredData.IMPORTED,
+                                                         user=self.user,
+                                                         group=self.group,
+                                                         identifier='import-1',
+                                                         name='Import',
+                                                         timestamp=timezone.now(),
+                                                         data='<stix/>')
+        AuthoredData.objects.filter(pk=self.xml_import_obj.pk).update(processing_id='task-1')
+
+    def status(self):
+        return AuthoredData.objects.get(pk=self.xml_import_obj.pk).import_status
+
+    def test_running_import(self):
+        self.assertEqual(self.status(), 'PENDING')
+
+        tasks.publish_import_event(self.xml_import_obj, 'STARTED')
+
+        self.assertEqual(self.status(), 'STARTED')
+
+    def test_finished_import_without_top_level_object(self):
+        AuthoredData.objects.filter(pk=self.xml_import_obj.pk).update(processed=timezone.now())
+        get_authoring_cache().clear()
+
+        self.assertEqual(self.status(), 'SUCCESS')
+
+    def test_failed_import(self):
+        AuthoredData.objects.filter(pk=self.xml_import_obj.pk).update(processed=timezone.now(),
+                                                                       processing_error='Invalid XML')
+
+        self.assertEqual(self.status(), 'FAILURE')
+
+    def test_status_does_not_ask_result_backend(self):
+        with mock.patch.object(tasks.scheduled_import, 'AsyncResult') as async_result:
+            self.status()
+
+        self.assertFalse(async_result.called)
+
+
+class ImportEventsViewTestCase(TestCase):
+
+    def setUp(self):
+        get_authoring_cache().clear()
+        self.group, (self.user, self.other_user) = create_authoring_group(['author', 'other'])
+        self.client.login(username='author', password='secret')
+
+    def publish(self, user, state):
+        xml_import_obj = AuthoredData.object_create(kind=AuthoredData.XML,
+                                                    status=AuthoredData.IMPORTED,
+                                                    user=user,
+                                                    group=self.group,
+                                                    identifier='import-%s' % user.pk,
+                                                    name='Import',
+                                                    timestamp=timezone.now(),
+                                                    data='<stix/>')
+        tasks.publish_import_event(xml_import_obj, state)
+
+    def poll(self, **kwargs):
+        parameters = {'poll': '1', 'wait': '0', 'last_id': '0'}
+        parameters.update(kwargs)
+        return json.loads(self.client.get(reverse('url.dingos_authoring.imports.events'), parameters).content)
+
+    def test_group_receives_all_imports(self):
+        self.publish(self.user, 'SUCCESS')
+        self.publish(self.other_user, 'SUCCESS')
+
+        res = self.poll()
+
+        self.assertEqual([x['data']['user'] for x in res['events']], [self.user.pk, self.other_user.pk])
+        self.assertEqual(res['last_id'], 2)
+
+    def test_user_receives_own_imports(self):
+        self.publish(self.other_user, 'STARTED')
+        self.publish(self.user, 'STARTED')
+        self.publish(self.user, 'SUCCESS')
+
+        res = self.poll(scope='user')
+
+        self.assertEqual([(x['data']['user'], x['data']['state']) for x in res['events']],
+                         [(self.user.pk, 'STARTED'), (self.user.pk, 'SUCCESS')])
+
+    def test_new_client_starts_after_current_event(self):
+        self.publish(self.user, 'SUCCESS')
+
+        res = self.poll(scope='user', last_id='')
+
+        self.assertEqual((res['events'], res['last_id']), ([], 1))
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for the streaming export of imports and report history.
+"""
+
+import csv, json, types
+
+from StringIO import StringIO
+
+from django.core.urlresolvers import reverse
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from dingos_authoring.export import export_queryset, export_lines
+from dingos_authoring.models import AuthoredData
+
+from tests.utils import create_authoring_group
+
+
+class ExportTestCase(TestCase):
+
+    def setUp(self):
+        self.group, (self.user,) = create_authoring_group(['author'])
+
+    def create(self, identifier, kind=AuthoredData.AUTHORING_JSON, status=AuthoredData.DRAFT):
+        return AuthoredData.object_create(kind=kind,
+                                          status=status,
+                                          user=self.user,
+                                          group=self.group,
+                                          identifier=identifier,
+                                          name=identifier,
+                                          timestamp=timezone.now(),
+                                          data='<xml/>' if kind == AuthoredData.XML else '{}')
+
+    def history(self):
+        return export_queryset(self.group, scope='history')
+
+    def test_scopes(self):
+        self.create('report-1')
+        self.create('report-1', status=AuthoredData.AUTOSAVE)
+        imported = self.create('report-1', kind=AuthoredData.XML, status=AuthoredData.IMPORTED)
+
+        self.assertEqual(export_queryset(self.group, scope='imports').get(), imported)
+        self.assertEqual(self.history().count(), 2)
+        self.assertRaises(ValueError, export_queryset, self.group, scope='everything')
+
+    def test_ndjson(self):
+        objs = [self.create('report-%s' % i) for i in range(5)]
+
+        rows = [json.loads(x) for x in export_lines(self.history(), chunk_size=2)]
+
+        self.assertEqual([x['id'] for x in rows], [x.pk for x in objs])
+        self.assertEqual((rows[0]['identifier'], rows[0]['status'], rows[0]['user']),
+                         ('report-0', 'Draft', 'author'))
+        self.assertNotIn('data', rows[0])
+
+    def test_csv(self):
+        self.create('report-1')
+
+        rows = list(csv.DictReader(StringIO(''.join(export_lines(self.history(), format='csv',
+                                                                 with_data=True)))))
+
+        self.assertEqual(len(rows), 1)
+        self.assertEqual((rows[0]['name'], rows[0]['data'], rows[0]['processing_error']),
+                         ('report-1', '{}', ''))
+
+    def test_export_is_read_lazily(self):
+        self.create('report-1')
+
+        with self.assertNumQueries(0):
+            lines = export_lines(self.history(), chunk_size=2)
+
+        self.assertIsInstance(lines, types.GeneratorType)
+        with self.assertNumQueries(1):
+            next(lines)
+
+    def test_export_is_read_in_chunks(self):
+        for i in range(5):
+            self.create('report-%s' % i)
+
+        lines = export_lines(self.history(), chunk_size=2)
+        with CaptureQueriesContext(connection) as queries:
+            next(lines)
+            next(lines)
+        self.assertEqual(len(queries), 1)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(len(list(lines)), 3)
+        # The remaining chunks are read one at a time, each with its own limit
+        self.assertEqual(len(queries), 2)
+        self.assertTrue(all('LIMIT 2' in x['sql'] for x in queries.captured_queries))
+
+
+class ExportViewTestCase(TestCase):
+
+    def setUp(self):
+        self.group, (self.user,) = create_authoring_group(['author'])
+        AuthoredData.object_create(kind=AuthoredData.AUTHORING_JSON,
+                                   status=AuthoredData.DRAFT,
+                                   user=self.user,
+                                   group=self.group,
+                                   identifier='report-1',
+                                   name='report-1',
+                                   timestamp=timezone.now(),
+                                   data='{}')
+        self.client.login(username='author', password='secret')
+
+    def export(self, **kwargs):
+        kwargs['scope'] = 'history'
+        response = self.client.get(reverse('url.dingos_authoring.export'), kwargs)
+        return [json.loads(x) for x in ''.join(response.streaming_content).splitlines()]
+
+    def test_data_flag(self):
+        self.assertNotIn('data', self.export()[0])
+        for value in ('', '0', 'false', 'False'):
+            self.assertNotIn('data', self.export(data=value)[0])
+        for value in ('1', 'true'):
+            self.assertIn('data', self.export(data=value)[0])
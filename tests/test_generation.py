@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for the generation of STIX in the background and the views serving its result.
+"""
+
+import json
+
+import mock
+
+from django.contrib.auth.models import User
+from django.core.urlresolvers import reverse
+from django.test import TestCase
+
+from dingos_authoring import tasks
+from dingos_authoring.caching import stix_cache, stix_cache_key
+
+
+AUTHOR_VIEW = 'url.dingos_authoring.index'
+
+
+class FakeTransformer(object):
+
+    def __init__(self, jsn, namespace_uri, namespace_slug):
+        self.jsn = jsn
+
+    def getStix(self):
+        return '<stix:STIX_Package id="%s"/>' % json.loads(self.jsn)['id']
+
+
+class FakeResult(object):
+
+    def __init__(self, status, result=None):
+        self.status = status
+        self.result = result
+
+
+class ScheduledGenerationTestCase(TestCase):
+
+    def setUp(self):
+        stix_cache.clear()
+
+    def test_result_is_stored_in_stix_cache(self):
+        jsn = '{"id": "example:package-1"}'
+
+        result = tasks.scheduled_generation(FakeTransformer, jsn, AUTHOR_VIEW, 'http://example.com', 'example', 1)
+
+        key = stix_cache_key(jsn, AUTHOR_VIEW, 'http://example.com', 'example')
+        self.assertEqual(result, {'user': 1, 'key': key, 'xml': '<stix:STIX_Package id="example:package-1"/>'})
+        self.assertEqual(stix_cache.get(key), result['xml'])
+
+
+class GenerationViewsTestCase(TestCase):
+
+    def setUp(self):
+        stix_cache.clear()
+        self.user = User.objects.create_user('author', 'author@example.com', 'secret')
+        User.objects.create_user('other', 'other@example.com', 'secret')
+        self.client.login(username='author', password='secret')
+
+    def fake_result(self, status, result=None):
+        return mock.patch.object(tasks.scheduled_generation, 'AsyncResult',
+                                 return_value=FakeResult(status, result))
+
+    def get_status(self):
+        response = self.client.get(reverse('url.dingos_authoring.generation_status', kwargs={'job': 'job-1'}))
+        return json.loads(response.content)
+
+    def get_xml(self):
+        return self.client.get(reverse('url.dingos_authoring.generation_result', kwargs={'job': 'job-1'}))
+
+    def test_pending_generation(self):
+        with self.fake_result('PENDING'):
+            res = self.get_status()
+            response = self.get_xml()
+
+        self.assertEqual((res['status'], res['state']), (True, 'PENDING'))
+        self.assertNotIn('download_url', res)
+        self.assertEqual(response.status_code, 404)
+
+    def test_successful_generation(self):
+        with self.fake_result('SUCCESS', {'user': self.user.pk, 'key': 'key-1', 'xml': '<stix/>'}):
+            res = self.get_status()
+            response = self.get_xml()
+
+        self.assertTrue(res['status'])
+        self.assertEqual(res['download_url'],
+                         reverse('url.dingos_authoring.generation_result', kwargs={'job': 'job-1'}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, '<stix/>')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="job-1.xml"')
+        self.assertEqual(stix_cache.get('key-1'), '<stix/>')
+
+    def test_generation_of_other_user(self):
+        self.client.login(username='other', password='secret')
+        with self.fake_result('SUCCESS', {'user': self.user.pk, 'key': 'key-1', 'xml': '<stix/>'}):
+            res = self.get_status()
+            response = self.get_xml()
+
+        self.assertFalse(res['status'])
+        self.assertNotIn('download_url', res)
+        self.assertEqual(response.status_code, 404)
+
+    def test_failed_generation(self):
+        with self.fake_result('FAILURE', ValueError('broken report')):
+            res = self.get_status()
+            response = self.get_xml()
+
+        self.assertFalse(res['status'])
+        self.assertIn('broken report', res['msg'])
+        self.assertEqual(response.status_code, 404)
+
+    def test_empty_generation(self):
+        with self.fake_result('SUCCESS', {'user': self.user.pk, 'key': 'key-1', 'xml': ''}):
+            res = self.get_status()
+            response = self.get_xml()
+
+        self.assertFalse(res['status'])
+        self.assertEqual(response.status_code, 404)
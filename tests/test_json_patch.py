@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for the application of JSON patches (RFC 6902) to reports.
+"""
+
+import json
+import unittest
+
+from dingos_authoring.json_patch import apply_patch, JSONPatchError
+from dingos_authoring.models import AuthoredData
+
+
+def document():
+    return {'title': 'Report',
+            'observables': [{'id': 1}, {'id': 2}],
+            'a/b': 'slash',
+            'm~n': 'tilde'}
+
+
+class ApplyPatchTestCase(unittest.TestCase):
+
+    def assertPatched(self, patch, expected):
+        self.assertEqual(apply_patch(document(), patch), expected)
+
+    def test_add(self):
+        expected = document()
+        expected['description'] = 'New'
+        self.assertPatched([{'op': 'add', 'path': '/description', 'value': 'New'}], expected)
+
+    def test_add_to_array(self):
+        expected = document()
+        expected['observables'].insert(1, {'id': 3})
+        self.assertPatched([{'op': 'add', 'path': '/observables/1', 'value': {'id': 3}}], expected)
+
+    def test_add_to_end_of_array(self):
+        expected = document()
+        expected['observables'].append({'id': 3})
+        self.assertPatched([{'op': 'add', 'path': '/observables/-', 'value': {'id': 3}}], expected)
+
+    def test_add_whole_document(self):
+        self.assertPatched([{'op': 'add', 'path': '', 'value': {'title': 'Other'}}], {'title': 'Other'})
+
+    def test_remove(self):
+        expected = document()
+        del expected['observables'][0]
+        self.assertPatched([{'op': 'remove', 'path': '/observables/0'}], expected)
+
+    def test_replace(self):
+        expected = document()
+        expected['title'] = 'Changed'
+        self.assertPatched([{'op': 'replace', 'path': '/title', 'value': 'Changed'}], expected)
+
+    def test_move(self):
+        expected = document()
+        expected['items'] = expected.pop('observables')
+        self.assertPatched([{'op': 'move', 'from': '/observables', 'path': '/items'}], expected)
+
+    def test_move_within_array(self):
+        expected = document()
+        expected['observables'].reverse()
+        self.assertPatched([{'op': 'move', 'from': '/observables/0', 'path': '/observables/-'}], expected)
+
+    def test_copy(self):
+        expected = document()
+        expected['observables'].append({'id': 1})
+        self.assertPatched([{'op': 'copy', 'from': '/observables/0', 'path': '/observables/-'}], expected)
+
+    def test_copied_value_is_independent(self):
+        result = apply_patch(document(), [{'op': 'copy', 'from': '/observables/0', 'path': '/first'},
+                                          {'op': 'replace', 'path': '/first/id', 'value': 5}])
+        self.assertEqual(result['observables'][0], {'id': 1})
+
+    def test_test(self):
+        self.assertPatched([{'op': 'test', 'path': '/observables/1/id', 'value': 2}], document())
+
+    def test_escaped_pointers(self):
+        expected = document()
+        expected['a/b'] = 'changed'
+        expected['m~n'] = 'changed'
+        self.assertPatched([{'op': 'replace', 'path': '/a~1b', 'value': 'changed'},
+                            {'op': 'replace', 'path': '/m~0n', 'value': 'changed'}], expected)
+
+    def test_failures(self):
+        for patch in [{'op': 'add', 'path': '/title', 'value': 1},
+                      [{'op': 'add', 'path': '/title'}],
+                      [{'op': 'add', 'path': 'title', 'value': 1}],
+                      [{'op': 'add', 'path': '/missing/title', 'value': 1}],
+                      [{'op': 'add', 'path': '/observables/3', 'value': 1}],
+                      [{'op': 'add', 'path': '/observables/01', 'value': 1}],
+                      [{'op': 'add', 'path': '/title/x', 'value': 1}],
+                      [{'op': 'remove', 'path': '/missing'}],
+                      [{'op': 'remove', 'path': '/observables/-'}],
+                      [{'op': 'remove', 'path': ''}],
+                      [{'op': 'replace', 'path': '/missing', 'value': 1}],
+                      [{'op': 'move', 'path': '/observables/0/x'}],
+                      [{'op': 'move', 'from': '/observables', 'path': '/observables/0'}],
+                      [{'op': 'copy', 'from': '/missing', 'path': '/x'}],
+                      [{'op': 'test', 'path': '/title', 'value': 'Other'}],
+                      [{'op': 'unknown', 'path': '/title'}],
+                      ['add']]:
+            self.assertRaises(JSONPatchError, apply_patch, document(), patch)
+
+
+class SerializeReportTestCase(unittest.TestCase):
+
+    def test_format_does_not_depend_on_source(self):
+        sent = '{"title": "Report", "observables": [{"id": 1}], "description": "\\u00e4"}'
+        patched = apply_patch(json.loads('{"observables":[],"title":"Report","description":"\\u00e4"}'),
+                              [{'op': 'add', 'path': '/observables/-', 'value': {'id': 1}}])
+
+        self.assertEqual(AuthoredData.serialize_report(json.loads(sent)),
+                         AuthoredData.serialize_report(patched))
+        self.assertEqual(AuthoredData.hash_content(AuthoredData.serialize_report(json.loads(sent))),
+                         AuthoredData.hash_content(AuthoredData.serialize_report(patched)))
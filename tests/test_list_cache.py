@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for the caching of the pages of the authoring lists.
+"""
+
+import mock
+
+from django.contrib.auth.models import User, Group
+from django.test import TestCase
+from django.test.client import RequestFactory
+from django.utils import timezone
+from django.views.generic import ListView
+
+from dingos_authoring import view_classes
+from dingos_authoring.caching import get_authoring_cache, authoring_cache_is_shared
+from dingos_authoring.models import AuthoredData
+from dingos_authoring.view_classes import CachedListMixin
+
+
+class ListedView(CachedListMixin, ListView):
+    paginate_by = 10
+
+    def __init__(self, group, **kwargs):
+        super(ListedView, self).__init__(**kwargs)
+        self.group = group
+        self.request = RequestFactory().get('/')
+        self.kwargs = {}
+
+    def list_cache_scope(self):
+        return 'group:%s' % self.group.pk
+
+    def names(self):
+        queryset = AuthoredData.objects.filter(group=self.group).order_by('name')
+        (paginator, page, object_list, is_paginated) = self.paginate_queryset(queryset, self.paginate_by)
+        return [x.name for x in object_list]
+
+
+class CachedListTestCase(TestCase):
+
+    def setUp(self):
+        get_authoring_cache().clear()
+        self.group = Group.objects.create(name='authors')
+        self.user = User.objects.create_user('author', 'author@example.com', 'secret')
+        self.create('First')
+
+    def create(self, name):
+        return AuthoredData.object_create(kind=AuthoredData.AUTHORING_JSON,
+                                          status=AuthoredData.DRAFT,
+                                          user=self.user,
+                                          group=self.group,
+                                          identifier=name,
+                                          name=name,
+                                          timestamp=timezone.now(),
+                                          data='{}')
+
+    def shared_cache(self, timeout=300):
+        return mock.patch.multiple(view_classes,
+                                   DINGOS_AUTHORING_LIST_CACHE_TIMEOUT=timeout,
+                                   authoring_cache_is_shared=lambda: True)
+
+    def test_page_is_cached(self):
+        with self.shared_cache():
+            self.assertEqual(ListedView(self.group).names(), ['First'])
+            with self.assertNumQueries(0):
+                self.assertEqual(ListedView(self.group).names(), ['First'])
+
+    def test_write_invalidates_page(self):
+        with self.shared_cache():
+            self.assertEqual(ListedView(self.group).names(), ['First'])
+            self.create('Second')
+            self.assertEqual(ListedView(self.group).names(), ['First', 'Second'])
+
+    def test_write_to_other_group_keeps_page(self):
+        other_group = Group.objects.create(name='others')
+        with self.shared_cache():
+            self.assertEqual(ListedView(self.group).names(), ['First'])
+            AuthoredData.object_create(kind=AuthoredData.AUTHORING_JSON,
+                                       status=AuthoredData.DRAFT,
+                                       user=self.user,
+                                       group=other_group,
+                                       identifier='Other',
+                                       name='Other',
+                                       timestamp=timezone.now(),
+                                       data='{}')
+            with self.assertNumQueries(0):
+                self.assertEqual(ListedView(self.group).names(), ['First'])
+
+    def test_no_caching_without_timeout(self):
+        with self.shared_cache(timeout=None):
+            ListedView(self.group).names()
+            with self.assertNumQueries(2):
+                ListedView(self.group).names()
+
+    def test_no_caching_with_process_local_cache(self):
+        self.assertFalse(authoring_cache_is_shared())
+        with mock.patch.object(view_classes, 'DINGOS_AUTHORING_LIST_CACHE_TIMEOUT', 300):
+            ListedView(self.group).names()
+            with self.assertNumQueries(2):
+                ListedView(self.group).names()
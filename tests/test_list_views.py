@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for the pagination and the cached counts of the authoring list views.
+"""
+
+import mock
+
+from django.core.urlresolvers import reverse
+from django.test import TestCase
+from django.utils import timezone
+
+from dingos_authoring import views, view_classes
+from dingos_authoring.caching import get_authoring_cache
+from dingos_authoring.models import AuthoredData, ReportSummary
+from dingos_authoring.pagination import CachedCountPaginator
+
+from tests.utils import create_authoring_group
+
+
+class ListViewCountTestCase(TestCase):
+
+    def setUp(self):
+        get_authoring_cache().clear()
+        self.group, (self.user,) = create_authoring_group(['author'])
+        self.client.login(username='author', password='secret')
+
+    def create(self, identifier):
+        return AuthoredData.object_create(kind=AuthoredData.AUTHORING_JSON,
+                                          status=AuthoredData.DRAFT,
+                                          user=self.user,
+                                          group=self.group,
+                                          identifier=identifier,
+                                          name=identifier,
+                                          timestamp=timezone.now(),
+                                          data='{}')
+
+    def index(self):
+        return self.client.get(reverse('url.dingos_authoring.index'))
+
+    def test_keyset_page_shows_cached_count(self):
+        self.create('report-1')
+        self.create('report-2')
+
+        page = self.index().context['page_obj']
+        self.assertTrue(page.keyset)
+        self.assertEqual(page.count, 2)
+
+        # The count is served from the cache: a summary row removed behind
+        # the back of the write paths is still counted ...
+        ReportSummary.objects.filter(identifier__name='report-2').delete()
+        response = self.index()
+        self.assertEqual(len(response.context['object_list']), 1)
+        self.assertEqual(response.context['page_obj'].count, 2)
+
+        # ... whereas new reports invalidate it
+        self.create('report-3')
+        self.assertEqual(self.index().context['page_obj'].count, 3)
+
+    def test_exact_count_mode_does_not_count_keyset_pages(self):
+        self.create('report-1')
+
+        with mock.patch.object(view_classes, 'DINGOS_AUTHORING_COUNT_MODE', 'exact'):
+            page = self.index().context['page_obj']
+
+        self.assertEqual(page.count, None)
+
+    def test_offset_pagination_uses_cached_count(self):
+        self.create('report-1')
+        self.create('report-2')
+
+        with mock.patch.object(views.index, 'keyset_pagination', False):
+            response = self.index()
+
+        self.assertFalse(getattr(response.context['page_obj'], 'keyset', False))
+        self.assertIsInstance(response.context['paginator'], CachedCountPaginator)
+        self.assertEqual(response.context['paginator'].count, 2)
+
+    def test_history_shows_cached_count(self):
+        for i in range(3):
+            self.create('report-1')
+
+        response = self.client.get(reverse('url.dingos_authoring.view.authored_object.history',
+                                           kwargs={'id': 'report-1'}))
+
+        self.assertEqual(response.context['page_obj'].count, 3)
@@ -0,0 +1,247 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for loading reports into the editor, one at a time or in batches.
+"""
+
+import json
+
+from django.core.urlresolvers import reverse
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from dingos_authoring.autosave import buffer_autosave
+from dingos_authoring.caching import get_authoring_cache
+from dingos_authoring.models import AuthoredData, ReportOwnership
+
+from tests.utils import create_authoring_group
+
+
+class LoadTestCase(TestCase):
+
+    def setUp(self):
+        get_authoring_cache().clear()
+        self.group, (self.user, self.other_user) = create_authoring_group(['author', 'other'])
+        self.client.login(username='author', password='secret')
+
+    def create(self, identifier, owner=None):
+        obj = AuthoredData.object_create(kind=AuthoredData.AUTHORING_JSON,
+                                         status=AuthoredData.DRAFT,
+                                         user=self.user,
+                                         group=self.group,
+                                         identifier=identifier,
+                                         name=identifier,
+                                         timestamp=timezone.now(),
+                                         data='{"title":"%s"}' % identifier)
+        if owner:
+            ReportOwnership.acquire(self.group.pk, obj.identifier_id, owner)
+        return obj
+
+    def load_batch(self, names):
+        response = self.client.get(reverse('url.dingos_authoring.load_json_batch'), {'id': names})
+        return json.loads(response.content)
+
+    def leases(self):
+        return sorted(ReportOwnership.objects.values_list('identifier__name', 'user_id', 'expires'))
+
+
+class LoadBatchTestCase(LoadTestCase):
+
+    def test_batch_is_loaded(self):
+        self.create('report-1')
+        self.create('report-2', owner=self.user)
+
+        res = self.load_batch(['report-1', 'report-2', 'missing'])
+
+        self.assertTrue(res['status'])
+        self.assertEqual([(x['id'], x['status']) for x in res['data']],
+                         [('report-1', True), ('report-2', True), ('missing', False)])
+        self.assertEqual(json.loads(res['data'][0]['data']['jsn']), {'title': 'report-1'})
+
+    def test_reports_of_others_are_not_loaded(self):
+        self.create('report-1', owner=self.other_user)
+
+        res = self.load_batch(['report-1'])
+
+        self.assertFalse(res['data'][0]['status'])
+
+    def test_batch_does_not_change_ownership(self):
+        self.create('report-1')
+        self.create('report-2', owner=self.user)
+        self.create('report-3', owner=self.other_user)
+        leases = self.leases()
+
+        self.load_batch(['report-1', 'report-2', 'report-3'])
+
+        self.assertEqual(self.leases(), leases)
+
+    def test_number_of_queries_does_not_depend_on_batch(self):
+        names = []
+        counts = []
+        for size in (2, 10):
+            while len(names) < size:
+                names.append('report-%s' % len(names))
+                self.create(names[-1], owner=self.user if len(names) % 2 else None)
+            self.load_batch(names)
+            with CaptureQueriesContext(connection) as queries:
+                res = self.load_batch(names)
+            self.assertTrue(all(x['status'] for x in res['data']))
+            counts.append(len(queries))
+
+        self.assertEqual(counts[0], counts[1])
+
+
+class ConditionalLoadTestCase(LoadTestCase):
+
+    def load(self, name, etag=None):
+        extra = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return self.client.get(reverse('url.dingos_authoring.load_json'), {'name': name}, **extra)
+
+    def test_unchanged_report_is_not_sent_again(self):
+        self.create('report-1')
+        etag = self.load('report-1')['ETag']
+
+        response = self.load('report-1', etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, '')
+
+    def test_weak_etag_matches(self):
+        self.create('report-1')
+        etag = self.load('report-1')['ETag']
+
+        self.assertEqual(self.load('report-1', 'W/%s' % etag).status_code, 304)
+
+    def test_changed_report_is_sent(self):
+        self.create('report-1')
+        etag = self.load('report-1')['ETag']
+        self.create('report-1')
+
+        response = self.load('report-1', etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertTrue(json.loads(response.content)['status'])
+
+    def test_report_taken_by_other_user_is_not_confirmed(self):
+        obj = self.create('report-1')
+        etag = self.load('report-1')['ETag']
+        ReportOwnership.release(self.group.pk, obj.identifier_id)
+        ReportOwnership.acquire(self.group.pk, obj.identifier_id, self.other_user)
+
+        response = self.load('report-1', etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(json.loads(response.content)['status'])
+
+    def test_conditional_load_takes_report(self):
+        self.create('report-1')
+        etag = self.load('report-1')['ETag']
+        ReportOwnership.objects.all().delete()
+
+        self.assertEqual(self.load('report-1', etag).status_code, 304)
+        self.assertEqual([x[:2] for x in self.leases()], [('report-1', self.user.pk)])
+
+
+class DraftListTestCase(LoadTestCase):
+
+    def list(self, **kwargs):
+        kwargs['list'] = ''
+        response = self.client.get(reverse('url.dingos_authoring.load_json'), kwargs)
+        return json.loads(response.content)
+
+    def test_own_drafts_are_listed(self):
+        self.create('report-1', owner=self.user)
+        self.create('report-2', owner=self.other_user)
+        self.create('report-3')
+
+        res = self.list()
+
+        self.assertTrue(res['status'])
+        self.assertEqual([(x['id'], x['name']) for x in res['data']], [('report-1', 'report-1')])
+        self.assertEqual(res['next'], None)
+
+    def test_payload_is_not_retrieved(self):
+        self.create('report-1', owner=self.user)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.list()
+
+        draft_queries = [x['sql'] for x in queries.captured_queries
+                         if 'dingos_authoring_authoreddata' in x['sql']]
+        self.assertTrue(draft_queries)
+        self.assertFalse(any('"dingos_authoring_authoreddata"."data"' in x for x in draft_queries))
+
+    def test_drafts_are_paginated(self):
+        for i in range(5):
+            self.create('report-%s' % i, owner=self.user)
+
+        listed = []
+        after = None
+        while True:
+            res = self.list(limit=2, **({'after': after} if after else {}))
+            self.assertTrue(len(res['data']) <= 2)
+            listed.extend(x['id'] for x in res['data'])
+            after = res['next']
+            if not after:
+                break
+
+        self.assertEqual(sorted(listed), ['report-%s' % i for i in range(5)])
+
+    def test_drafts_since(self):
+        self.create('report-1', owner=self.user)
+        since = timezone.now()
+        self.create('report-2', owner=self.user)
+
+        res = self.list(since=since.isoformat())
+
+        self.assertEqual([x['id'] for x in res['data']], ['report-2'])
+
+    def test_naive_since_is_utc(self):
+        self.create('report-1', owner=self.user)
+        since = timezone.now()
+        self.create('report-2', owner=self.user)
+
+        res = self.list(since=timezone.make_naive(since, timezone.utc).isoformat())
+
+        self.assertEqual([x['id'] for x in res['data']], ['report-2'])
+
+    def test_invalid_since(self):
+        res = self.list(since='yesterday')
+
+        self.assertFalse(res['status'])
+
+
+class BufferedAutosaveLoadTestCase(LoadTestCase):
+
+    def test_buffered_autosave_is_sent(self):
+        self.create('report-1', owner=self.user)
+        buffer_autosave(self.group, 'report-1', self.user, '{"title":"draft"}', 'Draft', None)
+
+        response = self.client.get(reverse('url.dingos_authoring.load_json'), {'name': 'report-1'})
+
+        res = json.loads(response.content)
+        self.assertEqual(res['data']['autosave']['jsn'], '{"title":"draft"}')
+        self.assertFalse(response.has_header('ETag'))
+
+    def test_autosave_of_other_user_is_not_sent(self):
+        self.create('report-1', owner=self.user)
+        buffer_autosave(self.group, 'report-1', self.other_user, '{"title":"draft"}', 'Draft', None)
+
+        res = json.loads(self.client.get(reverse('url.dingos_authoring.load_json'), {'name': 'report-1'}).content)
+
+        self.assertNotIn('autosave', res['data'])
+
+    def test_autosave_prevents_not_modified(self):
+        self.create('report-1', owner=self.user)
+        etag = self.client.get(reverse('url.dingos_authoring.load_json'), {'name': 'report-1'})['ETag']
+        buffer_autosave(self.group, 'report-1', self.user, '{"title":"draft"}', 'Draft', None)
+
+        response = self.client.get(reverse('url.dingos_authoring.load_json'), {'name': 'report-1'},
+                                   HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
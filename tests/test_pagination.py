@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for the pagination of lists by seeking on ``(field, pk)``.
+"""
+
+import datetime
+
+from django.contrib.auth.models import User, Group
+from django.test import TestCase
+from django.utils import timezone
+
+from dingos_authoring.caching import get_authoring_cache
+from dingos_authoring.models import AuthoredData
+from dingos_authoring.pagination import keyset_ordering, keyset_paginate
+
+
+PAGE_SIZE = 3
+
+FIELDS = ['timestamp', 'name', 'status', 'kind', 'user']
+
+
+class KeysetPaginationTestCase(TestCase):
+
+    def setUp(self):
+        get_authoring_cache().clear()
+        group = Group.objects.create(name='authors')
+        users = [User.objects.create_user('author%s' % i, 'author%s@example.com' % i, 'secret')
+                 for i in range(2)] + [None]
+        statuses = [AuthoredData.DRAFT, AuthoredData.UPDATE, AuthoredData.IMPORTED]
+        kinds = [AuthoredData.AUTHORING_JSON, AuthoredData.XML]
+        timestamp = timezone.now()
+
+        # Values repeat, such that pages have to be cut within runs of
+        # equal values; every fourth object shares the timestamp of its predecessor.
+        for i in range(11):
+            if i % 4:
+                timestamp = timestamp - datetime.timedelta(minutes=1)
+            AuthoredData.object_create(kind=kinds[i % 2],
+                                       status=statuses[i % 3],
+                                       user=users[i % 3],
+                                       group=group,
+                                       identifier='report-%s' % i,
+                                       name='Report %s' % (i % 4),
+                                       timestamp=timestamp,
+                                       data='{}')
+        self.queryset = AuthoredData.objects.all()
+
+    def expected(self, field, descending):
+        if descending:
+            return list(self.queryset.order_by('-%s' % field, '-pk').values_list('pk', flat=True))
+        return list(self.queryset.order_by(field, 'pk').values_list('pk', flat=True))
+
+    def test_ordering(self):
+        self.assertEqual(keyset_ordering(self.queryset), ('timestamp', True))
+        for field in FIELDS:
+            self.assertEqual(keyset_ordering(self.queryset.order_by(field)), (field, False))
+            self.assertEqual(keyset_ordering(self.queryset.order_by('-%s' % field, '-pk')), (field, True))
+        self.assertEqual(keyset_ordering(self.queryset.order_by('name', 'timestamp')), None)
+        self.assertEqual(keyset_ordering(self.queryset.order_by('identifier__name')), None)
+
+    def test_forward_and_backward(self):
+        for field in FIELDS:
+            for descending in (True, False):
+                expected = self.expected(field, descending)
+
+                pages = []
+                page = keyset_paginate(self.queryset, PAGE_SIZE, descending=descending, field=field)
+                self.assertFalse(page.has_previous())
+                pages.append([x.pk for x in page])
+                while page.has_next():
+                    page = keyset_paginate(self.queryset, PAGE_SIZE, after=page.next_cursor,
+                                           descending=descending, field=field)
+                    self.assertTrue(page.has_previous())
+                    pages.append([x.pk for x in page])
+
+                self.assertEqual(sum(pages, []), expected, "%s, descending=%s" % (field, descending))
+
+                # Walk back from the last page
+                for previous in reversed(pages[:-1]):
+                    page = keyset_paginate(self.queryset, PAGE_SIZE, before=page.previous_cursor,
+                                           descending=descending, field=field)
+                    self.assertTrue(page.has_next())
+                    self.assertEqual([x.pk for x in page], previous, "%s, descending=%s" % (field, descending))
+                self.assertFalse(page.has_previous())
+
+    def test_cursor_of_other_ordering_restarts_list(self):
+        page = keyset_paginate(self.queryset, PAGE_SIZE, field='name')
+        other = keyset_paginate(self.queryset, PAGE_SIZE, after=page.next_cursor, field='status')
+
+        self.assertFalse(other.has_previous())
+        self.assertEqual([x.pk for x in other], self.expected('status', True)[:PAGE_SIZE])
+
+    def test_invalid_cursor_restarts_list(self):
+        page = keyset_paginate(self.queryset, PAGE_SIZE, after='garbage', field='name')
+
+        self.assertEqual([x.pk for x in page], self.expected('name', True)[:PAGE_SIZE])
@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for saving reports via the processing view, completely or as JSON patch.
+"""
+
+import json
+
+import mock
+
+from django.contrib.auth.models import User, Group
+from django.core.urlresolvers import reverse
+from django.test import TestCase
+from django.utils import timezone
+
+from dingos_authoring import models, view_classes
+from dingos_authoring.autosave import buffered_autosave
+from dingos_authoring.caching import get_authoring_cache, stix_cache
+from dingos_authoring.models import AuthoredData, ReportOwnership
+
+from tests.urls import ProcessingView
+from tests.utils import create_authoring_group
+
+
+class ProcessingViewTestCase(TestCase):
+
+    def setUp(self):
+        get_authoring_cache().clear()
+        create_authoring_group(['author'])
+        self.client.login(username='author', password='secret')
+
+    def save(self, **kwargs):
+        data = {'submit_name': 'Report', 'id': 'report-1', 'action': 'save'}
+        data.update(kwargs)
+        return json.loads(self.client.post(reverse('url.tests.save'), data).content)
+
+    def revisions(self):
+        return AuthoredData.objects.filter(identifier__name='report-1').count()
+
+    def test_patch_without_effect_is_unchanged(self):
+        res = self.save(jsn='{"title": "Report", "observables": []}')
+
+        res = self.save(patch=json.dumps([{'op': 'replace', 'path': '/title', 'value': 'Report'}]),
+                        base=res['token'])
+
+        self.assertTrue(res['status'])
+        self.assertIn('No changes', res['msg'])
+        self.assertEqual(self.revisions(), 1)
+
+    def test_complete_save_after_patch_is_unchanged(self):
+        res = self.save(jsn='{"title": "Report", "observables": []}')
+        res = self.save(patch=json.dumps([{'op': 'add', 'path': '/observables/-', 'value': {'id': 1}}]),
+                        base=res['token'])
+        self.assertEqual(self.revisions(), 2)
+
+        # The editor sends the same content in its own format
+        res = self.save(jsn='{"observables":[{"id":1}],"title":"Report"}')
+
+        self.assertIn('No changes', res['msg'])
+        self.assertEqual(self.revisions(), 2)
+
+    def test_patch_is_stored_like_complete_report(self):
+        res = self.save(jsn='{"title": "Report", "observables": []}')
+        self.save(patch=json.dumps([{'op': 'add', 'path': '/observables/-', 'value': {'id': 1}}]),
+                  base=res['token'])
+
+        latest = AuthoredData.objects.get(identifier__name='report-1', latest=True)
+        self.assertEqual(latest.data, AuthoredData.serialize_report({'title': 'Report', 'observables': [{'id': 1}]}))
+
+    def test_released_report_cannot_be_saved(self):
+        self.save(jsn='{"title": "Report"}')
+        self.save(jsn='{"title": "Report"}', action='release')
+
+        res = self.save(jsn='{"title": "Changed"}')
+
+        self.assertFalse(res['status'])
+        self.assertIn('take the object', res['msg'])
+        self.assertEqual(self.revisions(), 1)
+
+    def test_saving_renews_lease(self):
+        self.save(jsn='{"title": "Report"}')
+        ReportOwnership.objects.update(expires=timezone.now())
+
+        with mock.patch.object(models, 'DINGOS_AUTHORING_OWNERSHIP_TTL', 60):
+            res = self.save(jsn='{"title": "Changed"}')
+
+        self.assertTrue(res['status'])
+        self.assertTrue(ReportOwnership.objects.get().expires > timezone.now())
+
+    def test_revision_without_hash_is_changed(self):
+        self.save(jsn='{"title": "Report"}')
+        AuthoredData.objects.filter(identifier__name='report-1').update(content_hash='')
+
+        res = self.save(jsn='{"title": "Report"}')
+
+        self.assertIn('Changes saved', res['msg'])
+        self.assertEqual(self.revisions(), 2)
+
+
+class AutosaveTestCase(TestCase):
+
+    def setUp(self):
+        get_authoring_cache().clear()
+        self.group, (self.user, self.other_user) = create_authoring_group(['author', 'other'])
+        self.client.login(username='author', password='secret')
+
+    def autosave(self, jsn='{"title": "Draft"}'):
+        return json.loads(self.client.post(reverse('url.tests.save'),
+                                           {'submit_name': 'Report', 'id': 'report-1',
+                                            'action': 'autosave', 'jsn': jsn}).content)
+
+    def autosaves(self):
+        return AuthoredData.objects.filter(status=AuthoredData.AUTOSAVE)
+
+    def test_autosave_is_written_without_shared_cache(self):
+        res = self.autosave()
+
+        self.assertTrue(res['status'])
+        self.assertEqual(list(self.autosaves().values_list('data', flat=True)), ['{"title": "Draft"}'])
+        self.assertEqual(buffered_autosave(self.group, 'report-1', self.user), None)
+
+    def test_autosave_is_buffered_in_shared_cache(self):
+        with mock.patch.object(view_classes, 'authoring_cache_is_shared', return_value=True), \
+                mock.patch.object(view_classes.tasks.flush_autosaves, 'apply_async') as apply_async:
+            res = self.autosave()
+
+        self.assertTrue(res['status'])
+        self.assertEqual(self.autosaves().count(), 0)
+        self.assertEqual(buffered_autosave(self.group, 'report-1', self.user)['jsn'], '{"title": "Draft"}')
+        self.assertEqual(apply_async.call_count, 1)
+
+    def test_autosave_of_report_owned_by_other_user_is_rejected(self):
+        obj = AuthoredData.object_create(kind=AuthoredData.AUTHORING_JSON,
+                                         status=AuthoredData.DRAFT,
+                                         user=self.other_user,
+                                         group=self.group,
+                                         identifier='report-1',
+                                         name='Report',
+                                         timestamp=timezone.now(),
+                                         data='{}')
+        ReportOwnership.acquire(self.group.pk, obj.identifier_id, self.other_user)
+
+        res = self.autosave()
+
+        self.assertFalse(res['status'])
+        self.assertIn('other', res['msg'])
+        self.assertEqual(self.autosaves().count(), 0)
+
+
+class IsUnchangedTestCase(TestCase):
+
+    def setUp(self):
+        get_authoring_cache().clear()
+        self.obj = AuthoredData.object_create(kind=AuthoredData.AUTHORING_JSON,
+                                              status=AuthoredData.DRAFT,
+                                              user=User.objects.create_user('author', 'author@example.com', 'secret'),
+                                              group=Group.objects.create(name='authors'),
+                                              identifier='report-1',
+                                              name='Report',
+                                              timestamp=timezone.now(),
+                                              data='{"title":"Report"}')
+
+    def deferred(self):
+        return AuthoredData.objects.defer('data').get(pk=self.obj.pk)
+
+    def test_comparison_does_not_load_data(self):
+        previous_obj = self.deferred()
+
+        with self.assertNumQueries(0):
+            self.assertTrue(ProcessingView.is_unchanged(previous_obj, '{"title":"Report"}'))
+            self.assertFalse(ProcessingView.is_unchanged(previous_obj, '{"title":"Other"}'))
+
+    def test_missing_hash_means_changed(self):
+        AuthoredData.objects.filter(pk=self.obj.pk).update(content_hash='')
+        previous_obj = self.deferred()
+
+        with self.assertNumQueries(0):
+            self.assertFalse(ProcessingView.is_unchanged(previous_obj, '{"title":"Report"}'))
+
+
+class CountingTransformer(object):
+
+    generated = []
+
+    def __init__(self, jsn, namespace_uri, namespace_slug):
+        self.jsn = jsn
+
+    def getStix(self):
+        CountingTransformer.generated.append(self.jsn)
+        return '<stix:STIX_Package/>'
+
+
+class GenerateStixTestCase(TestCase):
+
+    namespace_info = {'default_ns_uri': 'http://example.com',
+                      'default_ns_slug': 'example'}
+
+    def setUp(self):
+        stix_cache.clear()
+        CountingTransformer.generated = []
+        self.view = ProcessingView(transformer=CountingTransformer)
+
+    def test_generation_is_cached(self):
+        for i in range(2):
+            self.assertEqual(self.view.generate_stix('{"id":"report-1"}', self.namespace_info),
+                             '<stix:STIX_Package/>')
+
+        self.assertEqual(CountingTransformer.generated, ['{"id":"report-1"}'])
+
+    def test_changed_report_is_generated(self):
+        self.view.generate_stix('{"id":"report-1"}', self.namespace_info)
+        self.view.generate_stix('{"id":"report-2"}', self.namespace_info)
+
+        self.assertEqual(len(CountingTransformer.generated), 2)
+
+    def test_namespace_is_part_of_key(self):
+        self.view.generate_stix('{"id":"report-1"}', self.namespace_info)
+        self.view.generate_stix('{"id":"report-1"}', dict(self.namespace_info, default_ns_slug='other'))
+
+        self.assertEqual(len(CountingTransformer.generated), 2)
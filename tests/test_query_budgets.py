@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Query-count and latency budgets for the authoring views.
+
+Each view is requested with a small and a large data set: the number of
+queries must not depend on the number of listed objects (which catches N+1
+lookups in views, templates and template tags) and must stay within the
+budget of the view. Latency budgets are generous and can be scaled with the
+environment variable ``DINGOS_AUTHORING_LATENCY_FACTOR`` (e.g., on slow CI
+machines); ``0`` disables them.
+"""
+
+import json, os, time
+
+from django.contrib.auth.models import User, Group
+from django.core.urlresolvers import reverse
+from django.db import connection
+from django.test import TestCase
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from dingos.models import IdentifierNameSpace
+
+from dingos_authoring.caching import get_authoring_cache, stix_cache
+from dingos_authoring.models import AuthoredData, GroupNamespaceMap, UserAuthoringInfo, ReportOwnership
+
+
+LATENCY_FACTOR = float(os.environ.get('DINGOS_AUTHORING_LATENCY_FACTOR', 1))
+
+AUTHOR_VIEW = 'url.dingos_authoring.index'
+
+SMALL = 5
+
+LARGE = 25
+
+
+class QueryBudgetTestCase(TestCase):
+
+    def setUp(self):
+        get_authoring_cache().clear()
+        stix_cache.clear()
+
+        self.group = Group.objects.create(name='authors')
+        self.user = User.objects.create_user('author', 'author@example.com', 'secret')
+        self.other_user = User.objects.create_user('other', 'other@example.com', 'secret')
+        for user in (self.user, self.other_user):
+            user.groups.add(self.group)
+
+        namespace = IdentifierNameSpace.objects.create(uri='http://example.com', name='example')
+        namespace_map = GroupNamespaceMap.objects.create(group=self.group, default_namespace=namespace)
+        UserAuthoringInfo.objects.create(user=self.user, default_authoring_namespace_info=namespace_map)
+
+        self.client.login(username='author', password='secret')
+        self.report_count = 0
+
+    def seed(self, count):
+        """
+        Create ``count`` reports with several revisions each; every other report
+        has been imported (half of the imports failed) and has been taken
+        by another user.
+        """
+        for i in range(self.report_count, self.report_count + count):
+            identifier = 'report-%s' % i
+            for revision in range(3):
+                obj = AuthoredData.object_create(kind=AuthoredData.AUTHORING_JSON,
+                                                 status=AuthoredData.DRAFT,
+                                                 author_view=AUTHOR_VIEW,
+                                                 data=json.dumps({'title': 'Report %s' % i, 'revision': revision}),
+                                                 user=self.user,
+                                                 group=self.group,
+                                                 identifier=identifier,
+                                                 name='Report %s' % i,
+                                                 timestamp=timezone.now())
+            if i % 2:
+                xml_import_obj = AuthoredData.object_create(kind=AuthoredData.XML,
+                                                            status=AuthoredData.IMPORTED,
+                                                            author_view=None,
+                                                            data='<stix/>',
+                                                            user=self.user,
+                                                            group=self.group,
+                                                            identifier='import-%s' % i,
+                                                            name='Report %s' % i,
+                                                            timestamp=timezone.now())
+                if i % 4 == 1:
+                    AuthoredData.objects.filter(pk=xml_import_obj.pk).update(processing_error='Import failed')
+                AuthoredData.object_create(kind=AuthoredData.AUTHORING_JSON,
+                                           status=AuthoredData.IMPORTED,
+                                           author_view=AUTHOR_VIEW,
+                                           data=json.dumps({'title': 'Report %s' % i, 'revision': 3}),
+                                           user=self.other_user,
+                                           group=self.group,
+                                           identifier=identifier,
+                                           name='Report %s' % i,
+                                           timestamp=timezone.now(),
+                                           yielded=xml_import_obj)
+            ReportOwnership.objects.create(group=self.group,
+                                           identifier=obj.identifier,
+                                           user=self.other_user if i % 2 else self.user)
+        self.report_count += count
+
+    def measure(self, request):
+        """
+        Call ``request`` once to warm up caches, then return the number
+        of queries and the duration of a second call.
+        """
+        request()
+        with CaptureQueriesContext(connection) as queries:
+            start = time.time()
+            response = request()
+            duration = time.time() - start
+        if response is not None:
+            self.assertEqual(response.status_code, 200)
+        return len(queries), duration
+
+    def assertBudget(self, request, max_queries, max_seconds, seed=None):
+        """
+        Assert that ``request`` stays within the budget for both data sets
+        and that its number of queries does not grow with the data.
+        """
+        seed = seed or self.seed
+        seed(SMALL)
+        small_queries, small_duration = self.measure(request)
+        seed(LARGE - SMALL)
+        large_queries, large_duration = self.measure(request)
+
+        self.assertEqual(small_queries, large_queries,
+                         "Number of queries grows with the number of objects: %s for %s reports, %s for %s reports"
+                         % (small_queries, SMALL, large_queries, LARGE))
+        self.assertLessEqual(large_queries, max_queries)
+        if LATENCY_FACTOR:
+            self.assertLessEqual(large_duration, max_seconds * LATENCY_FACTOR,
+                                 "Request took %.1f ms for %s reports (budget: %.1f ms)"
+                                 % (large_duration * 1000, LARGE, max_seconds * LATENCY_FACTOR * 1000))
+
+    def test_index(self):
+        self.assertBudget(lambda: self.client.get(reverse('url.dingos_authoring.index')),
+                          max_queries=15, max_seconds=0.5)
+
+    def test_history(self):
+        def seed_revisions(count):
+            for revision in range(count):
+                AuthoredData.object_create(kind=AuthoredData.AUTHORING_JSON,
+                                           status=AuthoredData.DRAFT,
+                                           author_view=AUTHOR_VIEW,
+                                           data=json.dumps({'title': 'Report 1', 'revision': revision}),
+                                           user=self.user,
+                                           group=self.group,
+                                           identifier='report-1',
+                                           name='Report 1',
+                                           timestamp=timezone.now())
+
+        url = reverse('url.dingos_authoring.view.authored_object.history', kwargs={'id': 'report-1'})
+        self.seed(2)
+        self.assertBudget(lambda: self.client.get(url), max_queries=15, max_seconds=0.5, seed=seed_revisions)
+
+    def test_imports(self):
+        self.assertBudget(lambda: self.client.get(reverse('url.dingos_authoring.imports')),
+                          max_queries=12, max_seconds=0.5)
+
+    def test_load_list(self):
+        self.assertBudget(lambda: self.client.get(reverse('url.dingos_authoring.load_json'), {'list': '1'}),
+                          max_queries=8, max_seconds=0.2)
+
+    def test_load_single(self):
+        self.assertBudget(lambda: self.client.get(reverse('url.dingos_authoring.load_json'), {'name': 'report-0'}),
+                          max_queries=8, max_seconds=0.2)
+
+    def test_save(self):
+        revisions = iter(range(1000))
+
+        def request():
+            return self.client.post(reverse('url.tests.save'),
+                                    {'jsn': json.dumps({'title': 'Report 0', 'revision': next(revisions)}),
+                                     'submit_name': 'Report 0',
+                                     'id': 'report-0',
+                                     'action': 'save'})
+
+        self.assertBudget(request, max_queries=25, max_seconds=0.5)
+
+    def test_take(self):
+        other_client = Client()
+        other_client.login(username='other', password='secret')
+        clients = [self.client, other_client]
+
+        def request():
+            # The reports change hands with every request; all reports
+            # of the group are taken, so the number of statements must not depend on it.
+            clients.reverse()
+            reports = AuthoredData.objects.filter(group=self.group,
+                                                  kind=AuthoredData.AUTHORING_JSON,
+                                                  latest=True).values_list('pk',flat=True)
+            return clients[0].post(reverse('url.dingos_authoring.index.action.take'),
+                                   {'checked_objects': list(reports)})
+
+        self.assertBudget(request, max_queries=15, max_seconds=0.5)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for running functions in a child process under time and memory limits.
+"""
+
+import os, time
+import unittest
+
+from dingos_authoring.resource_limits import run_with_limits, ResourceLimitExceeded
+
+
+class CustomError(Exception):
+    pass
+
+
+def add(x, y):
+    return x + y
+
+def fail():
+    raise CustomError("failed in child")
+
+def fail_unpicklable():
+    error = ValueError("unpicklable")
+    error.callback = lambda: None
+    raise error
+
+def sleep(seconds):
+    time.sleep(seconds)
+    return 'awake'
+
+def allocate(megabytes):
+    return len(' ' * (megabytes * 1024 * 1024))
+
+def die():
+    os._exit(3)
+
+def child_pid():
+    return os.getpid()
+
+
+class RunWithLimitsTestCase(unittest.TestCase):
+
+    def test_without_limits_runs_in_process(self):
+        self.assertEqual(run_with_limits(child_pid), os.getpid())
+
+    def test_result_is_returned_from_child(self):
+        self.assertEqual(run_with_limits(add, args=(1, 2), time_limit=10), 3)
+        self.assertNotEqual(run_with_limits(child_pid, time_limit=10), os.getpid())
+
+    def test_exception_type_is_preserved(self):
+        try:
+            run_with_limits(fail, time_limit=10)
+        except CustomError, e:
+            self.assertEqual("%s" % e, "failed in child")
+            self.assertTrue('Traceback' in e.child_traceback)
+        else:
+            self.fail("Exception in child has not been raised")
+
+    def test_unpicklable_exception_becomes_standard_error(self):
+        try:
+            run_with_limits(fail_unpicklable, time_limit=10)
+        except StandardError, e:
+            self.assertTrue('ValueError: unpicklable' in "%s" % e)
+        else:
+            self.fail("Exception in child has not been raised")
+
+    def test_time_limit(self):
+        start = time.time()
+        self.assertRaises(ResourceLimitExceeded, run_with_limits, sleep, args=(30,), time_limit=1)
+        self.assertTrue(time.time() - start < 10)
+
+    def test_memory_limit(self):
+        self.assertRaises(ResourceLimitExceeded, run_with_limits, allocate, args=(512,), memory_limit=256)
+        self.assertEqual(run_with_limits(allocate, args=(1,), memory_limit=256), 1024 * 1024)
+
+    def test_child_dying_without_result(self):
+        self.assertRaises(ResourceLimitExceeded, run_with_limits, die, time_limit=10)
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for the full-text search over reports.
+"""
+
+from django.contrib.auth.models import User, Group
+from django.test import TestCase
+from django.utils import timezone
+
+from dingos_authoring.caching import get_authoring_cache
+from dingos_authoring.models import AuthoredData, ReportSummary
+from dingos_authoring.search import search_reports
+
+
+class SearchReportsTestCase(TestCase):
+
+    def setUp(self):
+        get_authoring_cache().clear()
+        self.user = User.objects.create_user('author', 'author@example.com', 'secret')
+        self.group = Group.objects.create(name='authors')
+        self.other_group = Group.objects.create(name='others')
+
+    def create(self, group, identifier, data):
+        return AuthoredData.object_create(kind=AuthoredData.AUTHORING_JSON,
+                                          status=AuthoredData.DRAFT,
+                                          user=self.user,
+                                          group=group,
+                                          identifier=identifier,
+                                          name='Report',
+                                          timestamp=timezone.now(),
+                                          data=data)
+
+    def test_matching_reports_are_found(self):
+        self.create(self.group, 'report-1', '{"title": "Phishing campaign"}')
+        self.create(self.group, 'report-2', '{"title": "Malware"}')
+
+        found = search_reports(ReportSummary.objects.filter(group=self.group), 'phishing')
+
+        self.assertEqual([x.identifier.name for x in found], ['report-1'])
+
+    def test_match_in_other_group_is_ignored(self):
+        # The same identifier is used in both groups, but only
+        # the report of the other group matches.
+        self.create(self.group, 'report-1', '{"title": "Malware"}')
+        self.create(self.other_group, 'report-1', '{"title": "Phishing campaign"}')
+
+        self.assertEqual(search_reports(ReportSummary.objects.filter(group=self.group), 'phishing').count(), 0)
+        self.assertEqual(search_reports(AuthoredData.objects.filter(group=self.group), 'phishing').count(), 0)
+        self.assertEqual(search_reports(ReportSummary.objects.all(), 'phishing').get().group, self.other_group)
+
+    def test_empty_search_returns_queryset(self):
+        self.create(self.group, 'report-1', '{"title": "Malware"}')
+
+        self.assertEqual(search_reports(ReportSummary.objects.all(), '  ').count(), 1)
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for the cache of generated STIX.
+"""
+
+import mock
+
+from django.test import TestCase
+
+from dingos_authoring import caching
+from dingos_authoring.caching import LRUCache, stix_cache_key
+
+
+class LRUCacheTestCase(TestCase):
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = LRUCache(2, 60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        self.assertEqual((cache.get('a'), cache.get('b'), cache.get('c')), (1, None, 3))
+
+    def test_expired_entry_is_missing(self):
+        cache = LRUCache(2, 60)
+        with mock.patch.object(caching.time, 'time', return_value=1000):
+            cache.set('a', 1)
+        with mock.patch.object(caching.time, 'time', return_value=1059):
+            self.assertEqual(cache.get('a'), 1)
+        with mock.patch.object(caching.time, 'time', return_value=1061):
+            self.assertEqual(cache.get('a', 'missing'), 'missing')
+
+    def test_cache_can_be_disabled(self):
+        cache = LRUCache(0, 60)
+        cache.set('a', 1)
+
+        self.assertEqual(cache.get('a'), None)
+
+
+class StixCacheKeyTestCase(TestCase):
+
+    parts = ('{"id": "report-1"}', 'url.dingos_authoring.index', 'http://example.com', 'example')
+
+    def test_key_depends_on_all_parts(self):
+        keys = set([stix_cache_key(*self.parts)])
+        for i in range(len(self.parts)):
+            parts = list(self.parts)
+            parts[i] += 'x'
+            keys.add(stix_cache_key(*parts))
+
+        self.assertEqual(len(keys), len(self.parts) + 1)
+
+    def test_parts_are_separated(self):
+        self.assertNotEqual(stix_cache_key('ab', 'c', 'd', 'e'), stix_cache_key('a', 'bc', 'd', 'e'))
+
+    def test_unicode_parts(self):
+        self.assertEqual(stix_cache_key(u'{"title": "\xe4"}', *self.parts[1:]),
+                         stix_cache_key(u'{"title": "\xe4"}'.encode('utf-8'), *self.parts[1:]))
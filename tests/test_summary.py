@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for the maintenance of the report summaries shown in the list of reports.
+"""
+
+from django.contrib.auth.models import User, Group
+from django.test import TestCase
+from django.utils import timezone
+
+from dingos_authoring.caching import get_authoring_cache
+from dingos_authoring.models import AuthoredData, ReportSummary
+
+
+class ReportSummaryTestCase(TestCase):
+
+    def setUp(self):
+        get_authoring_cache().clear()
+        self.group = Group.objects.create(name='authors')
+        self.user = User.objects.create_user('author', 'author@example.com', 'secret')
+
+    def create(self, status, name, kind=AuthoredData.AUTHORING_JSON):
+        return AuthoredData.object_create(kind=kind,
+                                          status=status,
+                                          user=self.user,
+                                          group=self.group,
+                                          identifier='report',
+                                          name=name,
+                                          timestamp=timezone.now(),
+                                          data='{}')
+
+    def test_summary_follows_latest_revision(self):
+        self.create(AuthoredData.DRAFT, 'First')
+        latest = self.create(AuthoredData.UPDATE, 'Second')
+
+        summary = ReportSummary.objects.get()
+        self.assertEqual((summary.latest_revision_id, summary.name, summary.status),
+                         (latest.pk, 'Second', AuthoredData.UPDATE))
+
+    def test_autosaves_do_not_change_summary(self):
+        latest = self.create(AuthoredData.DRAFT, 'Saved')
+        self.create(AuthoredData.AUTOSAVE, 'Autosaved')
+
+        self.assertEqual(ReportSummary.objects.get().latest_revision_id, latest.pk)
+
+    def test_summary_removed_when_report_is_no_longer_listed(self):
+        self.create(AuthoredData.DRAFT, 'Saved')
+        self.create(AuthoredData.IMPORTED, 'Imported', kind=AuthoredData.XML)
+
+        self.assertEqual(ReportSummary.objects.count(), 0)
@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for the ownership of reports.
+"""
+
+from datetime import timedelta
+
+from django.contrib.auth.models import User, Group
+from django.core.urlresolvers import reverse
+from django.test import TestCase
+from django.utils import timezone
+
+from dingos_authoring.caching import get_authoring_cache, count_cache_key
+from dingos_authoring.models import AuthoredData, ReportOwnership, ReportSummary
+from dingos_authoring.pagination import CachedCountPaginator
+
+from tests.utils import create_authoring_group
+
+
+class OwnershipTestCase(TestCase):
+
+    def setUp(self):
+        get_authoring_cache().clear()
+        self.group = Group.objects.create(name='authors')
+        self.owner = User.objects.create_user('owner', 'owner@example.com', 'secret')
+        self.taker = User.objects.create_user('taker', 'taker@example.com', 'secret')
+
+    def create(self, identifier, status, user):
+        obj = AuthoredData.object_create(kind=AuthoredData.AUTHORING_JSON,
+                                         status=status,
+                                         user=user,
+                                         group=self.group,
+                                         identifier=identifier,
+                                         name=identifier,
+                                         data='{"title": "%s"}' % identifier)
+        ReportOwnership.acquire(self.group.pk, obj.identifier_id, user)
+        return obj
+
+    def test_acquire_and_release(self):
+        obj = self.create('report', AuthoredData.DRAFT, self.owner)
+
+        self.assertFalse(ReportOwnership.acquire(self.group.pk, obj.identifier_id, self.taker))
+        self.assertTrue(ReportOwnership.acquire(self.group.pk, obj.identifier_id, self.owner))
+
+        ReportOwnership.release(self.group.pk, obj.identifier_id)
+        self.assertEqual(ReportOwnership.holder_id(self.group.pk, obj.identifier_id), None)
+        self.assertTrue(ReportOwnership.acquire(self.group.pk, obj.identifier_id, self.taker))
+        self.assertEqual(ReportSummary.objects.get(identifier=obj.identifier).user, self.taker)
+
+        # Ownership changes do not write revisions
+        self.assertEqual(AuthoredData.objects.filter(identifier=obj.identifier).count(), 1)
+
+    def test_only_owner_renews(self):
+        obj = self.create('report', AuthoredData.DRAFT, self.owner)
+
+        self.assertTrue(ReportOwnership.renew(self.group.pk, obj.identifier_id, self.owner))
+        self.assertFalse(ReportOwnership.renew(self.group.pk, obj.identifier_id, self.taker))
+
+        ReportOwnership.release(self.group.pk, obj.identifier_id)
+        self.assertFalse(ReportOwnership.renew(self.group.pk, obj.identifier_id, self.owner))
+
+    def test_expired_lease_can_be_taken(self):
+        obj = self.create('report', AuthoredData.DRAFT, self.owner)
+        ReportOwnership.objects.filter(identifier=obj.identifier).update(expires=timezone.now() - timedelta(seconds=1))
+
+        self.assertEqual(ReportOwnership.holder_id(self.group.pk, obj.identifier_id), None)
+        self.assertTrue(ReportOwnership.acquire(self.group.pk, obj.identifier_id, self.taker))
+
+    def test_bulk_acquire(self):
+        draft = self.create('draft', AuthoredData.DRAFT, self.owner)
+        imported = self.create('imported', AuthoredData.IMPORTED, self.owner)
+        unowned = AuthoredData.object_create(kind=AuthoredData.AUTHORING_JSON,
+                                             status=AuthoredData.DRAFT,
+                                             user=self.owner,
+                                             group=self.group,
+                                             identifier='unowned',
+                                             name='unowned',
+                                             data='{}')
+
+        ReportOwnership.bulk_acquire(self.group.pk,
+                                     [draft.identifier_id, imported.identifier_id, unowned.identifier_id],
+                                     self.taker)
+
+        self.assertEqual(sorted(ReportOwnership.active(self.group).values_list('identifier__name', 'user')),
+                         [('draft', self.taker.pk), ('imported', self.taker.pk), ('unowned', self.taker.pk)])
+        self.assertEqual(set(ReportSummary.objects.values_list('user', flat=True)), set([self.taker.pk]))
+        self.assertEqual(AuthoredData.objects.count(), 3)
+
+    def test_taking_keeps_cached_counts(self):
+        draft = self.create('draft', AuthoredData.DRAFT, self.owner)
+        imported = self.create('imported', AuthoredData.IMPORTED, self.owner)
+
+        def counts():
+            reports = CachedCountPaginator(ReportSummary.objects.filter(group=self.group), 10,
+                                           count_key=count_cache_key(self.group.pk,
+                                                                     AuthoredData.REPORT_COUNT_SIGNATURE))
+            history = CachedCountPaginator(AuthoredData.objects.filter(group=self.group, identifier=draft.identifier),
+                                           10,
+                                           count_key=count_cache_key(self.group.pk,
+                                                                     AuthoredData.history_count_signature('draft')))
+            return (reports.count, history.count)
+
+        self.assertEqual(counts(), (2, 1))
+
+        ReportOwnership.bulk_acquire(self.group.pk, [draft.identifier_id, imported.identifier_id], self.taker)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(counts(), (2, 1))
+
+    def test_owners_of_retrieved_reports(self):
+        owned = self.create('owned', AuthoredData.DRAFT, self.owner)
+        expired = self.create('expired', AuthoredData.DRAFT, self.owner)
+        released = self.create('released', AuthoredData.DRAFT, self.owner)
+        ReportOwnership.objects.filter(identifier=expired.identifier).update(expires=timezone.now() - timedelta(seconds=1))
+        ReportOwnership.release(self.group.pk, released.identifier_id)
+
+        reports = ReportOwnership.with_owner(AuthoredData.objects.filter(group=self.group))
+        self.assertEqual(sorted((x.name, x.owner_id, x.owner_name) for x in reports),
+                         [('expired', None, None), ('owned', self.owner.pk, 'owner'), ('released', None, None)])
+
+        holders = ReportOwnership.holders(self.group.pk, [owned.identifier_id, expired.identifier_id])
+        self.assertEqual(holders, {owned.identifier_id: self.owner})
+
+
+class TakeViewTestCase(TestCase):
+
+    def setUp(self):
+        get_authoring_cache().clear()
+        self.group, (self.owner, self.taker) = create_authoring_group(['owner', 'taker'])
+        self.client.login(username='taker', password='secret')
+
+    def create(self, identifier, status):
+        obj = AuthoredData.object_create(kind=AuthoredData.AUTHORING_JSON,
+                                         status=status,
+                                         user=self.owner,
+                                         group=self.group,
+                                         identifier=identifier,
+                                         name=identifier,
+                                         timestamp=timezone.now(),
+                                         data='{}')
+        ReportOwnership.acquire(self.group.pk, obj.identifier_id, self.owner)
+        return obj
+
+    def take(self, *objs):
+        return self.client.post(reverse('url.dingos_authoring.index.action.take'),
+                                {'checked_objects': [x.pk for x in objs]})
+
+    def latest(self, identifier):
+        return AuthoredData.objects.get(identifier__name=identifier, latest=True)
+
+    def test_taking_keeps_revisions_of_drafts(self):
+        draft = self.create('draft', AuthoredData.DRAFT)
+
+        self.take(draft)
+
+        self.assertEqual(ReportOwnership.holder_id(self.group.pk, draft.identifier_id), self.taker.pk)
+        self.assertEqual(self.latest('draft').pk, draft.pk)
+
+    def test_taking_puts_imported_report_into_update_mode(self):
+        imported = self.create('imported', AuthoredData.IMPORTED)
+
+        self.take(imported)
+
+        latest = self.latest('imported')
+        self.assertNotEqual(latest.pk, imported.pk)
+        self.assertEqual((latest.status, latest.user), (AuthoredData.UPDATE, self.taker))
+        self.assertEqual(ReportOwnership.holder_id(self.group.pk, imported.identifier_id), self.taker.pk)
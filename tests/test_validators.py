@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for the validation of reports against the JSON schema of their author view.
+"""
+
+import json
+import unittest
+
+from dingos_authoring import validators
+from dingos_authoring.validators import validate_report, get_report_validator, ReportValidationError
+
+
+SCHEMA = {
+    'type': 'object',
+    'required': ['stix_header'],
+    'properties': {
+        'stix_header': {
+            'type': 'object',
+            'required': ['title'],
+            'properties': {'title': {'type': 'string', 'minLength': 1}},
+        },
+        'observables': {'type': 'array', 'items': {'type': 'object'}},
+    },
+}
+
+
+class ValidateReportTestCase(unittest.TestCase):
+
+    def test_payload_must_be_json_object(self):
+        self.assertRaises(ReportValidationError, validate_report, 'test.no_schema', '{"broken": ')
+        self.assertRaises(ReportValidationError, validate_report, 'test.no_schema', '[1, 2]')
+        self.assertEqual(validate_report('test.no_schema', '{"any": 1}'), {'any': 1})
+
+    @unittest.skipIf(validators.jsonschema is None, "jsonschema is not installed")
+    def test_schema_violation_reports_path(self):
+        report = {'stix_header': {'title': ''}, 'observables': []}
+        try:
+            validate_report('test.schema', json.dumps(report), SCHEMA)
+        except ReportValidationError, e:
+            self.assertEqual(e.path, '/stix_header/title')
+        else:
+            self.fail("Invalid report has been accepted")
+
+        report['stix_header']['title'] = 'Report'
+        self.assertEqual(validate_report('test.schema', json.dumps(report), SCHEMA), report)
+
+    @unittest.skipIf(validators.jsonschema is None, "jsonschema is not installed")
+    def test_validator_is_compiled_once(self):
+        validator = get_report_validator('test.compiled', SCHEMA)
+        self.assertTrue(validator is not None)
+        self.assertTrue(get_report_validator('test.compiled', SCHEMA) is validator)
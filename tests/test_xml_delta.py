@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for the reduction of re-imported documents to new and changed objects.
+"""
+
+from django.contrib.auth.models import User, Group
+from django.test import TestCase
+from django.utils import timezone
+
+from dingos_authoring import tasks
+from dingos_authoring.models import AuthoredData
+from dingos_authoring.xml_delta import strip_unchanged_objects, object_uids
+
+from tests.utils import create_iobjects
+
+
+PREVIOUS = """<?xml version="1.0" encoding="UTF-8"?>
+<stix:STIX_Package xmlns:stix="http://stix.mitre.org/stix-1"
+                   xmlns:indicator="http://stix.mitre.org/Indicator-2"
+                   xmlns:example="http://example.com" id="example:package-1">
+  <stix:Indicators>
+    <stix:Indicator id="example:indicator-1" timestamp="2014-01-01T00:00:00" version="2.1">
+      <indicator:Title>First</indicator:Title>
+    </stix:Indicator>
+    <stix:Indicator id="example:indicator-2" timestamp="2014-01-01T00:00:00" version="2.1">
+      <indicator:Title>Second</indicator:Title>
+    </stix:Indicator>
+  </stix:Indicators>
+</stix:STIX_Package>
+"""
+
+# The same objects as above with different indentation, attribute order
+# and prefixes declared on the objects rather than on the package;
+# the second indicator has been changed and a third one added.
+
+CURRENT = """<?xml version="1.0" encoding="UTF-8"?>
+<stix:STIX_Package xmlns:stix="http://stix.mitre.org/stix-1" id="example:package-1"><stix:Indicators>
+<stix:Indicator xmlns:indicator="http://stix.mitre.org/Indicator-2" version="2.1" timestamp="2014-01-01T00:00:00" id="example:indicator-1"><indicator:Title>First</indicator:Title></stix:Indicator>
+<stix:Indicator xmlns:indicator="http://stix.mitre.org/Indicator-2" id="example:indicator-2" timestamp="2014-01-01T00:00:00" version="2.1"><indicator:Title>Changed</indicator:Title></stix:Indicator>
+<stix:Indicator xmlns:indicator="http://stix.mitre.org/Indicator-2" id="example:indicator-3" timestamp="2014-01-01T00:00:00" version="2.1"><indicator:Title>Third</indicator:Title></stix:Indicator>
+</stix:Indicators></stix:STIX_Package>
+"""
+
+AVAILABLE_UIDS = set(['package-1', 'indicator-1', 'indicator-2'])
+
+# An object with an ``xsi:type``, whose prefix is declared on the object itself
+
+TYPED = """<?xml version="1.0" encoding="UTF-8"?>
+<stix:STIX_Package xmlns:stix="http://stix.mitre.org/stix-1"
+                   xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" id="example:package-1">
+  <stix:TTPs>
+    <stix:TTP xmlns:ttp="http://stix.mitre.org/TTP-1" xsi:type="ttp:TTPType" id="example:ttp-1">
+      <ttp:Title>TTP</ttp:Title>
+    </stix:TTP>
+  </stix:TTPs>
+</stix:STIX_Package>
+"""
+
+
+class StripUnchangedObjectsTestCase(TestCase):
+
+    def test_unchanged_object_is_replaced_by_reference(self):
+        reduced, stubbed_ids = strip_unchanged_objects(CURRENT, PREVIOUS, AVAILABLE_UIDS)
+
+        self.assertEqual(stubbed_ids, ['example:indicator-1'])
+        self.assertIn('idref="example:indicator-1"', reduced)
+        self.assertNotIn('First', reduced)
+
+    def test_changed_and_new_objects_are_kept(self):
+        reduced, stubbed_ids = strip_unchanged_objects(CURRENT, PREVIOUS, AVAILABLE_UIDS)
+
+        self.assertNotIn('example:indicator-2', stubbed_ids)
+        self.assertNotIn('example:indicator-3', stubbed_ids)
+        self.assertIn('Changed', reduced)
+        self.assertIn('Third', reduced)
+
+    def test_unchanged_object_without_previous_result_is_kept(self):
+        reduced, stubbed_ids = strip_unchanged_objects(CURRENT, PREVIOUS, set(['package-1']))
+
+        self.assertEqual(stubbed_ids, [])
+        self.assertEqual(reduced, CURRENT)
+
+    def test_identical_document_is_reduced(self):
+        reduced, stubbed_ids = strip_unchanged_objects(PREVIOUS, PREVIOUS, AVAILABLE_UIDS)
+
+        self.assertEqual(sorted(stubbed_ids), ['example:indicator-1', 'example:indicator-2'])
+        self.assertEqual(object_uids(stubbed_ids), set(['indicator-1', 'indicator-2']))
+
+
+    def test_reference_keeps_type(self):
+        reduced, stubbed_ids = strip_unchanged_objects(TYPED, TYPED, set(['package-1', 'ttp-1']))
+
+        self.assertEqual(stubbed_ids, ['example:ttp-1'])
+        self.assertNotIn('<ttp:Title>', reduced)
+        self.assertIn('xmlns:ttp="http://stix.mitre.org/TTP-1"', reduced)
+        self.assertIn('xsi:type="ttp:TTPType"', reduced)
+        self.assertIn('idref="example:ttp-1"', reduced)
+
+
+class FakeImporter(object):
+    """
+    Stands in for the STIX importer: records the imported document and
+    reports the given objects as created.
+    """
+
+    def __init__(self, created_iobjects):
+        self.created_iobjects = created_iobjects
+        self.imported = []
+
+    def xml_import(self, xml_content, track_created_objects=False):
+        self.imported.append(xml_content)
+        return [{'pk': x.pk} for x in self.created_iobjects]
+
+
+class RelinkTestCase(TestCase):
+
+    def setUp(self):
+        self.group = Group.objects.create(name='authors')
+        self.user = User.objects.create_user('author', 'author@example.com', 'secret')
+
+    def create_import(self, data):
+        return AuthoredData.object_create(kind=AuthoredData.XML,
+                                          status=AuthoredData.IMPORTED,
+                                          user=self.user,
+                                          group=self.group,
+                                          identifier='import',
+                                          name='Import',
+                                          timestamp=timezone.now(),
+                                          data=data)
+
+    def test_unchanged_objects_are_linked_by_uid(self):
+        previous_objects = create_iobjects(['package-1', 'indicator-1', 'indicator-2'])
+        previous_import = self.create_import(PREVIOUS)
+        previous_import.link_yielded_iobjects([x.pk for x in previous_objects])
+
+        new_objects = create_iobjects(['indicator-2-changed', 'indicator-3', 'package-1-new'])
+        current_import = self.create_import(CURRENT)
+        importer = FakeImporter(new_objects)
+
+        tasks.scheduled_import(importer, CURRENT, current_import, previous_xml_import_pk=previous_import.pk)
+
+        self.assertNotIn('First', importer.imported[0])
+        self.assertEqual(set(current_import.yielded_iobjects.values_list('pk', flat=True)),
+                         set([x.pk for x in new_objects] + [previous_objects[1].pk]))
+
+    def test_missing_previous_import(self):
+        new_objects = create_iobjects(['package-1', 'indicator-1'])
+        current_import = self.create_import(CURRENT)
+        importer = FakeImporter(new_objects)
+
+        tasks.scheduled_import(importer, CURRENT, current_import, previous_xml_import_pk=current_import.pk + 1)
+
+        self.assertEqual(importer.imported, [CURRENT])
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for linking the InfoObjects yielded by an import in chunks.
+"""
+
+from django.test import TestCase
+from django.utils import timezone
+
+from dingos_authoring.models import AuthoredData
+
+from tests.utils import create_authoring_group, create_iobjects
+
+
+class LinkYieldedTestCase(TestCase):
+
+    def setUp(self):
+        self.group, (self.user,) = create_authoring_group(['author'])
+        self.xml_import = AuthoredData.object_create(kind=AuthoredData.XML,
+                                                     status=AuthoredData.IMPORTED,
+                                                     user=self.user,
+                                                     group=self.group,
+                                                     identifier='import-1',
+                                                     name='import-1',
+                                                     timestamp=timezone.now(),
+                                                     data='<xml/>')
+        self.iobjects = create_iobjects(['object-%s' % i for i in range(5)])
+        self.pks = [x.pk for x in self.iobjects]
+
+    def linked(self):
+        return sorted(self.xml_import.yielded_iobjects.values_list('pk', flat=True))
+
+    def test_objects_are_linked(self):
+        self.xml_import.link_yielded_iobjects(self.pks, chunk_size=2)
+
+        self.assertEqual(self.linked(), sorted(self.pks))
+
+    def test_one_select_and_insert_per_chunk(self):
+        # Three chunks of at most two objects; duplicates are linked once
+        with self.assertNumQueries(6):
+            self.xml_import.link_yielded_iobjects(self.pks + self.pks[:2], chunk_size=2)
+
+        self.assertEqual(self.linked(), sorted(self.pks))
+
+    def test_existing_links_are_kept(self):
+        self.xml_import.yielded_iobjects.add(self.iobjects[0], self.iobjects[3])
+
+        self.xml_import.link_yielded_iobjects(self.pks, chunk_size=2)
+
+        self.assertEqual(self.linked(), sorted(self.pks))
+
+    def test_no_objects(self):
+        with self.assertNumQueries(0):
+            self.xml_import.link_yielded_iobjects([])
+
+        self.assertEqual(self.linked(), [])
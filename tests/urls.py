@@ -0,0 +1,19 @@
+from django.conf.urls import include, url
+
+from dingos_authoring.view_classes import BasicProcessingView
+
+
+class ProcessingView(BasicProcessingView):
+    """
+    Minimal authoring view for exercising the save endpoint; the author view
+    is the name of an existing URL, because the list templates
+    link to the editor via that name.
+    """
+    author_view = 'url.dingos_authoring.index'
+
+
+urlpatterns = [
+    url(r'^mantis/', include('dingos.urls')),
+    url(r'^authoring/save$', ProcessingView.as_view(), name="url.tests.save"),
+    url(r'^authoring/', include('dingos_authoring.urls')),
+]
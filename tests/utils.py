@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Helpers shared by the tests.
+"""
+
+from django.contrib.auth.models import User, Group
+from django.utils import timezone
+
+from dingos.models import IdentifierNameSpace, DataTypeNameSpace, InfoObjectFamily, InfoObjectType, \
+    Revision, InfoObject, Identifier
+
+from dingos_authoring.models import GroupNamespaceMap, UserAuthoringInfo
+
+
+def create_authoring_group(usernames, name='authors'):
+    """
+    Create an authoring group with the given members, whose default authoring
+    group it is; the password of all users is 'secret'.
+    Returns the group and the list of users.
+    """
+    group = Group.objects.create(name=name)
+    namespace = IdentifierNameSpace.objects.create(uri='http://example.com/%s' % name, name=name)
+    namespace_map = GroupNamespaceMap.objects.create(group=group, default_namespace=namespace)
+    users = []
+    for username in usernames:
+        user = User.objects.create_user(username, '%s@example.com' % username, 'secret')
+        user.groups.add(group)
+        UserAuthoringInfo.objects.create(user=user, default_authoring_namespace_info=namespace_map)
+        users.append(user)
+    return group, users
+
+
+def create_iobjects(uids, namespace_uri='http://example.com'):
+    """
+    Create an InfoObject for each of the given identifier uids.
+    """
+    namespace, created = IdentifierNameSpace.objects.get_or_create(uri=namespace_uri)
+    type_namespace, created = DataTypeNameSpace.objects.get_or_create(uri='http://stix.mitre.org/stix-1')
+    family, created = InfoObjectFamily.objects.get_or_create(name='stix')
+    revision, created = Revision.objects.get_or_create(name='1.1')
+    iobject_type, created = InfoObjectType.objects.get_or_create(name='Indicator',
+                                                                 iobject_family=family,
+                                                                 namespace=type_namespace)
+    now = timezone.now()
+    iobjects = []
+    for uid in uids:
+        identifier = Identifier.objects.create(uid=uid, namespace=namespace)
+        iobjects.append(InfoObject.objects.create(identifier=identifier,
+                                                  timestamp=now,
+                                                  create_timestamp=now,
+                                                  iobject_type=iobject_type,
+                                                  iobject_type_revision=revision,
+                                                  iobject_family=family,
+                                                  iobject_family_revision=revision,
+                                                  name=uid))
+    return iobjects